@@ -0,0 +1,7 @@
+"""Performance benchmarks of the models
+
+Run from the root of the repository:
+
+    python -m benchmarks --save baseline.json
+    python -m benchmarks --compare baseline.json
+"""
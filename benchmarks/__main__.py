@@ -0,0 +1,51 @@
+"""Command line of the benchmarks
+
+    python -m benchmarks [--sizes quick|full] [--filter PATTERN] [--save FILE]
+                         [--compare FILE] [--threshold 0.2]
+
+Exits with status 1 when --compare finds a regression.
+"""
+
+import argparse
+import sys
+
+from . import runner
+from .suite import SIZES
+
+
+def main(arguments: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--sizes", choices=sorted(SIZES), default="quick")
+    parser.add_argument(
+        "--filter", default="*", help="glob pattern of the benchmark names to run"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="writes the results to a JSON file")
+    parser.add_argument("--compare", help="JSON file of baseline results")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative slowdown reported as a regression",
+    )
+    options = parser.parse_args(arguments)
+
+    report = runner.run(
+        sizes=options.sizes, pattern=options.filter, repeat=options.repeat, log=print
+    )
+    if options.save:
+        runner.save(report, options.save)
+    if not options.compare:
+        return 0
+
+    comparisons = runner.compare(runner.load(options.compare), report)
+    slower = runner.regressions(comparisons, options.threshold)
+    print()
+    for comparison in comparisons:
+        flag = "REGRESSION" if comparison in slower else ""
+        print(f"{comparison.name:<60} {comparison.ratio:>8.2f}x {flag}")
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
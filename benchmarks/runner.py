@@ -0,0 +1,102 @@
+"""Running the benchmarks, saving their results and comparing them to a baseline
+"""
+
+import fnmatch
+import json
+import platform
+import sys
+import timeit
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from src.models.cache import valuation_cache
+
+from .suite import BENCHMARKS, SIZES
+
+
+@dataclass(frozen=True)
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def time_callable(function, repeat: int = 5, min_time: float = 0.05) -> float:
+    """returns the best time of a single call, in seconds, over several repeats of
+    enough calls to last at least min_time"""
+    timer = timeit.Timer(function)
+    number = 1
+    elapsed = timer.timeit(number)
+    while elapsed < min_time / 10 and number < 10**6:
+        number *= 10
+        elapsed = timer.timeit(number)
+    number = max(int(number * min_time / max(elapsed, 1e-9)), 1)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(sizes: str = "quick", pattern: str = "*", repeat: int = 5, log=None) -> dict:
+    """runs the benchmarks whose name matches the pattern and returns their
+    results with a description of the machine. The valuation cache is disabled so
+    that every call computes the valuation."""
+    results = {}
+    maxsize = valuation_cache.maxsize
+    valuation_cache.maxsize = 0
+    valuation_cache.invalidate()
+    try:
+        for benchmark in BENCHMARKS:
+            for name, setup in benchmark.cases(SIZES[sizes]):
+                if not fnmatch.fnmatch(name, pattern):
+                    continue
+                seconds = time_callable(setup(), repeat=repeat)
+                results[name] = {"seconds": seconds}
+                if log is not None:
+                    log(f"{name:<60} {seconds * 1e6:>14.2f} us")
+    finally:
+        valuation_cache.maxsize = maxsize
+    return {
+        "machine": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "sizes": sizes,
+        "results": results,
+    }
+
+
+def save(report: dict, path: str | Path) -> None:
+    Path(path).write_text(json.dumps(report, indent=2, sort_keys=True))
+
+
+def load(path: str | Path) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def compare(baseline: dict, current: dict) -> list[Comparison]:
+    """pairs the results of the benchmarks present in both reports"""
+    return [
+        Comparison(
+            name=name,
+            baseline=baseline["results"][name]["seconds"],
+            current=result["seconds"],
+        )
+        for name, result in current["results"].items()
+        if name in baseline["results"]
+    ]
+
+
+def regressions(comparisons: list[Comparison], threshold: float) -> list[Comparison]:
+    """returns the benchmarks slower than the baseline by more than the threshold,
+    e.g. 0.2 for 20%"""
+    return [
+        comparison for comparison in comparisons if comparison.ratio > 1 + threshold
+    ]
@@ -0,0 +1,292 @@
+"""Benchmarks of the timeseries, the asset valuations and the characters
+
+Every benchmark is a function taking its size parameters and returning the
+callable to time. The world and the assets are built outside of the timed callable.
+"""
+
+from dataclasses import dataclass, replace
+from datetime import date
+from itertools import product
+from typing import Callable
+
+import numpy as np
+
+from src.models.arrow_io import world_from_arrow, world_to_arrow
+from src.models.asset_table import AssetTable
+from src.models.assets import (
+    CommodityBundle,
+    Job,
+    Loan,
+    RealEstateProperty,
+    Saving,
+    Stock,
+)
+from src.models.backtest import backtest_property, backtest_stock
+from src.models.calendar import month_ordinal, ordinal_to_date
+from src.models.character import Character
+from src.models.sensitivity import sensitivities
+from src.models.simulation import simulate
+from src.models.timeseries import Timeseries, constant_timeseries, linear_timeseries
+from src.models.world import City, Commodity, Country, Currency, World
+
+START_DATE = date(2000, 1, 1)
+
+SIZES = {
+    "quick": {
+        "months": (12, 120),
+        "assets": (1, 100),
+        "simulated_assets": (1, 100),
+        "countries": (1, 10),
+    },
+    "full": {
+        "months": (12, 120, 1200),
+        "assets": (1, 100, 1000, 100_000),
+        # simulate values every asset of every month in python
+        "simulated_assets": (1, 100, 1000),
+        "countries": (1, 10, 100),
+    },
+}
+"""values of the size parameters of the benchmarks"""
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Callable[..., Callable[[], object]]
+    params: tuple[str, ...]
+
+    def cases(self, sizes: dict) -> list[tuple[str, Callable[[], Callable]]]:
+        """returns the name of every combination of sizes and a function building
+        its timed callable"""
+        cases = []
+        for values in product(*(sizes[param] for param in self.params)):
+            arguments = dict(zip(self.params, values))
+            label = ",".join(f"{name}={value}" for name, value in arguments.items())
+            name = f"{self.name}[{label}]" if label else self.name
+            cases.append((name, lambda arguments=arguments: self.setup(**arguments)))
+        return cases
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(name: str, *params: str):
+    """registers a benchmark parametrized by the given sizes"""
+
+    def register(setup: Callable) -> Callable:
+        BENCHMARKS.append(Benchmark(name=name, setup=setup, params=params))
+        return setup
+
+    return register
+
+
+def end_date(months: int) -> date:
+    return ordinal_to_date(month_ordinal(START_DATE) + months - 1)
+
+
+def dense_timeseries(months: int, seed: int = 0) -> Timeseries:
+    data = 100 + np.random.default_rng(seed).random(months)
+    return Timeseries(start_date=START_DATE, end_date=end_date(months), data=data)
+
+
+def build_world(months: int, countries: int = 1) -> World:
+    """a world with one currency, country and city per country, all indicators
+    being dense timeseries over the months"""
+    currencies, world_countries, cities = [], [], []
+    for index in range(countries):
+        currency = Currency(
+            name=f"currency {index}",
+            interest_rate=constant_timeseries(0.004, START_DATE, end_date(months)),
+            units_per_g_Au=dense_timeseries(months, seed=4 * index),
+        )
+        country = Country(
+            name=f"country {index}",
+            currency=currency,
+            real_estate_acquisition_cost_percentage=5,
+            stock_price=dense_timeseries(months, seed=4 * index + 1),
+        )
+        city = City(
+            name=f"city {index}",
+            country=country,
+            sqm_housing_price=dense_timeseries(months, seed=4 * index + 2),
+            yearly_price_to_rent_index=dense_timeseries(months, seed=4 * index + 3),
+        )
+        currencies.append(currency)
+        world_countries.append(country)
+        cities.append(city)
+    commodity = Commodity(name="silver", units_per_g_Au=dense_timeseries(months, 7))
+    return World(
+        name="benchmark",
+        currencies=currencies,
+        countries=world_countries,
+        cities=cities,
+        comodities=[commodity],
+    )
+
+
+def build_assets(world: World, months: int) -> list:
+    """one asset of every type, held over the whole horizon"""
+    currency, country, city = world.currencies[0], world.countries[0], world.cities[0]
+    period = {
+        "purchase_date": START_DATE,
+        "sale_date": end_date(months),
+        "currency": currency,
+    }
+    return [
+        Stock(initial_value=1000, country=country, **period),
+        RealEstateProperty(initial_value=0, city=city, surface_sqm=50, **period),
+        CommodityBundle(initial_value=10, commodity=world.comodities[0], **period),
+        Saving(initial_value=1000, **period),
+        Loan(initial_value=-1000, end_date=end_date(months), **period),
+        Job(initial_value=0, monthly_saving=100, **period),
+    ]
+
+
+def build_character(world: World, months: int, assets: int) -> Character:
+    """a character owning jobs and savings, bought over the horizon"""
+    currency = world.currencies[0]
+    owned = []
+    for index in range(assets):
+        purchase = ordinal_to_date(month_ordinal(START_DATE) + index % months)
+        if index % 2:
+            owned.append(
+                Saving(
+                    initial_value=10,
+                    purchase_date=purchase,
+                    sale_date=end_date(months),
+                    currency=currency,
+                )
+            )
+        else:
+            owned.append(
+                Job(
+                    initial_value=0,
+                    purchase_date=purchase,
+                    sale_date=end_date(months),
+                    currency=currency,
+                    monthly_saving=index,
+                )
+            )
+    return Character(
+        name="benchmark",
+        start_investment_date=START_DATE,
+        end_of_life=end_date(months),
+        initial_capital_g_Au=1000,
+        assets=owned,
+    )
+
+
+@benchmark("timeseries.add", "months")
+def timeseries_add(months: int):
+    left, right = dense_timeseries(months, 1), dense_timeseries(months, 2)
+    return lambda: left + right
+
+
+@benchmark("timeseries.sub", "months")
+def timeseries_sub(months: int):
+    left, right = dense_timeseries(months, 1), dense_timeseries(months, 2)
+    return lambda: left - right
+
+
+@benchmark("timeseries.mul", "months")
+def timeseries_mul(months: int):
+    left, right = dense_timeseries(months, 1), dense_timeseries(months, 2)
+    return lambda: left * right
+
+
+@benchmark("timeseries.div", "months")
+def timeseries_div(months: int):
+    left, right = dense_timeseries(months, 1), dense_timeseries(months, 2)
+    return lambda: left / right
+
+
+@benchmark("timeseries.constant_timeseries", "months")
+def timeseries_constant(months: int):
+    end = end_date(months)
+    return lambda: constant_timeseries(1.5, START_DATE, end).data
+
+
+@benchmark("timeseries.linear_timeseries", "months")
+def timeseries_linear(months: int):
+    end = end_date(months)
+    return lambda: linear_timeseries(1.5, 0.01, START_DATE, end).data
+
+
+def _asset_benchmark(asset_type: type, prop: str):
+    @benchmark(f"assets.{asset_type.__name__}.{prop}", "months")
+    def asset_property(months: int):
+        world = build_world(months)
+        asset = next(
+            asset for asset in build_assets(world, months) if type(asset) is asset_type
+        )
+        return lambda: getattr(asset, prop).data
+
+
+for _asset_type in (Stock, RealEstateProperty, CommodityBundle, Saving, Loan, Job):
+    for _prop in ("value_g_Au", "stream_g_Au"):
+        _asset_benchmark(_asset_type, _prop)
+
+
+@benchmark("character.capital_g_Au", "months", "assets")
+def character_capital(months: int, assets: int):
+    world = build_world(months)
+    character = build_character(world, months, assets)
+
+    def capital():
+        # a copy of the character builds its ledger again
+        return replace(character).capital_g_Au
+
+    return capital
+
+
+@benchmark("character.simulate", "months", "simulated_assets")
+def character_simulate(months: int, simulated_assets: int):
+    world = build_world(months)
+    character = build_character(world, months, simulated_assets)
+    currency = world.currencies[0]
+    return lambda: sum(1 for _ in simulate(character, currency))
+
+
+@benchmark("world.arrow_round_trip", "months", "countries")
+def world_arrow_round_trip(months: int, countries: int):
+    world = build_world(months, countries)
+    return lambda: world_from_arrow(world_to_arrow(world))
+
+
+@benchmark("assets.Stock.batch_value_g_Au", "months", "assets")
+def stock_batch_value(months: int, assets: int):
+    world = build_world(months)
+    country = world.countries[0]
+    first = month_ordinal(START_DATE)
+    purchases = first + np.arange(assets) % months
+    sales = np.full(assets, first + months - 1)
+    amounts = np.full(assets, 100.0)
+    return lambda: Stock.batch_value_g_Au(country, purchases, sales, amounts)
+
+
+@benchmark("asset_table.totals_g_Au", "months", "assets")
+def asset_table_totals(months: int, assets: int):
+    world = build_world(months)
+    table = AssetTable.from_assets(build_character(world, months, assets).assets)
+    return table.totals_g_Au
+
+
+@benchmark("sensitivity.sensitivities", "months", "assets")
+def sensitivity_report(months: int, assets: int):
+    world = build_world(months)
+    character = build_character(world, months, assets)
+    return lambda: sensitivities(character, world, world.currencies[0])
+
+
+@benchmark("backtest.backtest_stock", "months")
+def stock_backtest(months: int):
+    country = build_world(months).countries[0]
+    return lambda: backtest_stock(country, holding_months=months // 2)
+
+
+@benchmark("backtest.backtest_property", "months")
+def property_backtest(months: int):
+    city = build_world(months).cities[0]
+    return lambda: backtest_property(
+        city, holding_months=months // 2, loan_share=0.8
+    )
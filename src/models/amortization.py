@@ -0,0 +1,131 @@
+"""Amortization schedules of loans with variable interest rates
+"""
+
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+from .calendar import month_ordinal, month_ordinals, ordinal_to_date
+from .timeseries import DateOrderException, Timeseries
+
+ANNUITY = "annuity"
+"""constant payments: the payment that repays the loan on its last month given the
+whole path of the interest rate"""
+LINEAR = "linear"
+"""constant repayment of the principal, the interest being paid on top of it"""
+METHODS = (ANNUITY, LINEAR)
+
+
+@dataclass(frozen=True)
+class AmortizationSchedule:
+    """Monthly schedule of one or many loans. The loan is granted on the first
+    month and repaid from the second month to its end date.
+
+    The amounts have the sign of the principal and the loans are the leading axis
+    when several are amortized at once. Months after the end of a loan hold zero.
+
+    Attributes:
+        payment (Timeseries): amount paid every month, principal and interest
+        interest (Timeseries): interest paid every month
+        principal (Timeseries): principal repaid every month
+        balance (Timeseries): principal still owed at the end of every month
+    """
+
+    payment: Timeseries
+    interest: Timeseries
+    principal: Timeseries
+    balance: Timeseries
+
+
+def amortize(
+    principal,
+    rate: Timeseries,
+    start_date: date,
+    end_dates,
+    method: str = ANNUITY,
+) -> AmortizationSchedule:
+    """computes the amortization schedule of loans granted on the same month.
+
+    The computation is vectorized over the loans and the months: the interest
+    rates are compounded with cumulative products, without iterating over months.
+
+    Args:
+        principal: amount borrowed, one per loan
+        rate (Timeseries): monthly interest rate. Several paths (e.g. rate
+            scenarios) produce a schedule per path
+        start_date (date): month the loans are granted
+        end_dates: month of the last payment, one per loan (dates, datetime64 or
+            month ordinals)
+        method (str): ANNUITY or LINEAR
+
+    Returns:
+        AmortizationSchedule: from the start month to the last end month, with the
+            shape loans + rate paths + months
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown amortization method {method}, expected {METHODS}")
+    first_month = month_ordinal(start_date)
+    end_months = month_ordinals(end_dates)
+    if np.any(end_months <= first_month):
+        raise DateOrderException(
+            start_date=start_date,
+            end_date=ordinal_to_date(int(np.min(end_months))),
+            message=f"""a loan granted on {start_date} has to be repaid in the following months""",
+        )
+    principal, end_months = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64), end_months
+    )
+    last_month = int(end_months.max())
+    rates = rate.window(first_month + 1, last_month).array
+    paths_ndim = rates.ndim - 1
+    # loans + paths + months, the paths and the months broadcasting
+    no_payments = (end_months - first_month).reshape(
+        end_months.shape + (1,) * paths_ndim
+    )
+    principal = principal.reshape(no_payments.shape + (1,))
+    months = np.arange(1, last_month - first_month + 1)
+    repaying = months <= no_payments[..., np.newaxis]
+
+    if method == ANNUITY:
+        # discount of a payment on month t to the start: prod(1 / (1 + r_k), k <= t)
+        discount = np.cumprod(1 / (1 + rates), axis=-1)
+        annuity_factor = np.cumsum(discount, axis=-1)
+        # the payment repaying the principal in n months is P / sum(discount, t <= n)
+        shape = np.broadcast_shapes(no_payments.shape, rates.shape[:-1])
+        total_factor = np.take_along_axis(
+            np.broadcast_to(annuity_factor, shape + months.shape),
+            np.broadcast_to(no_payments, shape)[..., np.newaxis] - 1,
+            axis=-1,
+        )
+        payment = principal / total_factor
+        balance = (principal - payment * annuity_factor) / discount
+    else:
+        balance = principal * (1 - months / no_payments[..., np.newaxis])
+    balance = np.where(repaying, balance, 0.0)
+    balance = np.concatenate(
+        (np.broadcast_to(principal, balance.shape[:-1] + (1,)), balance), axis=-1
+    )
+    interest = np.where(repaying, balance[..., :-1] * rates, 0.0)
+    repaid = balance[..., :-1] - balance[..., 1:]
+    shape = np.broadcast_shapes(balance.shape[:-1], interest.shape[:-1])
+    nothing_paid = np.zeros(shape + (1,))
+
+    def schedule(data: np.ndarray) -> Timeseries:
+        if data.shape[-1] != balance.shape[-1]:
+            # nothing is paid on the month the loans are granted
+            data = np.concatenate(
+                (nothing_paid, np.broadcast_to(data, shape + data.shape[-1:])), axis=-1
+            )
+        return Timeseries(
+            start_date=ordinal_to_date(first_month),
+            end_date=ordinal_to_date(last_month),
+            data=np.broadcast_to(data, shape + data.shape[-1:]),
+        )
+
+    return AmortizationSchedule(
+        payment=schedule(repaid + interest),
+        interest=schedule(interest),
+        principal=schedule(repaid),
+        balance=schedule(balance),
+    )
@@ -0,0 +1,155 @@
+"""Reading and writing worlds as Parquet or Arrow IPC datasets
+"""
+
+import json
+from dataclasses import fields
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .calendar import month_ordinal, ordinal_to_date
+from .timeseries import (
+    Timeseries,
+    describe_symbolic,
+    months_in_interval,
+    read_symbolic,
+)
+from .world import ENTITY_KINDS, World
+
+METADATA_KEY = b"fortuneteller.world"
+ARROW_MAGIC = b"ARROW1"
+
+
+def _describe_series(ts: Timeseries, column: str) -> dict:
+    """describes a timeseries. Symbolic timeseries are described by their
+    coefficients, dense ones by the column holding their data."""
+    description = describe_symbolic(ts)
+    if description is None:
+        if ts.paths_shape:
+            raise ValueError(
+                f"timeseries {column} holds {ts.paths_shape} paths, only single"
+                " path timeseries can be written"
+            )
+        description = {
+            "start_date": ts.start_date.isoformat(),
+            "end_date": ts.end_date.isoformat(),
+            "type": "column",
+            "column": column,
+        }
+    return description
+
+
+def world_to_arrow(world: World) -> pa.Table:
+    """converts a world to a table with a monthly index and one column per dense
+    indicator. Months outside of the period of an indicator hold NaN. The entities
+    and the symbolic indicators are described in the schema metadata."""
+    dense_series = {}
+    entities = {}
+    for kind in ENTITY_KINDS.values():
+        entities[kind] = []
+        for entity in getattr(world, kind):
+            attributes = {}
+            for field in fields(entity):
+                value = getattr(entity, field.name)
+                if type(value) in ENTITY_KINDS:
+                    value = {"entity": ENTITY_KINDS[type(value)], "name": value.name}
+                elif isinstance(value, Timeseries):
+                    column = f"{kind}/{entity.name}/{field.name}"
+                    value = _describe_series(value, column)
+                    if value["type"] == "column":
+                        dense_series[column] = getattr(entity, field.name)
+                attributes[field.name] = value
+            entities[kind].append(attributes)
+
+    columns = {}
+    if dense_series:
+        first_month = min(month_ordinal(ts.start_date) for ts in dense_series.values())
+        last_month = max(month_ordinal(ts.end_date) for ts in dense_series.values())
+        no_months = last_month - first_month + 1
+        columns["month"] = pa.array(
+            [ordinal_to_date(first_month + i) for i in range(no_months)],
+            type=pa.date32(),
+        )
+        for column, ts in dense_series.items():
+            data = np.full(no_months, np.nan)
+            offset = month_ordinal(ts.start_date) - first_month
+            data[offset : offset + len(ts)] = ts.array
+            columns[column] = pa.array(data, type=pa.float64())
+    else:
+        columns["month"] = pa.array([], type=pa.date32())
+
+    metadata = {"name": world.name, "entities": entities}
+    return pa.table(columns, metadata={METADATA_KEY: json.dumps(metadata)})
+
+
+def _read_series(description: dict, table: pa.Table) -> Timeseries:
+    if description["type"] != "column":
+        return read_symbolic(description)
+    start_date = date.fromisoformat(description["start_date"])
+    end_date = date.fromisoformat(description["end_date"])
+    column = table.column(description["column"])
+    if column.num_chunks == 1:
+        # without nulls this is a view of the arrow buffer, which is memory
+        # mapped when the file is
+        data = column.chunk(0).to_numpy(zero_copy_only=False)
+    else:
+        data = column.to_numpy()
+    first_month = month_ordinal(table.column("month")[0].as_py())
+    offset = month_ordinal(start_date) - first_month
+    return Timeseries(
+        start_date=start_date,
+        end_date=end_date,
+        data=data[offset : offset + months_in_interval(start_date, end_date)],
+    )
+
+
+def world_from_arrow(table: pa.Table) -> World:
+    """builds a world from a table written by world_to_arrow. The dense indicators
+    view the buffers of the table without copying them."""
+    metadata = json.loads(table.schema.metadata[METADATA_KEY])
+    entities = {}
+    world_entities = {}
+    for entity_class, kind in ENTITY_KINDS.items():
+        world_entities[kind] = []
+        for attributes in metadata["entities"][kind]:
+            values = {}
+            for name, value in attributes.items():
+                if isinstance(value, dict) and "entity" in value:
+                    value = entities[(value["entity"], value["name"])]
+                elif isinstance(value, dict):
+                    value = _read_series(value, table)
+                values[name] = value
+            entity = entity_class(**values)
+            entities[(kind, entity.name)] = entity
+            world_entities[kind].append(entity)
+    return World(name=metadata["name"], **world_entities)
+
+
+def write_world(world: World, path: str | Path, format: str = "parquet") -> None:
+    """writes a world to a Parquet file or, with format="ipc", to an Arrow IPC
+    file which can be memory mapped when read"""
+    table = world_to_arrow(world)
+    if format == "parquet":
+        pq.write_table(table, path)
+    elif format == "ipc":
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        raise ValueError(f"unknown world format {format}, expected parquet or ipc")
+
+
+def read_world(path: str | Path, memory_map: bool = True) -> World:
+    """reads a world written by write_world. Arrow IPC files are memory mapped: the
+    indicators view the mapped file and are only read from disk when accessed."""
+    with open(path, "rb") as file:
+        is_ipc = file.read(len(ARROW_MAGIC)) == ARROW_MAGIC
+    if is_ipc:
+        source = pa.memory_map(str(path)) if memory_map else pa.OSFile(str(path))
+        table = pa.ipc.open_file(source).read_all()
+    else:
+        table = pq.read_table(path, memory_map=memory_map)
+    return world_from_arrow(table)
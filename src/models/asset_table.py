@@ -0,0 +1,418 @@
+"""Columnar storage of many asset holdings
+"""
+
+import numpy as np
+
+from .amortization import METHODS, amortize
+from .assets import (
+    Asset,
+    CommodityBundle,
+    Job,
+    Loan,
+    RealEstateProperty,
+    Saving,
+    Stock,
+)
+from .calendar import month_ordinal, month_ordinals, ordinal_to_date
+from .timeseries import DateOrderException, Timeseries
+
+KINDS = (Stock, RealEstateProperty, CommodityBundle, Saving, Loan, Job)
+"""asset classes stored in a table, the kind column holds their position"""
+ENTITY_FIELDS = {
+    Stock: "country",
+    RealEstateProperty: "city",
+    CommodityBundle: "commodity",
+}
+"""world entity referenced by each kind of asset, besides its currency"""
+QUANTITY_FIELDS = {RealEstateProperty: "surface_sqm", Job: "monthly_saving"}
+"""numeric field of each kind of asset, besides its initial value"""
+
+COLUMNS = {
+    "kind": np.int8,
+    "purchase_month": np.int64,
+    "sale_month": np.int64,
+    "end_month": np.int64,
+    "initial_value": np.float64,
+    "quantity": np.float64,
+    "currency": np.int32,
+    "entity": np.int32,
+    "amortization": np.int8,
+}
+
+
+class AssetTable:
+    """Many asset holdings stored as one array per attribute (struct of arrays).
+
+    The dates are month ordinals, the world entities are indexes in the entities
+    list of the table (-1 when the kind references none), the quantity holds the
+    surface of a property or the monthly saving of a job and the end month and the
+    amortization method are only meaningful for loans.
+
+    The valuations are computed per group of assets of the same kind referencing
+    the same entities: every asset of a group reads the same indicators, so the
+    group is valued with a few array operations, whatever its size.
+    """
+
+    def __init__(self):
+        self.entities: list = []
+        self._entity_ids: dict[int, int] = {}
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.empty(0, dtype=dtype))
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def __repr__(self):
+        counts = np.bincount(self.kind, minlength=len(KINDS))
+        kinds = ", ".join(
+            f"{kind.__name__}={count}" for kind, count in zip(KINDS, counts) if count
+        )
+        return f"AssetTable({kinds})"
+
+    def _entity_id(self, entity) -> int:
+        key = id(entity)
+        if key not in self._entity_ids:
+            self._entity_ids[key] = len(self.entities)
+            self.entities.append(entity)
+        return self._entity_ids[key]
+
+    def _entity_column(self, entities, size: int) -> np.ndarray:
+        if isinstance(entities, (list, tuple)):
+            return np.array([self._entity_id(entity) for entity in entities], np.int32)
+        return np.full(size, self._entity_id(entities), dtype=np.int32)
+
+    def extend(
+        self,
+        kind: type,
+        *,
+        purchase_dates,
+        sale_dates,
+        initial_values,
+        currency,
+        **attributes,
+    ) -> None:
+        """inserts many assets of one kind. The dates and the values are arrays
+        (or scalars shared by all the assets), the entities a single entity or a
+        list of one entity per asset.
+
+        Args:
+            kind (type): the asset class, e.g. Stock
+            purchase_dates: dates, datetime64 or month ordinals
+            sale_dates: dates, datetime64 or month ordinals
+            initial_values: initial value of every asset
+            currency: currency of the assets
+            attributes: the other fields of the asset class, e.g. country=... for
+                stocks, city=... and surface_sqm=... for properties, end_date=...
+                and amortization=... for loans
+        """
+        purchase_months, sale_months, initial_values = np.broadcast_arrays(
+            month_ordinals(purchase_dates),
+            month_ordinals(sale_dates),
+            np.asarray(initial_values, dtype=np.float64),
+        )
+        size = purchase_months.size
+        if np.any(purchase_months > sale_months):
+            first_wrong = int(np.argmax(purchase_months > sale_months))
+            raise DateOrderException(
+                start_date=ordinal_to_date(purchase_months.ravel()[first_wrong]),
+                end_date=ordinal_to_date(sale_months.ravel()[first_wrong]),
+                message=f"""asset {first_wrong} is sold before it is purchased""",
+            )
+        columns = {
+            "kind": np.full(size, KINDS.index(kind), dtype=np.int8),
+            "purchase_month": purchase_months.ravel(),
+            "sale_month": sale_months.ravel(),
+            "end_month": np.full(size, -1, dtype=np.int64),
+            "initial_value": initial_values.ravel(),
+            "quantity": np.full(size, np.nan),
+            "currency": self._entity_column(currency, size),
+            "entity": np.full(size, -1, dtype=np.int32),
+            "amortization": np.zeros(size, dtype=np.int8),
+        }
+        if kind in ENTITY_FIELDS:
+            columns["entity"] = self._entity_column(
+                attributes[ENTITY_FIELDS[kind]], size
+            )
+        if kind in QUANTITY_FIELDS:
+            columns["quantity"] = np.broadcast_to(
+                np.asarray(attributes[QUANTITY_FIELDS[kind]], np.float64), (size,)
+            )
+        if kind is Loan:
+            columns["end_month"] = np.broadcast_to(
+                month_ordinals(attributes["end_date"]), (size,)
+            )
+            columns["amortization"] = np.full(
+                size,
+                METHODS.index(attributes.get("amortization", Loan.amortization)),
+                dtype=np.int8,
+            )
+        for name, values in columns.items():
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate((column, values.astype(column.dtype))))
+
+    @classmethod
+    def from_assets(cls, assets: list[Asset]) -> "AssetTable":
+        """stores asset objects in a table, in the same order"""
+        table = cls()
+        rows = {name: [] for name in COLUMNS}
+        for asset in assets:
+            kind = type(asset)
+            rows["kind"].append(KINDS.index(kind))
+            rows["purchase_month"].append(month_ordinal(asset.purchase_date))
+            rows["sale_month"].append(month_ordinal(asset.sale_date))
+            rows["initial_value"].append(asset.initial_value)
+            rows["currency"].append(table._entity_id(asset.currency))
+            entity = (
+                getattr(asset, ENTITY_FIELDS[kind]) if kind in ENTITY_FIELDS else None
+            )
+            rows["entity"].append(-1 if entity is None else table._entity_id(entity))
+            rows["quantity"].append(
+                getattr(asset, QUANTITY_FIELDS[kind])
+                if kind in QUANTITY_FIELDS
+                else np.nan
+            )
+            is_loan = kind is Loan
+            rows["end_month"].append(month_ordinal(asset.end_date) if is_loan else -1)
+            rows["amortization"].append(
+                METHODS.index(asset.amortization) if is_loan else 0
+            )
+        for name, dtype in COLUMNS.items():
+            setattr(table, name, np.array(rows[name], dtype=dtype))
+        return table
+
+    def to_assets(self) -> list[Asset]:
+        """builds the asset objects of the table, in order"""
+        assets = []
+        for row in range(len(self)):
+            kind = KINDS[self.kind[row]]
+            attributes = {}
+            if kind in ENTITY_FIELDS:
+                attributes[ENTITY_FIELDS[kind]] = self.entities[self.entity[row]]
+            if kind in QUANTITY_FIELDS:
+                quantity = self.quantity[row]
+                attributes[QUANTITY_FIELDS[kind]] = (
+                    int(quantity) if kind is Job else float(quantity)
+                )
+            if kind is Loan:
+                attributes["end_date"] = ordinal_to_date(self.end_month[row])
+                attributes["amortization"] = METHODS[self.amortization[row]]
+            assets.append(
+                kind(
+                    initial_value=self.initial_value[row].item(),
+                    purchase_date=ordinal_to_date(self.purchase_month[row]),
+                    sale_date=ordinal_to_date(self.sale_month[row]),
+                    currency=self.entities[self.currency[row]],
+                    **attributes,
+                )
+            )
+        return assets
+
+    def filter(self, mask) -> "AssetTable":
+        """returns the assets selected by a boolean mask or an array of indexes,
+        sharing the entities of this table"""
+        table = AssetTable()
+        table.entities = list(self.entities)
+        table._entity_ids = dict(self._entity_ids)
+        for name in COLUMNS:
+            setattr(table, name, getattr(self, name)[mask])
+        return table
+
+    def of_kind(self, kind: type) -> "AssetTable":
+        return self.filter(self.kind == KINDS.index(kind))
+
+    # valuation
+
+    @property
+    def period(self) -> tuple[int, int]:
+        """first purchase month and last sale month of the assets"""
+        if not len(self):
+            raise ValueError("an empty asset table has no period")
+        return int(self.purchase_month.min()), int(self.sale_month.max())
+
+    def _indicator(self, ts: Timeseries) -> np.ndarray:
+        """the values of an indicator over the period of the table, NaN where the
+        indicator is not defined"""
+        first, last = self.period
+        values = np.full(last - first + 1, np.nan)
+        covered_first = max(first, ts.start_month)
+        covered_last = min(last, ts.end_month)
+        if covered_first <= covered_last:
+            if ts.paths_shape:
+                raise ValueError(
+                    "asset tables are valued against single path indicators only"
+                )
+            values[covered_first - first : covered_last - first + 1] = ts.window(
+                covered_first, covered_last
+            ).array
+        return values
+
+    def _groups(self):
+        """yields the kind, the currency, the entity and the rows of every group of
+        assets reading the same indicators"""
+        keys = np.stack((self.kind, self.currency, self.entity), axis=-1)
+        groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        for group, (kind, currency, entity) in enumerate(groups):
+            rows = np.flatnonzero(inverse == group)
+            entity = self.entities[entity] if entity >= 0 else None
+            yield KINDS[kind], self.entities[currency], entity, rows
+
+    def _linear_terms(self, kind, currency, entity, rows):
+        """for the kinds whose value and stream are a coefficient per asset times
+        an indicator of the group, returns the value coefficients, the value
+        indicator, the stream coefficients and the stream indicator"""
+        months = self.period[1] - self.period[0] + 1
+        zeros, ones = np.zeros(months), np.ones(months)
+        no_stream = (np.zeros(len(rows)), zeros)
+        gold_quote = self._indicator(currency.units_per_g_Au)
+        if kind is Stock:
+            stock_price = entity.stock_price
+            units = self.initial_value[rows] / stock_price.take(
+                self.purchase_month[rows]
+            )
+            if currency is entity.currency:
+                price_g_Au = self._indicator(entity.stock_price_g_Au)
+            else:
+                price_g_Au = self._indicator(stock_price) / gold_quote
+            return (units, price_g_Au) + no_stream
+        if kind is RealEstateProperty:
+            if currency is entity.country.currency:
+                sqm_price_g_Au = self._indicator(entity.sqm_housing_price_g_Au)
+            else:
+                sqm_price_g_Au = self._indicator(entity.sqm_housing_price) / gold_quote
+            rent_g_Au = sqm_price_g_Au * self._indicator(entity.monthly_rent_yield)
+            surfaces = self.quantity[rows]
+            return surfaces, sqm_price_g_Au, surfaces, rent_g_Au
+        if kind is CommodityBundle:
+            commodity_units = self._indicator(entity.units_per_g_Au)
+            return (self.initial_value[rows], 1 / commodity_units) + no_stream
+        if kind is Saving:
+            return (self.initial_value[rows], 1 / gold_quote) + no_stream
+        if kind is Job:
+            return np.zeros(len(rows)), zeros, self.quantity[rows], ones
+        return None
+
+    def _loan_blocks(self, currency, rows):
+        """returns the value and the stream of loans over the period of the table,
+        one row per loan, computing the schedules of the loans granted on the same
+        month with the same method at once"""
+        first, last = self.period
+        months = last - first + 1
+        balance = np.zeros((len(rows), months))
+        payment = np.zeros((len(rows), months))
+        keys = np.stack((self.purchase_month[rows], self.amortization[rows]), axis=-1)
+        for purchase_month, method in np.unique(keys, axis=0):
+            selected = np.flatnonzero((keys == (purchase_month, method)).all(axis=-1))
+            loans = rows[selected]
+            schedule = amortize(
+                self.initial_value[loans],
+                currency.interest_rate,
+                ordinal_to_date(purchase_month),
+                self.end_month[loans],
+                METHODS[method],
+            )
+            offset = purchase_month - first
+            no_months = min(len(schedule.balance), months - offset)
+            window = slice(offset, offset + no_months)
+            balance[selected, window] = schedule.balance.array[..., :no_months]
+            payment[selected, window] = schedule.payment.array[..., :no_months]
+        gold_quote = self._indicator(currency.units_per_g_Au)
+        return balance / gold_quote, payment / gold_quote
+
+    def _held(self, rows: np.ndarray) -> np.ndarray:
+        """whether every asset of the rows is held on every month of the period"""
+        first, last = self.period
+        months = np.arange(first, last + 1)
+        return (months >= self.purchase_month[rows, np.newaxis]) & (
+            months <= self.sale_month[rows, np.newaxis]
+        )
+
+    def _timeseries(self, data: np.ndarray) -> Timeseries:
+        first, last = self.period
+        return Timeseries(
+            start_date=ordinal_to_date(first), end_date=ordinal_to_date(last), data=data
+        )
+
+    def _blocks(self) -> tuple[np.ndarray, np.ndarray]:
+        first, last = self.period
+        values = np.full((len(self), last - first + 1), np.nan)
+        streams = np.full((len(self), last - first + 1), np.nan)
+        for kind, currency, entity, rows in self._groups():
+            if kind is Loan:
+                value, stream = self._loan_blocks(currency, rows)
+            else:
+                terms = self._linear_terms(kind, currency, entity, rows)
+                value = terms[0][:, np.newaxis] * terms[1]
+                stream = terms[2][:, np.newaxis] * terms[3]
+            held = self._held(rows)
+            values[rows] = np.where(held, value, np.nan)
+            streams[rows] = np.where(held, stream, np.nan)
+        return values, streams
+
+    def value_g_Au(self) -> Timeseries:
+        """value of every asset in gold over the period of the table, one row per
+        asset, NaN outside of its holding period"""
+        return self._timeseries(self._blocks()[0])
+
+    def stream_g_Au(self) -> Timeseries:
+        """stream of every asset in gold over the period of the table, one row per
+        asset, NaN outside of its holding period"""
+        return self._timeseries(self._blocks()[1])
+
+    def totals_g_Au(self) -> tuple[Timeseries, Timeseries]:
+        """value and cash flow of all the assets together, in gold. The cash flow
+        pays the value on the purchase month, receives the stream while holding
+        and the value on the sale month, like Asset.cash_flow_g_Au.
+
+        Only the loans are valued one by one: for the other kinds the coefficients
+        of the assets held on every month are summed with a running sum.
+        """
+        first, last = self.period
+        months = last - first + 1
+        value = np.zeros(months)
+        cash_flow = np.zeros(months)
+        for kind, currency, entity, rows in self._groups():
+            purchases = self.purchase_month[rows] - first
+            sales = self.sale_month[rows] - first
+            if kind is Loan:
+                loan_values, loan_streams = self._loan_blocks(currency, rows)
+                held = self._held(rows)
+                value += np.where(held, loan_values, 0).sum(axis=0)
+                cash_flow += np.where(held, loan_streams, 0).sum(axis=0)
+                purchase_values = loan_values[np.arange(len(rows)), purchases]
+                sale_values = loan_values[np.arange(len(rows)), sales]
+            else:
+                (
+                    coefficients,
+                    indicator,
+                    stream_coefficients,
+                    stream_indicator,
+                ) = self._linear_terms(kind, currency, entity, rows)
+                value += _held_sum(coefficients, indicator, purchases, sales)
+                cash_flow += _held_sum(
+                    stream_coefficients, stream_indicator, purchases, sales
+                )
+                purchase_values = coefficients * indicator[purchases]
+                sale_values = coefficients * indicator[sales]
+            np.subtract.at(cash_flow, purchases, purchase_values)
+            np.add.at(cash_flow, sales, sale_values)
+        return self._timeseries(value), self._timeseries(cash_flow)
+
+
+def _held_sum(
+    coefficients: np.ndarray,
+    indicator: np.ndarray,
+    purchases: np.ndarray,
+    sales: np.ndarray,
+) -> np.ndarray:
+    """sums on every month the coefficients of the assets held on that month and
+    multiplies them by the indicator. Months without holdings are zero, even where
+    the indicator is not defined."""
+    changes = np.zeros(len(indicator) + 1)
+    np.add.at(changes, purchases, coefficients)
+    np.subtract.at(changes, sales + 1, coefficients)
+    held = np.cumsum(changes[:-1])
+    holding = np.zeros(len(indicator), dtype=np.int64)
+    np.add.at(holding, purchases, 1)
+    np.subtract.at(holding, sales[sales + 1 < len(indicator)] + 1, 1)
+    return np.where(np.cumsum(holding) > 0, held * indicator, 0.0)
@@ -6,9 +6,14 @@ from dataclasses import dataclass
 from datetime import date
 from typing import Optional
 
+import numpy as np
+
+from .amortization import LINEAR, AmortizationSchedule, amortize
+from .cache import asset_key, cached_valuation, valuation_cache
+from .calendar import month_ordinal, month_ordinals, ordinal_to_date
 from .timeseries import (
+    DateOrderException,
     Timeseries,
-    linear_timeseries,
     constant_timeseries,
     months_in_interval,
 )
@@ -43,6 +48,64 @@ class Asset(ABC):
     def value_g_Au(self) -> Timeseries:
         """value of the asset over time measured in gold."""
 
+    @property
+    @cached_valuation
+    def cash_flow_g_Au(self) -> Timeseries:
+        """net cash produced by the ownership over time measured in gold. The
+        purchase is paid with the value of the asset, the stream_g_Au is received
+        while holding it and the sale returns its last value."""
+        stream_g_Au = self.stream_g_Au
+        value_g_Au = self.value_g_Au
+        start_date = min(stream_g_Au.start_date, value_g_Au.start_date)
+        end_date = max(stream_g_Au.end_date, value_g_Au.end_date)
+        paths_shape = np.broadcast_shapes(
+            stream_g_Au.paths_shape, value_g_Au.paths_shape
+        )
+        data = np.zeros(paths_shape + (months_in_interval(start_date, end_date),))
+        stream_index = months_in_interval(start_date, stream_g_Au.start_date) - 1
+        data[..., stream_index : stream_index + len(stream_g_Au)] += stream_g_Au.array
+        purchase_index = months_in_interval(start_date, value_g_Au.start_date) - 1
+        data[..., purchase_index] -= value_g_Au.array[..., 0]
+        sale_index = purchase_index + len(value_g_Au) - 1
+        data[..., sale_index] += value_g_Au.array[..., -1]
+        return Timeseries(start_date=start_date, end_date=end_date, data=data)
+
+    @property
+    def valuation_inputs(self) -> tuple[Timeseries, ...]:
+        """world indicators read by the valuation of the asset. The cached
+        valuations are reused as long as these indicators are the same objects."""
+        return (self.currency.units_per_g_Au,)
+
+    @property
+    def stream_end_date(self) -> date:
+        """last month of the stream_g_Au"""
+        return self.sale_date
+
+    def stream_at(self, day: date) -> float | np.ndarray:
+        """stream_g_Au of a single month, read from the world indicators of that
+        month only"""
+        return self.stream_g_Au[day]
+
+    def value_at(self, day: date) -> float | np.ndarray:
+        """value_g_Au of a single month, read from the world indicators of that
+        month only"""
+        return self.value_g_Au[day]
+
+    def cash_flow_at(self, day: date) -> float | np.ndarray:
+        """cash_flow_g_Au of a single month. Months outside of the ownership produce
+        no cash."""
+        month = month_ordinal(day)
+        purchase_month = month_ordinal(self.purchase_date)
+        sale_month = month_ordinal(self.sale_date)
+        cash_flow = 0.0
+        if purchase_month <= month <= month_ordinal(self.stream_end_date):
+            cash_flow = cash_flow + self.stream_at(day)
+        if month == purchase_month:
+            cash_flow = cash_flow - self.value_at(self.purchase_date)
+        if month == sale_month:
+            cash_flow = cash_flow + self.value_at(self.sale_date)
+        return cash_flow
+
 
 @dataclass(frozen=True, kw_only=True)
 class Stock(Asset):
@@ -51,18 +114,101 @@ class Stock(Asset):
     country: Country
 
     @property
+    def valuation_inputs(self) -> tuple[Timeseries, ...]:
+        return (self.country.stock_price, self.currency.units_per_g_Au)
+
+    @property
+    @cached_valuation
     def stream_g_Au(self) -> Timeseries:
         return constant_timeseries(0, self.purchase_date, self.sale_date)
 
     @property
+    def stock_price_g_Au(self) -> Timeseries:
+        """unit value of the stock in gold. The series of the country is shared by
+        the stocks bought in its currency."""
+        if self.currency is self.country.currency:
+            return self.country.stock_price_g_Au
+        return self.country.stock_price / self.currency.units_per_g_Au
+
+    @property
+    @cached_valuation
     def value_g_Au(self) -> Timeseries:
         initial_stock_unit_value = self.country.stock_price[self.purchase_date]
         bought_units_ts = constant_timeseries(
-            self.initial_value / initial_stock_unit_value, self.purchase_date, self.sale_date
+            self.initial_value / initial_stock_unit_value,
+            self.purchase_date,
+            self.sale_date,
+        )
+        return bought_units_ts * self.stock_price_g_Au
+
+    def stream_at(self, day: date) -> float:
+        return 0.0
+
+    def value_at(self, day: date) -> float | np.ndarray:
+        stock_price = self.country.stock_price
+        bought_units = self.initial_value / stock_price[self.purchase_date]
+        if self.currency is self.country.currency:
+            return bought_units * self.country.stock_price_g_Au[day]
+        return bought_units * stock_price[day] / self.currency.units_per_g_Au[day]
+
+    @classmethod
+    def batch_value_g_Au(
+        cls,
+        country: Country,
+        purchase_dates,
+        sale_dates,
+        amounts,
+        currency: Currency | None = None,
+    ) -> Timeseries:
+        """values many stock purchases in one vectorized computation, e.g. the
+        monthly lots of a dollar-cost-averaging strategy.
+
+        Args:
+            country (Country): the country of the stock
+            purchase_dates: purchase date of every lot (dates, datetime64 or month
+                ordinals)
+            sale_dates: sale date of every lot
+            amounts: amount invested in every lot, in the currency
+            currency (Currency): currency of the amounts, the currency of the
+                country by default
+
+        Returns:
+            Timeseries: from the first purchase to the last sale, holding one row
+                per lot (the leading axis) with the value of the lot in gold while
+                it is held and NaN outside of its holding period
+        """
+        currency = country.currency if currency is None else currency
+        purchase_months = month_ordinals(purchase_dates)
+        sale_months = month_ordinals(sale_dates)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if np.any(purchase_months > sale_months):
+            first_wrong = int(np.argmax(purchase_months > sale_months))
+            raise DateOrderException(
+                start_date=ordinal_to_date(purchase_months[first_wrong]),
+                end_date=ordinal_to_date(sale_months[first_wrong]),
+                message=f"""lot {first_wrong} is sold before it is purchased""",
+            )
+        if currency is country.currency:
+            stock_price_g_Au = country.stock_price_g_Au
+        else:
+            stock_price_g_Au = country.stock_price / currency.units_per_g_Au
+        first_month, last_month = purchase_months.min(), sale_months.max()
+        prices = stock_price_g_Au.window(first_month, last_month).array
+        # units bought by every lot, the lots being the leading axis
+        units = amounts / country.stock_price.take(purchase_months)
+        units = np.moveaxis(np.asarray(units), -1, 0)
+        values = units[..., np.newaxis] * prices
+        months = np.arange(last_month - first_month + 1) + first_month
+        held = (months >= purchase_months[:, np.newaxis]) & (
+            months <= sale_months[:, np.newaxis]
+        )
+        held = held.reshape(held.shape[:1] + (1,) * (values.ndim - 2) + held.shape[1:])
+        values[~np.broadcast_to(held, values.shape)] = np.nan
+        return Timeseries(
+            start_date=ordinal_to_date(first_month),
+            end_date=ordinal_to_date(last_month),
+            data=values,
         )
-        value_local_currency = bought_units_ts * self.country.stock_price
-        value_g_Au = value_local_currency / self.currency.units_per_g_Au
-        return value_g_Au
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -73,19 +219,44 @@ class RealEstateProperty(Asset):
     surface_sqm: float
 
     @property
+    def valuation_inputs(self) -> tuple[Timeseries, ...]:
+        return (
+            self.city.sqm_housing_price,
+            self.city.yearly_price_to_rent_index,
+            self.currency.units_per_g_Au,
+        )
+
+    @property
+    def sqm_housing_price_g_Au(self) -> Timeseries:
+        """price of a square meter in gold. The series of the city is shared by the
+        properties bought in its currency."""
+        if self.currency is self.city.country.currency:
+            return self.city.sqm_housing_price_g_Au
+        return self.city.sqm_housing_price / self.currency.units_per_g_Au
+
+    @property
+    @cached_valuation
     def stream_g_Au(self) -> Timeseries:
-        """TODO: computed value of the stream based on the country indicators"""
-        stream_g_Au = (self.value_g_Au / self.city.yearly_price_to_rent_index)
-        return stream_g_Au
+        """monthly rent: the value of the property times the monthly rent yield of
+        the city"""
+        return self.value_g_Au * self.city.monthly_rent_yield
 
     @property
+    @cached_valuation
     def value_g_Au(self) -> Timeseries:
-        value_local_currency = (
+        return (
             constant_timeseries(self.surface_sqm, self.purchase_date, self.sale_date)
-            * self.city.sqm_housing_price
+            * self.sqm_housing_price_g_Au
         )
-        value_g_Au = value_local_currency / self.currency.units_per_g_Au
-        return value_g_Au
+
+    def stream_at(self, day: date) -> float | np.ndarray:
+        return self.value_at(day) * self.city.monthly_rent_yield[day]
+
+    def value_at(self, day: date) -> float | np.ndarray:
+        if self.currency is self.city.country.currency:
+            return self.surface_sqm * self.city.sqm_housing_price_g_Au[day]
+        sqm_price = self.city.sqm_housing_price[day]
+        return self.surface_sqm * sqm_price / self.currency.units_per_g_Au[day]
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -95,60 +266,119 @@ class CommodityBundle(Asset):
     commodity: Commodity
 
     @property
+    def valuation_inputs(self) -> tuple[Timeseries, ...]:
+        return (self.commodity.units_per_g_Au,)
+
+    @property
+    @cached_valuation
     def stream_g_Au(self) -> Timeseries:
         return constant_timeseries(0, self.purchase_date, self.sale_date)
 
     @property
+    @cached_valuation
     def value_g_Au(self) -> Timeseries:
         return (
             constant_timeseries(self.initial_value, self.purchase_date, self.sale_date)
             / self.commodity.units_per_g_Au
         )
 
+    def stream_at(self, day: date) -> float:
+        return 0.0
+
+    def value_at(self, day: date) -> float | np.ndarray:
+        return self.initial_value / self.commodity.units_per_g_Au[day]
+
 
 @dataclass(frozen=True, kw_only=True)
 class Saving(Asset):
     """Saving account. All sales should result in a new saving"""
 
     @property
+    @cached_valuation
     def stream_g_Au(self) -> Timeseries:
         return constant_timeseries(0, self.purchase_date, self.sale_date)
 
     @property
+    @cached_valuation
     def value_g_Au(self) -> Timeseries:
         return (
             constant_timeseries(self.initial_value, self.purchase_date, self.sale_date)
             / self.currency.units_per_g_Au
         )
 
+    def stream_at(self, day: date) -> float:
+        return 0.0
+
+    def value_at(self, day: date) -> float | np.ndarray:
+        return self.initial_value / self.currency.units_per_g_Au[day]
+
 
 @dataclass(frozen=True, kw_only=True)
 class Loan(Asset):
-    """Represents a loan. Will have a negative value_g_Au and a negative cost"""
+    """Represents a loan. Will have a negative value_g_Au and a negative cost.
+
+    The loan is granted on the purchase date and repaid monthly until its end date
+    following its amortization method (amortization.LINEAR or
+    amortization.ANNUITY) at the interest rate of its currency. Selling the loan
+    repays the remaining balance."""
 
     end_date: date
+    amortization: str = LINEAR
+
+    @property
+    def valuation_inputs(self) -> tuple[Timeseries, ...]:
+        return (self.currency.interest_rate, self.currency.units_per_g_Au)
+
+    @property
+    def schedule(self) -> AmortizationSchedule:
+        """amortization schedule of the loan in its currency, computed once"""
+        return valuation_cache.get_or_compute(
+            ("schedule",) + asset_key(self),
+            (self.currency.interest_rate,),
+            lambda: amortize(
+                self.initial_value,
+                self.currency.interest_rate,
+                self.purchase_date,
+                self.end_date,
+                self.amortization,
+            ),
+        )
+
+    def _held(self, ts: Timeseries) -> Timeseries:
+        """the months of a schedule series from the purchase to the sale of the
+        loan, zero after the end of the loan"""
+        no_months = months_in_interval(self.purchase_date, self.sale_date)
+        data = np.zeros(ts.paths_shape + (no_months,))
+        kept = min(no_months, len(ts))
+        data[..., :kept] = ts.array[..., :kept]
+        return Timeseries(
+            start_date=self.purchase_date, end_date=self.sale_date, data=data
+        )
 
     @property
+    @cached_valuation
     def stream_g_Au(self) -> Timeseries:
-        monthly_repay_value = self.initial_value / months_in_interval(self.purchase_date, self.end_date)
-        monthly_repay_value_time_series = constant_timeseries(
-            monthly_repay_value, self.purchase_date, self.end_date
-        )/self.currency.units_per_g_Au
-        monthly_interest_value = self.value_g_Au * self.currency.interest_rate
-        stream_g_Au = monthly_interest_value + monthly_repay_value_time_series
-        # final_payment
-        stream_g_Au.data[-1] = self.value_g_Au.data[-1]
-        return stream_g_Au
+        return self._held(self.schedule.payment) / self.currency.units_per_g_Au
 
     @property
+    @cached_valuation
     def value_g_Au(self) -> Timeseries:
-        value_local_currency = linear_timeseries(
-            self.initial_value,
-            1 / months_in_interval(self.purchase_date, self.end_date),
-            self.purchase_date,
-            self.sale_date,
-        )
-        return value_local_currency / self.currency.units_per_g_Au
+        return self._held(self.schedule.balance) / self.currency.units_per_g_Au
+
+    def _scheduled_at(self, ts: Timeseries, day: date) -> float | np.ndarray:
+        """a schedule series on a month of the ownership, zero after the end of the
+        loan"""
+        if month_ordinal(day) > ts.end_month:
+            return 0.0
+        return ts[day]
+
+    def stream_at(self, day: date) -> float | np.ndarray:
+        payment = self._scheduled_at(self.schedule.payment, day)
+        return payment / self.currency.units_per_g_Au[day]
+
+    def value_at(self, day: date) -> float | np.ndarray:
+        balance = self._scheduled_at(self.schedule.balance, day)
+        return balance / self.currency.units_per_g_Au[day]
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -160,11 +390,23 @@ class Job(Asset):
     monthly_saving: int
 
     @property
+    def valuation_inputs(self) -> tuple[Timeseries, ...]:
+        return ()
+
+    @property
+    @cached_valuation
     def stream_g_Au(self) -> Timeseries:
         return constant_timeseries(
             self.monthly_saving, self.purchase_date, self.sale_date
         )
 
     @property
+    @cached_valuation
     def value_g_Au(self) -> Timeseries:
         return constant_timeseries(0, self.purchase_date, self.sale_date)
+
+    def stream_at(self, day: date) -> float:
+        return float(self.monthly_saving)
+
+    def value_at(self, day: date) -> float:
+        return 0.0
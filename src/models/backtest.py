@@ -0,0 +1,225 @@
+"""Backtests of fixed strategies over every start month of the history
+
+A strategy bought on month s and sold H months later produces its cash flows from
+the indicators of the months s to s + H. Instead of building and valuing one asset
+per start month, which costs O(T x H), the cash flows of every window are read from
+prefix sums (and prefix products for the interest rates) of the indicators: O(T)
+for all the start months at once.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+from .amortization import ANNUITY, LINEAR, METHODS
+from .calendar import ordinal_to_date
+from .timeseries import IncludePeriodMismatch, Timeseries
+from .world import City, Country, Currency
+
+
+@dataclass(frozen=True)
+class BacktestTable:
+    """Outcome of a strategy for every start month.
+
+    Attributes:
+        purchase_months (np.ndarray): month ordinal of every purchase
+        holding_months (int): months between the purchase and the sale
+        invested_g_Au (np.ndarray): gold paid on the purchase month, net of the
+            borrowed amount
+        net_g_Au (np.ndarray): sum of the cash flows of the strategy from the
+            purchase to the sale, the purchase included
+    """
+
+    purchase_months: np.ndarray
+    holding_months: int
+    invested_g_Au: np.ndarray
+    net_g_Au: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.purchase_months)
+
+    @property
+    def purchase_dates(self) -> list[date]:
+        return [ordinal_to_date(month) for month in self.purchase_months.tolist()]
+
+    @property
+    def returns(self) -> np.ndarray:
+        """total return of every start month, in gold"""
+        return self.net_g_Au / self.invested_g_Au
+
+    @property
+    def annualized_returns(self) -> np.ndarray:
+        """yearly return of every start month, NaN when the investment is lost"""
+        with np.errstate(invalid="ignore"):
+            return np.power(1 + self.returns, 12 / self.holding_months) - 1
+
+    def quantiles(
+        self, q: tuple[float, ...] = (0.05, 0.25, 0.5, 0.75, 0.95)
+    ) -> dict[float, float]:
+        """returns the quantiles of the total returns over the start months"""
+        return dict(zip(q, np.nanquantile(self.returns, q).tolist()))
+
+    def to_pandas(self):
+        """returns the outcomes as a DataFrame indexed by the purchase month"""
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "invested_g_Au": self.invested_g_Au,
+                "net_g_Au": self.net_g_Au,
+                "return": self.returns,
+                "annualized_return": self.annualized_returns,
+            },
+            index=pd.Index(self.purchase_dates, name="purchase"),
+        )
+
+
+def _aligned(span: int, *series: Timeseries) -> tuple[int, list[np.ndarray]]:
+    """returns the first month of the period common to the series and their data
+    over it. Windows of span months have to fit in the period."""
+    for ts in series:
+        if ts.paths_shape:
+            raise ValueError(
+                f"backtests read single path indicators, got {ts.paths_shape} paths"
+            )
+    first = max(ts.start_month for ts in series)
+    last = min(ts.end_month for ts in series)
+    if last - first < span:
+        raise IncludePeriodMismatch(
+            message=f"""the indicators have no common period of {span + 1} months to backtest""",
+        )
+    return first, [ts.window(first, last).array for ts in series]
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """prefix sums with a leading zero: sum(values[a:b]) = prefix[b] - prefix[a]"""
+    return np.concatenate(([0.0], np.cumsum(values)))
+
+
+def backtest_stock(
+    country: Country,
+    holding_months: int,
+    amount: float = 1.0,
+    currency: Currency | None = None,
+) -> BacktestTable:
+    """backtests buying a Stock lot of the country for a fixed amount and holding
+    it for holding_months, for every start month of the history.
+
+    Args:
+        country (Country): the country of the stock index
+        holding_months (int): months between the purchase and the sale
+        amount (float): amount invested, in the currency
+        currency (Currency): currency of the amount, the currency of the country
+            by default
+    """
+    currency = country.currency if currency is None else currency
+    first, (stock_price, units) = _aligned(
+        holding_months, country.stock_price, currency.units_per_g_Au
+    )
+    stock_price_g_Au = stock_price / units
+    no_windows = len(stock_price) - holding_months
+    bought = amount / stock_price[:no_windows]
+    invested = bought * stock_price_g_Au[:no_windows]
+    sold = bought * stock_price_g_Au[holding_months:]
+    return BacktestTable(
+        purchase_months=first + np.arange(no_windows),
+        holding_months=holding_months,
+        invested_g_Au=invested,
+        net_g_Au=sold - invested,
+    )
+
+
+def backtest_property(
+    city: City,
+    holding_months: int,
+    surface_sqm: float = 1.0,
+    loan_share: float = 0.0,
+    loan_months: int | None = None,
+    amortization: str = LINEAR,
+) -> BacktestTable:
+    """backtests buying a RealEstateProperty of the city, rented out and sold after
+    holding_months, for every start month of the history. A share of the price
+    can be borrowed with a Loan in the currency of the city, granted on the
+    purchase month and sold (repaid) with the property.
+
+    Args:
+        city (City): the city of the property
+        holding_months (int): months between the purchase and the sale
+        surface_sqm (float): surface of the property
+        loan_share (float): share of the price borrowed
+        loan_months (int): months of repayment of the loan, holding_months by
+            default. The interest rates have to cover the whole term.
+        amortization (str): amortization method of the loan
+    """
+    if amortization not in METHODS:
+        raise ValueError(
+            f"unknown amortization method {amortization}, expected {METHODS}"
+        )
+    loan_months = holding_months if loan_months is None else loan_months
+    currency = city.country.currency
+    span = max(holding_months, loan_months) if loan_share else holding_months
+    first, (sqm_price, yearly_index, units, rate) = _aligned(
+        span,
+        city.sqm_housing_price,
+        city.yearly_price_to_rent_index,
+        currency.units_per_g_Au,
+        currency.interest_rate,
+    )
+    no_windows = len(sqm_price) - span
+    starts = np.arange(no_windows)
+    sales = starts + holding_months
+    value_g_Au = surface_sqm * sqm_price / units
+    # the rent is received from the purchase month to the sale month included
+    rent = _prefix(value_g_Au / (12 * yearly_index))
+    invested = value_g_Au[starts]
+    net = value_g_Au[sales] - invested + rent[sales + 1] - rent[starts]
+
+    if loan_share:
+        # the loan is a negative principal in the currency, received on purchase
+        principal = -loan_share * surface_sqm * sqm_price[starts]
+        received = -principal / units[starts]
+        invested = invested - received
+        repaid_months = min(holding_months, loan_months)
+        paid_until = starts + repaid_months
+        per_unit = _prefix(1 / units)
+        if amortization == ANNUITY:
+            # discount of month j to month 0: prod(1 / (1 + r_k), k <= j)
+            discount = np.cumprod(1 / (1 + rate))
+            discount_sums = _prefix(discount)
+            annuity_factor = (
+                discount_sums[starts + loan_months + 1] - discount_sums[starts + 1]
+            ) / discount[starts]
+            payment = principal / annuity_factor
+            payments = payment * (per_unit[paid_until + 1] - per_unit[starts + 1])
+            if holding_months < loan_months:
+                paid_factor = (
+                    discount_sums[sales + 1] - discount_sums[starts + 1]
+                ) / discount[starts]
+                sale_discount = discount[sales] / discount[starts]
+                balance = (principal - payment * paid_factor) / sale_discount
+            else:
+                balance = np.zeros(no_windows)
+        else:
+            # the principal is repaid in equal parts, the interest being paid on
+            # the balance of the previous month: P (1 - (j - s - 1) / n) r_j
+            months = np.arange(len(rate))
+            rates = _prefix(rate / units)
+            weighted_rates = _prefix(months * rate / units)
+            payments = principal / loan_months * (
+                per_unit[paid_until + 1] - per_unit[starts + 1]
+            ) + principal * (
+                (1 + (starts + 1) / loan_months)
+                * (rates[paid_until + 1] - rates[starts + 1])
+                - (weighted_rates[paid_until + 1] - weighted_rates[starts + 1])
+                / loan_months
+            )
+            balance = principal * max(1 - holding_months / loan_months, 0.0)
+        net = net + received + payments + balance / units[sales]
+
+    return BacktestTable(
+        purchase_months=first + starts,
+        holding_months=holding_months,
+        invested_g_Au=invested,
+        net_g_Au=net,
+    )
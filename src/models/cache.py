@@ -0,0 +1,176 @@
+"""Memoization of the valuations computed by the assets
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from functools import wraps
+from threading import Lock
+from typing import Callable, Hashable
+
+import numpy as np
+
+from .timeseries import Timeseries, is_lazy
+from .world import City, Commodity, Country, Currency, invalidate_derived
+
+WORLD_ENTITIES = (Currency, Country, City, Commodity)
+
+
+@dataclass(frozen=True)
+class CacheInfo:
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+    nbytes: int
+    max_bytes: int | None
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ValuationCache:
+    """A bounded least recently used cache of computed timeseries.
+
+    Every entry is keyed on the asset description and on the identity of the world
+    indicators read to compute it. The indicators are referenced by the entry, so
+    their identity cannot be reused while the entry lives. Indicators modified in
+    place have to be invalidated explicitly.
+
+    The cache is bounded by its number of entries and by the bytes of the arrays
+    they hold, as the valuations on scenario worlds hold one row per path.
+
+    Arguments:
+        maxsize (int): maximum number of entries. 0 disables the cache
+        max_bytes (int): maximum bytes of the cached arrays, None for no limit
+    """
+
+    def __init__(self, maxsize: int = 4096, max_bytes: int | None = 256 * 2**20):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries: OrderedDict[Hashable, tuple[Timeseries, tuple, int]] = (
+            OrderedDict()
+        )
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(
+        self, key: Hashable, inputs: tuple, compute: Callable[[], Timeseries]
+    ) -> Timeseries:
+        """returns the cached timeseries (or other valuation result, e.g. an
+        amortization schedule) for the key or computes and stores it.
+
+        Args:
+            key (Hashable): description of the computation
+            inputs (tuple): timeseries read by the computation
+            compute (Callable): computes the timeseries on a cache miss
+        """
+        key = (key, tuple(id(series) for series in inputs))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+            self.misses += 1
+
+        result = compute()
+        if self.maxsize <= 0:
+            return result
+        if isinstance(getattr(result, "data", None), np.ndarray):
+            # cached results are shared between callers
+            result.data.flags.writeable = False
+        nbytes = _nbytes(result)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries[key][2]
+            self._entries[key] = (result, inputs, nbytes)
+            self._entries.move_to_end(key)
+            self.nbytes += nbytes
+            # a result larger than max_bytes is returned without being kept
+            while self._entries and (
+                len(self._entries) > self.maxsize
+                or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+            ):
+                self.nbytes -= self._entries.popitem(last=False)[1][2]
+        return result
+
+    def invalidate(self, series: Timeseries | None = None) -> None:
+        """drops the entries computed from the given indicator, or every entry when
+        no indicator is given. The derived series of the world entities computed
+        from it are dropped too."""
+        invalidate_derived(series)
+        with self._lock:
+            if series is None:
+                self._entries.clear()
+                self.nbytes = 0
+                return
+            stale = [
+                key
+                for key, (_, inputs, _) in self._entries.items()
+                if any(series is used for used in inputs)
+            ]
+            for key in stale:
+                self.nbytes -= self._entries.pop(key)[2]
+
+    def reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            size=len(self._entries),
+            maxsize=self.maxsize,
+            nbytes=self.nbytes,
+            max_bytes=self.max_bytes,
+        )
+
+
+def _nbytes(result) -> int:
+    """bytes of the arrays held by a cached timeseries, or by the timeseries fields
+    of a result such as an amortization schedule. Symbolic timeseries hold none."""
+    if isinstance(result, Timeseries):
+        data = vars(result).get("data")
+        return data.nbytes if isinstance(data, np.ndarray) else 0
+    if is_dataclass(result):
+        return sum(_nbytes(getattr(result, field.name)) for field in fields(result))
+    return 0
+
+
+valuation_cache = ValuationCache()
+
+
+def asset_key(asset) -> tuple:
+    """describes an asset by its type and the fields that are not world entities.
+    The world entities are described by the indicators the asset reads."""
+    return (type(asset),) + tuple(
+        getattr(asset, field.name)
+        for field in fields(asset)
+        if not isinstance(getattr(asset, field.name), WORLD_ENTITIES)
+    )
+
+
+def cached_valuation(method: Callable) -> Callable:
+    """memoizes an asset valuation in the valuation cache. The asset has to list the
+    indicators it reads in its valuation_inputs property."""
+
+    @wraps(method)
+    def wrapper(asset) -> Timeseries:
+        if is_lazy():
+            # the expression graph merges the repeated computations
+            return method(asset)
+        return valuation_cache.get_or_compute(
+            (method.__name__,) + asset_key(asset),
+            asset.valuation_inputs,
+            lambda: method(asset),
+        )
+
+    return wrapper
@@ -0,0 +1,34 @@
+"""Month ordinals: the internal time key of the timeseries
+
+The ordinal of a month counts the months since January of year 0, so the number of
+months between two dates is a subtraction and the index of a date in a timeseries
+is its ordinal minus the ordinal of the start of the timeseries.
+"""
+
+from datetime import date
+from typing import Iterable
+
+import numpy as np
+
+# ordinal of January 1970, the origin of numpy datetime64 months
+EPOCH_ORDINAL = 1970 * 12
+
+
+def month_ordinal(day: date) -> int:
+    """returns the ordinal of the month of a date"""
+    return day.year * 12 + day.month - 1
+
+
+def ordinal_to_date(ordinal: int) -> date:
+    """returns the first day of the month of an ordinal"""
+    return date(ordinal // 12, ordinal % 12 + 1, 1)
+
+
+def month_ordinals(days: Iterable[date] | np.ndarray) -> np.ndarray:
+    """returns the ordinals of many dates at once. The dates can be date objects,
+    numpy datetime64 values or month ordinals already."""
+    days = np.asarray(days)
+    if np.issubdtype(days.dtype, np.integer):
+        return days.astype(np.int64)
+    months = days.astype("datetime64[M]").astype(np.int64)
+    return months + EPOCH_ORDINAL
@@ -1,11 +1,33 @@
 """A characted definition"""
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import date
 
-from .world import Currency
+import numpy as np
+
+from .world import Currency, World
 from .assets import Asset
-from .timeseries import DateOrderException, Timeseries
+from .ledger import CapitalLedger
+from .timeseries import DateOrderException, Timeseries, months_in_interval
+
+
+class SaleAfterEndOfLife(Exception):
+    """An asset is held after the end of life of its owner"""
+
+    def __init__(self, sale_date: date, end_of_life: date, message: str):
+        self.sale_date = sale_date
+        self.end_of_life = end_of_life
+        self.message = message
+        super().__init__(message)
+
+
+class LackOfFunds(Exception):
+    """A change of ownership would make the capital negative"""
+
+    def __init__(self, lowest_capital: float, message: str):
+        self.lowest_capital = lowest_capital
+        self.message = message
+        super().__init__(message)
 
 
 @dataclass
@@ -15,6 +37,12 @@ class Character:
     end_of_life: date
     initial_capital_g_Au: float = 0
     assets: list[Asset] = field(default_factory=list)
+    _ledger: CapitalLedger | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _ledger_key: tuple | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         if self.start_investment_date > self.end_of_life:
@@ -25,29 +53,117 @@ class Character:
                          is later than its end of life {self.end_of_life}""",
             )
 
+    def _ledger_state(self) -> tuple:
+        """what the ledger is built from"""
+        return (
+            self.start_investment_date,
+            self.end_of_life,
+            self.initial_capital_g_Au,
+            tuple(id(asset) for asset in self.assets),
+        )
+
+    @property
+    def ledger(self) -> CapitalLedger:
+        """monthly cash flows of the owned assets from the start of the investments
+        to the end of life. It is built again when the period, the initial
+        capital or the owned assets changed since it was last read."""
+        key = self._ledger_state()
+        if self._ledger is None or self._ledger_key != key:
+            self._ledger = CapitalLedger(
+                self.start_investment_date, self.end_of_life, self.initial_capital_g_Au
+            )
+            for asset in self.assets:
+                self._ledger.add(asset.cash_flow_g_Au)
+            self._ledger_key = key
+        return self._ledger
+
     @property
     def capital_g_Au(self) -> Timeseries:
-        """TODO computed capital over time. This is the initial capital summed up with all the
+        """computed capital over time. This is the initial capital summed up with all the
         streams produced by the owned assets. This capital can never be negative. An ownership
         cannot be added or removed if it produces a negative capital value"""
-        pass
+        return self.ledger.capital
+
+    def rebind(self, world: World) -> "Character":
+        """returns the character owning the same assets valued in another world,
+        e.g. a fork: the assets reference the entities of that world"""
+        return replace(self, assets=[world.rebind(asset) for asset in self.assets])
 
     @property
+    def wealth_g_Au(self) -> Timeseries:
+        """computed wealth over time measured in gold: the capital and the value
+        of the owned assets. On the sale month the value of an asset is already
+        part of the capital."""
+        capital_g_Au = self.capital_g_Au
+        wealth_g_Au = capital_g_Au.array.copy()
+        for asset in self.assets:
+            wealth_g_Au = self.add_held_value(wealth_g_Au, asset.value_g_Au)
+        return Timeseries(
+            start_date=capital_g_Au.start_date,
+            end_date=capital_g_Au.end_date,
+            data=wealth_g_Au,
+        )
+
+    def add_held_value(
+        self, wealth_g_Au: np.ndarray, value_g_Au: Timeseries, sign: float = 1
+    ) -> np.ndarray:
+        """adds the value of an asset to the wealth of the months it is held,
+        before its sale month. Returns the wealth, broadcast to the paths of the
+        value if needed."""
+        first = (
+            months_in_interval(self.start_investment_date, value_g_Au.start_date) - 1
+        )
+        values = value_g_Au.array[..., :-1]
+        if first < 0:
+            values, first = values[..., -first:], 0
+        values = values[..., : max(wealth_g_Au.shape[-1] - first, 0)]
+        if np.shape(values)[:-1] != wealth_g_Au.shape[:-1]:
+            shape = np.broadcast_shapes(values.shape[:-1], wealth_g_Au.shape[:-1])
+            wealth_g_Au = np.broadcast_to(
+                wealth_g_Au, shape + wealth_g_Au.shape[-1:]
+            ).copy()
+        wealth_g_Au[..., first : first + values.shape[-1]] += sign * values
+        return wealth_g_Au
+
     def wealth(self, currency: Currency) -> Timeseries:
-        """TODO computed wealth over time of the character in a give
-        currency.
+        """computed wealth over time of the character in a give
+        currency: the capital and the value of the owned assets. On the sale
+        month the value of an asset is already part of the capital.
         """
-        pass
+        return self.wealth_g_Au * currency.units_per_g_Au
 
     def add_ownership(self, asset: Asset) -> None:
         """adds an asset ownership to the character. The asset should
         contain the purchase and sale time.
 
         raises:
+        * purchase before the start of the investments: the ledger holds no month
+                to pay it
         * sale exceed end of life
         * asset cannot be added at date: lack of funds
         """
-        pass
+        if asset.purchase_date < self.start_investment_date:
+            raise DateOrderException(
+                start_date=asset.purchase_date,
+                end_date=self.start_investment_date,
+                message=f"""asset purchase date {asset.purchase_date} is before the start
+                         investment date {self.start_investment_date} of {self.name}""",
+            )
+        if asset.sale_date is None or asset.sale_date > self.end_of_life:
+            raise SaleAfterEndOfLife(
+                sale_date=asset.sale_date,
+                end_of_life=self.end_of_life,
+                message=f"""asset sale date {asset.sale_date} is not before the end of
+                         life {self.end_of_life} of {self.name}""",
+            )
+        if not self.ledger.try_add(asset.cash_flow_g_Au):
+            raise LackOfFunds(
+                lowest_capital=self.ledger.lowest_capital,
+                message=f"""{self.name} lacks the funds to buy the asset purchased on
+                         {asset.purchase_date}""",
+            )
+        self.assets.append(asset)
+        self._ledger_key = self._ledger_state()
 
     def remove_ownership(self, asset: Asset) -> None:
         """removes an asset ownership to the character. The asset should
@@ -57,4 +173,12 @@ class Character:
         * asset removal produces a negative capital balance (e.g. lack of funds if
                 a loan is removed)
         """
-        pass
+        index = self.assets.index(asset)
+        if not self.ledger.try_add(asset.cash_flow_g_Au, sign=-1):
+            raise LackOfFunds(
+                lowest_capital=self.ledger.lowest_capital,
+                message=f"""removing the asset purchased on {asset.purchase_date}
+                         leaves {self.name} without funds""",
+            )
+        del self.assets[index]
+        self._ledger_key = self._ledger_state()
@@ -0,0 +1,270 @@
+"""Reading and writing worlds as directories of indicator CSV files
+
+A world directory holds a ``world.json`` file describing the entities and one CSV
+file per indicator::
+
+    world.json
+    currencies/EUR/interest_rate.csv
+    currencies/EUR/units_per_g_Au.csv
+    countries/France/stock_price.csv
+    cities/Paris/sqm_housing_price.csv
+    ...
+
+Every CSV file has a ``month`` column (``2024-01`` or ``2024-01-01``) followed by
+one value column per path.
+
+The entities are the directories of the layout. ``world.json`` gives the name of
+the world and the attributes of the entities that are not indicators, such as the
+entities they reference: without it, only the entities made of indicators alone
+can be loaded.
+"""
+
+import asyncio
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import get_type_hints
+
+import numpy as np
+
+from .calendar import month_ordinals, ordinal_to_date
+from .timeseries import Timeseries, timeseries_from_months
+from .world import ENTITY_KINDS, World
+
+WORLD_FILE = "world.json"
+
+
+@dataclass(frozen=True)
+class LoadFailure:
+    """a file or an entity that could not be loaded"""
+
+    path: Path
+    error: Exception
+
+
+@dataclass(frozen=True)
+class WorldLoad:
+    """the world assembled from the files that could be loaded, and the failures.
+    The entities whose indicators failed are missing from the world, as well as
+    the entities referencing them."""
+
+    world: World
+    failures: list[LoadFailure]
+
+
+def _indicator_fields(entity_class: type) -> list[str]:
+    types = get_type_hints(entity_class)
+    return [
+        field.name for field in fields(entity_class) if types[field.name] is Timeseries
+    ]
+
+
+def _reference_fields(entity_class: type) -> dict[str, str]:
+    """the fields referencing other entities, and the kind of these entities"""
+    types = get_type_hints(entity_class)
+    return {
+        field.name: ENTITY_KINDS[types[field.name]]
+        for field in fields(entity_class)
+        if types[field.name] in ENTITY_KINDS
+    }
+
+
+def _check_description(description) -> dict:
+    """checks the structure of a world.json description: an object naming the
+    world, listing the entities of each kind as objects with a name"""
+    if not isinstance(description, dict):
+        raise ValueError(f"{WORLD_FILE} does not hold an object")
+    if not isinstance(description.get("name"), str):
+        raise ValueError(f"{WORLD_FILE} does not name the world")
+    for kind in ENTITY_KINDS.values():
+        entities = description.get(kind, [])
+        if not isinstance(entities, list):
+            raise ValueError(f"the {kind} of {WORLD_FILE} are not a list")
+        for attributes in entities:
+            if not isinstance(attributes, dict) or not isinstance(
+                attributes.get("name"), str
+            ):
+                raise ValueError(
+                    f"the {kind} of {WORLD_FILE} hold an entity without a name"
+                )
+    return description
+
+
+def _discover(directory: Path, description: dict) -> dict:
+    """adds the entities found in the directories of the layout to the
+    description read from world.json"""
+    for kind in ENTITY_KINDS.values():
+        entities = description.setdefault(kind, [])
+        described = {attributes["name"] for attributes in entities}
+        kind_directory = directory / kind
+        if not kind_directory.is_dir():
+            continue
+        for entity_directory in sorted(kind_directory.iterdir()):
+            if entity_directory.is_dir() and entity_directory.name not in described:
+                entities.append({"name": entity_directory.name})
+    return description
+
+
+def read_series_csv(path: str | Path) -> Timeseries:
+    """reads an indicator CSV file. The months have to follow each other without
+    gaps, as the data of a timeseries does."""
+    with open(path, newline="") as file:
+        rows = list(csv.reader(file))
+    header, rows = rows[0], [row for row in rows[1:] if row]
+    if not rows:
+        raise ValueError(f"indicator file {path} holds no month")
+    months = month_ordinals(np.array([row[0] for row in rows], dtype="datetime64[M]"))
+    values = np.array([row[1:] for row in rows], dtype=np.float64)
+    # one column per path, the months being the last axis of the data
+    data = values[:, 0] if len(header) == 2 else values.T
+    return timeseries_from_months(months, data, source=str(path))
+
+
+def write_series_csv(ts: Timeseries, path: str | Path) -> None:
+    data = ts.array.reshape(-1, len(ts))
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        if len(data) == 1:
+            writer.writerow(["month", "value"])
+        else:
+            writer.writerow(["month"] + [f"path {i}" for i in range(len(data))])
+        for index in range(len(ts)):
+            month = ordinal_to_date(ts.start_month + index).strftime("%Y-%m")
+            writer.writerow(
+                [month] + [repr(value) for value in data[:, index].tolist()]
+            )
+
+
+def write_world_csv(world: World, directory: str | Path) -> None:
+    """writes a world as a directory of indicator CSV files and a world.json file
+    describing the entities"""
+    directory = Path(directory)
+    description = {"name": world.name}
+    for entity_class, kind in ENTITY_KINDS.items():
+        description[kind] = []
+        for entity in getattr(world, kind):
+            attributes = {}
+            for field in fields(entity):
+                value = getattr(entity, field.name)
+                if type(value) in ENTITY_KINDS:
+                    attributes[field.name] = value.name
+                elif isinstance(value, Timeseries):
+                    entity_directory = directory / kind / entity.name
+                    entity_directory.mkdir(parents=True, exist_ok=True)
+                    write_series_csv(value, entity_directory / f"{field.name}.csv")
+                else:
+                    attributes[field.name] = value
+            description[kind].append(attributes)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / WORLD_FILE).write_text(json.dumps(description, indent=2))
+
+
+async def load_world_csv(
+    directory: str | Path, max_workers: int | None = None
+) -> WorldLoad:
+    """loads a world directory, reading and parsing the indicator files
+    concurrently in a thread pool. A file that cannot be read does not stop the
+    others: it is reported in the failures, with the entities depending on it. A
+    missing or invalid world.json file is reported too, the entities being then
+    discovered from the directories.
+
+    Args:
+        directory (Path): the world directory
+        max_workers (int): number of threads parsing files
+
+    Returns:
+        WorldLoad: the world and the failures
+    """
+    directory = Path(directory)
+    loop = asyncio.get_running_loop()
+    failures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            text = await loop.run_in_executor(
+                executor, (directory / WORLD_FILE).read_text
+            )
+            description = _check_description(json.loads(text))
+        except (OSError, ValueError) as error:
+            failures.append(LoadFailure(path=directory / WORLD_FILE, error=error))
+            description = {"name": directory.name}
+        description = await loop.run_in_executor(
+            executor, _discover, directory, description
+        )
+        paths = {
+            (kind, attributes["name"], name): directory
+            / kind
+            / attributes["name"]
+            / f"{name}.csv"
+            for entity_class, kind in ENTITY_KINDS.items()
+            for attributes in description[kind]
+            for name in _indicator_fields(entity_class)
+        }
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, read_series_csv, path)
+                for path in paths.values()
+            ),
+            return_exceptions=True,
+        )
+    series = dict(zip(paths, results))
+    return _assemble(description, directory, paths, series, failures)
+
+
+def _assemble(
+    description: dict,
+    directory: Path,
+    paths: dict,
+    series: dict,
+    failures: list[LoadFailure],
+) -> WorldLoad:
+    failures = failures + [
+        LoadFailure(path=paths[key], error=result)
+        for key, result in series.items()
+        if isinstance(result, Exception)
+    ]
+    entities = {}
+    world_entities = {}
+    # the entity kinds are listed after the kinds they reference
+    for entity_class, kind in ENTITY_KINDS.items():
+        world_entities[kind] = []
+        references = _reference_fields(entity_class)
+        for attributes in description[kind]:
+            name = attributes["name"]
+            values = dict(attributes)
+            try:
+                for field_name, referenced_kind in references.items():
+                    if field_name not in attributes:
+                        raise KeyError(
+                            f"{kind} {name} does not name its {field_name} in"
+                            f" {WORLD_FILE}"
+                        )
+                    key = (referenced_kind, attributes[field_name])
+                    if key not in entities:
+                        raise KeyError(
+                            f"{kind} {name} references the {referenced_kind}"
+                            f" {attributes[field_name]} which could not be loaded"
+                        )
+                    values[field_name] = entities[key]
+                for field_name in _indicator_fields(entity_class):
+                    result = series[(kind, name, field_name)]
+                    if isinstance(result, Exception):
+                        raise ValueError(
+                            f"{kind} {name} misses its {field_name} indicator"
+                        ) from result
+                    values[field_name] = result
+                entity = entity_class(**values)
+            except Exception as error:
+                failures.append(LoadFailure(path=directory / kind / name, error=error))
+                continue
+            entities[(kind, name)] = entity
+            world_entities[kind].append(entity)
+    return WorldLoad(
+        world=World(name=description["name"], **world_entities), failures=failures
+    )
+
+
+def read_world_csv(directory: str | Path, max_workers: int | None = None) -> WorldLoad:
+    """loads a world directory from synchronous code, see load_world_csv"""
+    return asyncio.run(load_world_csv(directory, max_workers=max_workers))
@@ -0,0 +1,280 @@
+"""Lazy evaluation of timeseries arithmetic
+
+An expression is a directed acyclic graph of timeseries operations. Building it
+computes nothing: equal subexpressions are merged into a single node, and the
+evaluation walks the graph once over the period of the result, computing every node
+on the months that reach the result only and reusing the intermediate buffers.
+"""
+
+from collections import Counter
+from weakref import WeakValueDictionary
+
+import numpy as np
+
+from .calendar import month_ordinal
+from .timeseries import (
+    ConstantTimeseries,
+    IncludePeriodMismatch,
+    LinearTimeseries,
+    SegmentedTimeseries,
+    Timeseries,
+)
+
+OPERATORS = {
+    "add": np.add,
+    "sub": np.subtract,
+    "mul": np.multiply,
+    "div": np.divide,
+}
+
+# nodes by operator and operands, to merge equal subexpressions
+_nodes: WeakValueDictionary = WeakValueDictionary()
+
+
+class Expression:
+    """A node of a lazy timeseries computation.
+
+    Leaves hold a timeseries, the other nodes an operator ("add", "sub", "mul",
+    "div" or "neg") and its operands. The period of a node follows the timeseries
+    operators: the union of the operands for additions and subtractions, their
+    intersection for multiplications and divisions.
+    """
+
+    def __init__(
+        self,
+        operator: str,
+        operands: tuple["Expression", ...] = (),
+        series: Timeseries | None = None,
+    ):
+        self.operator = operator
+        self.operands = operands
+        self.series = series
+        self._result: Timeseries | None = None
+        if series is not None:
+            self.start_date, self.end_date = series.start_date, series.end_date
+        elif operator in ("add", "sub"):
+            self.start_date = min(operand.start_date for operand in operands)
+            self.end_date = max(operand.end_date for operand in operands)
+        elif operator in ("mul", "div"):
+            self.start_date = max(operand.start_date for operand in operands)
+            self.end_date = min(operand.end_date for operand in operands)
+            if self.start_date > self.end_date:
+                raise IncludePeriodMismatch(
+                    message=f"""the periods of the operands of {operator} do not overlap""",
+                )
+        else:
+            self.start_date, self.end_date = (
+                operands[0].start_date,
+                operands[0].end_date,
+            )
+
+    def __repr__(self):
+        return f"Expression({self.operator}, {self.start_date} -> {self.end_date})"
+
+    def _binary(self, operator: str, other) -> "Expression":
+        return _node(operator, (self, lazy(other)))
+
+    def __add__(self, other):
+        return self._binary("add", other)
+
+    def __sub__(self, other):
+        return self._binary("sub", other)
+
+    def __mul__(self, other):
+        return self._binary("mul", other)
+
+    def __truediv__(self, other):
+        return self._binary("div", other)
+
+    def __radd__(self, other):
+        return lazy(other)._binary("add", self)
+
+    def __rsub__(self, other):
+        return lazy(other)._binary("sub", self)
+
+    def __rmul__(self, other):
+        return lazy(other)._binary("mul", self)
+
+    def __rtruediv__(self, other):
+        return lazy(other)._binary("div", self)
+
+    def __neg__(self):
+        return _node("neg", (self,))
+
+    def __len__(self) -> int:
+        return month_ordinal(self.end_date) - month_ordinal(self.start_date) + 1
+
+    def nodes(self) -> list["Expression"]:
+        """returns the distinct nodes of the expression, operands first"""
+        ordered, seen = [], set()
+
+        def visit(node: Expression):
+            if id(node) in seen:
+                return
+            seen.add(id(node))
+            for operand in node.operands:
+                visit(operand)
+            ordered.append(node)
+
+        visit(self)
+        return ordered
+
+    def explain(self) -> str:
+        """describes what the evaluation computes, one node per line"""
+        names, lines = {}, []
+        for index, node in enumerate(self.nodes()):
+            names[id(node)] = f"%{index}"
+            if node.series is not None:
+                operation = type(node.series).__name__
+            else:
+                operands = ", ".join(names[id(operand)] for operand in node.operands)
+                operation = f"{node.operator}({operands})"
+            lines.append(
+                f"%{index} = {operation} [{node.start_date} -> {node.end_date}]"
+            )
+        return "\n".join(lines)
+
+    def evaluate(self) -> Timeseries:
+        """computes the expression in one pass over its period. The result is kept,
+        so further evaluations are free."""
+        if self._result is None:
+            uses = Counter(
+                id(operand) for node in self.nodes() for operand in node.operands
+            )
+            first, stop = (
+                month_ordinal(self.start_date),
+                month_ordinal(self.end_date) + 1,
+            )
+            data, _ = _evaluate(self, first, stop, uses, {})
+            data = np.asarray(data, dtype=np.float64)
+            if data.ndim == 0 or data.shape[-1] != stop - first:
+                data = np.broadcast_to(data, data.shape[:-1] + (stop - first,))
+            self._result = Timeseries(
+                start_date=self.start_date, end_date=self.end_date, data=data
+            )
+        return self._result
+
+    # the evaluated expression can be used where a timeseries is expected
+
+    @property
+    def data(self):
+        return self.evaluate().data
+
+    @property
+    def array(self) -> np.ndarray:
+        return self.evaluate().array
+
+    @property
+    def paths_shape(self) -> tuple[int, ...]:
+        return self.evaluate().paths_shape
+
+    def __getitem__(self, key):
+        return self.evaluate()[key]
+
+
+def lazy(series: Timeseries | Expression) -> Expression:
+    """returns the expression leaf of a timeseries"""
+    if isinstance(series, Expression):
+        return series
+    if not isinstance(series, Timeseries):
+        raise TypeError(f"cannot build a timeseries expression from {series!r}")
+    key = ("leaf", id(series))
+    node = _nodes.get(key)
+    if node is None or node.series is not series:
+        node = Expression("leaf", series=series)
+        _nodes[key] = node
+    return node
+
+
+def _node(operator: str, operands: tuple[Expression, ...]) -> Expression:
+    key = (operator,) + tuple(id(operand) for operand in operands)
+    node = _nodes.get(key)
+    if node is None:
+        node = Expression(operator, operands)
+        _nodes[key] = node
+    return node
+
+
+def _evaluate_leaf(series: Timeseries, first: int, stop: int):
+    """returns the data of a timeseries on the months first -> stop and whether the
+    data is a buffer that the evaluation may overwrite"""
+    if isinstance(series, ConstantTimeseries):
+        value = np.asarray(series.value, dtype=np.float64)
+        return (value if value.ndim == 0 else value[..., np.newaxis]), False
+    offset = month_ordinal(series.start_date)
+    if isinstance(series, LinearTimeseries):
+        t = np.arange(first - offset, stop - offset, dtype=np.float64) + series.offset
+        return series.a * (1 + series.b * t), True
+    fresh = isinstance(series, SegmentedTimeseries)
+    return series.array[..., first - offset : stop - offset], fresh
+
+
+def _evaluate(node: Expression, first: int, stop: int, uses: Counter, memo: dict):
+    """evaluates a node on the months first -> stop, which are within its period.
+    Returns the data and whether it is a buffer that may be overwritten."""
+    key = (id(node), first, stop)
+    if key in memo:
+        return memo[key], False
+    if node.series is not None:
+        data, owned = _evaluate_leaf(node.series, first, stop)
+    elif node.operator == "neg":
+        data, owned = _evaluate(node.operands[0], first, stop, uses, memo)
+        data = np.negative(data, out=data) if owned else np.negative(data)
+        owned = isinstance(data, np.ndarray)
+    elif node.operator in ("mul", "div"):
+        data, owned = _fused(
+            node.operator,
+            [_evaluate(operand, first, stop, uses, memo) for operand in node.operands],
+        )
+    else:
+        data, owned = _evaluate_sum(node, first, stop, uses, memo)
+    # a result used by several nodes is shared and must not be overwritten
+    owned = owned and uses[id(node)] <= 1
+    memo[key] = data
+    return data, owned
+
+
+def _fused(operator: str, operands: list[tuple]):
+    """applies an operator writing into an operand buffer when one may be
+    overwritten and has the shape of the result"""
+    (left, left_owned), (right, right_owned) = operands
+    shape = np.broadcast_shapes(np.shape(left), np.shape(right))
+    if left_owned and np.shape(left) == shape:
+        return OPERATORS[operator](left, right, out=left), True
+    if right_owned and np.shape(right) == shape:
+        return OPERATORS[operator](left, right, out=right), True
+    data = OPERATORS[operator](left, right)
+    return data, isinstance(data, np.ndarray)
+
+
+def _evaluate_sum(node: Expression, first: int, stop: int, uses: Counter, memo: dict):
+    """evaluates an addition or a subtraction. The operands not covering the whole
+    window count as zero on the missing months."""
+    windows = []
+    for operand in node.operands:
+        operand_first = max(first, month_ordinal(operand.start_date))
+        operand_stop = min(stop, month_ordinal(operand.end_date) + 1)
+        windows.append((operand_first, operand_stop))
+    if all(window == (first, stop) for window in windows):
+        return _fused(
+            node.operator,
+            [_evaluate(operand, first, stop, uses, memo) for operand in node.operands],
+        )
+    values = []
+    for operand, (operand_first, operand_stop) in zip(node.operands, windows):
+        if operand_first < operand_stop:
+            value, _ = _evaluate(operand, operand_first, operand_stop, uses, memo)
+        else:
+            value = np.float64(0)
+        values.append(value)
+    paths_shape = np.broadcast_shapes(*(np.shape(value)[:-1] for value in values))
+    data = np.zeros(paths_shape + (stop - first,))
+    signs = (1, 1 if node.operator == "add" else -1)
+    for value, sign, (operand_first, operand_stop) in zip(values, signs, windows):
+        if operand_first < operand_stop:
+            part = data[..., operand_first - first : operand_stop - first]
+            if sign > 0:
+                part += value
+            else:
+                part -= value
+    return data, True
@@ -0,0 +1,255 @@
+"""Opt-in instrumentation of the hot paths of the models
+
+Within ``with instrument() as profile:`` the timeseries operators, the asset
+valuations and the character computations are timed, the timeseries allocations
+and element copies are counted and the hit rate of the valuation cache is recorded.
+The methods are wrapped when the first scope is entered and restored when the last
+one exits, so the models run unchanged, without overhead, outside of a scope.
+"""
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Iterator
+
+import numpy as np
+
+from . import timeseries
+from .assets import Asset
+from .cache import valuation_cache
+from .character import Character
+
+OPERATORS = ("__add__", "__sub__", "__mul__", "__truediv__", "__neg__", "reciprocal")
+ASSET_PROPERTIES = ("stream_g_Au", "value_g_Au", "cash_flow_g_Au")
+TIMESERIES_CLASSES = (
+    timeseries.Timeseries,
+    timeseries.ConstantTimeseries,
+    timeseries.SegmentedTimeseries,
+    timeseries.LinearTimeseries,
+)
+# symbolic timeseries whose array property expands the coefficients to the months
+MATERIALIZED_CLASSES = (timeseries.SegmentedTimeseries, timeseries.LinearTimeseries)
+
+
+@dataclass(frozen=True)
+class ProfileEntry:
+    name: str
+    calls: int
+    total_seconds: float
+    self_seconds: float
+
+
+@dataclass
+class Profile:
+    """Measurements collected in an instrumented scope.
+
+    Attributes:
+        counters (Counter): allocations of timeseries per class ("allocations.<class>"),
+            elements copied when building dense timeseries ("copied_elements") and
+            elements computed when expanding symbolic timeseries
+            ("materialized_elements")
+        timings (dict): number of calls and seconds spent per call stack
+        cache_hits (int): valuation cache hits within the scope
+        cache_misses (int): valuation cache misses within the scope
+    """
+
+    counters: Counter = field(default_factory=Counter)
+    timings: dict[tuple[str, ...], list] = field(default_factory=dict)
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+    def _record(self, stack: tuple[str, ...], seconds: float) -> None:
+        timing = self.timings.setdefault(stack, [0, 0.0])
+        timing[0] += 1
+        timing[1] += seconds
+
+    def _self_seconds(self) -> dict[tuple[str, ...], float]:
+        """time spent in every call stack outside of the instrumented calls it
+        makes"""
+        self_seconds = {stack: seconds for stack, (_, seconds) in self.timings.items()}
+        for stack, (_, seconds) in self.timings.items():
+            if len(stack) > 1 and stack[:-1] in self_seconds:
+                self_seconds[stack[:-1]] -= seconds
+        return self_seconds
+
+    def flat(self) -> list[ProfileEntry]:
+        """returns the calls, the total and the self time of every instrumented
+        function, the most expensive first"""
+        entries: dict[str, list] = {}
+        self_seconds = self._self_seconds()
+        for stack, (calls, seconds) in self.timings.items():
+            entry = entries.setdefault(stack[-1], [0, 0.0, 0.0])
+            entry[0] += calls
+            # recursive calls are already part of the total of the outer call
+            if stack[-1] not in stack[:-1]:
+                entry[1] += seconds
+            entry[2] += self_seconds[stack]
+        return sorted(
+            (ProfileEntry(name, *entry) for name, entry in entries.items()),
+            key=lambda entry: entry.total_seconds,
+            reverse=True,
+        )
+
+    def collapsed(self) -> str:
+        """returns the self time of every call stack in microseconds, one
+        "outer;inner value" line per stack: the folded format read by flame graph
+        tools (flamegraph.pl, speedscope, ...)"""
+        return "\n".join(
+            f"{';'.join(stack)} {round(seconds * 1e6)}"
+            for stack, seconds in sorted(self._self_seconds().items())
+        )
+
+    def write_collapsed(self, path: str | Path) -> None:
+        Path(path).write_text(self.collapsed() + "\n")
+
+    def report(self) -> str:
+        """returns the flat profile, the counters and the cache hit rate as text"""
+        lines = [f"{'function':<44} {'calls':>9} {'total ms':>10} {'self ms':>10}"]
+        for entry in self.flat():
+            lines.append(
+                f"{entry.name:<44} {entry.calls:>9} "
+                f"{entry.total_seconds * 1e3:>10.3f} {entry.self_seconds * 1e3:>10.3f}"
+            )
+        lines.append("")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<44} {value:>9}")
+        lines.append(
+            f"{'valuation cache hit rate':<44} {self.cache_hit_rate:>9.1%}"
+            f" ({self.cache_hits} hits, {self.cache_misses} misses)"
+        )
+        return "\n".join(lines)
+
+
+_lock = threading.RLock()
+_active: list[Profile] = []
+_originals: list[tuple[type, str, object]] = []
+_local = threading.local()
+
+
+def is_instrumented() -> bool:
+    return bool(_active)
+
+
+def _stack() -> list[str]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _count(name: str, amount: int) -> None:
+    for profile in _active:
+        profile.counters[name] += amount
+
+
+def _timed(name: str, function: Callable) -> Callable:
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        stack = _stack()
+        stack.append(name)
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            path = tuple(stack)
+            stack.pop()
+            for profile in _active:
+                profile._record(path, elapsed)
+
+    return wrapper
+
+
+def _counted_init(cls: type, function: Callable) -> Callable:
+    @wraps(function)
+    def wrapper(self, *args, **kwargs):
+        data = kwargs.get("data")
+        function(self, *args, **kwargs)
+        _count(f"allocations.{cls.__name__}", 1)
+        if data is not None and self.data is not data:
+            _count("copied_elements", int(np.size(self.data)))
+
+    return wrapper
+
+
+def _counted_array(function: Callable) -> Callable:
+    @wraps(function)
+    def wrapper(self):
+        array = function(self)
+        _count("materialized_elements", array.size)
+        return array
+
+    return wrapper
+
+
+def _patch(cls: type, name: str, value) -> None:
+    _originals.append((cls, name, cls.__dict__[name]))
+    setattr(cls, name, value)
+
+
+def _asset_classes() -> list[type]:
+    classes, pending = [], [Asset]
+    while pending:
+        cls = pending.pop()
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def _install() -> None:
+    for cls in TIMESERIES_CLASSES:
+        _patch(cls, "__init__", _counted_init(cls, cls.__dict__["__init__"]))
+        for name in OPERATORS:
+            if name in cls.__dict__:
+                _patch(cls, name, _timed(f"{cls.__name__}.{name}", cls.__dict__[name]))
+    for cls in MATERIALIZED_CLASSES:
+        array = cls.__dict__["array"]
+        _patch(cls, "array", property(_counted_array(array.fget)))
+    for cls in _asset_classes():
+        for name in ASSET_PROPERTIES:
+            if name in cls.__dict__:
+                fget = cls.__dict__[name].fget
+                _patch(cls, name, property(_timed(f"{cls.__name__}.{name}", fget)))
+    for name in ("capital_g_Au", "wealth"):
+        value = Character.__dict__[name]
+        if isinstance(value, property):
+            value = property(_timed(f"Character.{name}", value.fget))
+        else:
+            value = _timed(f"Character.{name}", value)
+        _patch(Character, name, value)
+
+
+def _uninstall() -> None:
+    while _originals:
+        cls, name, value = _originals.pop()
+        setattr(cls, name, value)
+
+
+@contextmanager
+def instrument() -> Iterator[Profile]:
+    """collects a profile of the models within the scope. Scopes can be nested,
+    every active scope receives the measurements."""
+    profile = Profile()
+    with _lock:
+        if not _active:
+            _install()
+        _active.append(profile)
+    hits, misses = valuation_cache.hits, valuation_cache.misses
+    try:
+        yield profile
+    finally:
+        profile.cache_hits = valuation_cache.hits - hits
+        profile.cache_misses = valuation_cache.misses - misses
+        with _lock:
+            _active.remove(profile)
+            if not _active:
+                _uninstall()
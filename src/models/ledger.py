@@ -0,0 +1,102 @@
+"""Incremental ledger of the capital of a character
+"""
+
+from datetime import date
+
+import numpy as np
+
+from .timeseries import Timeseries, months_in_interval
+
+
+class CapitalLedger:
+    """Monthly net cash flows over a period, stored in a segment tree.
+
+    Every node of the tree keeps the sum of the cash flows below it and the lowest
+    running sum reached inside it, so the lowest capital of the whole period is read
+    at the root. Changing the cash flows of a span of months updates the span and
+    its ancestors only: O(span + log T) instead of recomputing the T months.
+
+    Arguments:
+        start_date (date): first month of the ledger
+        end_date (date): last month of the ledger
+        initial_capital (float): capital available before the first month
+    """
+
+    def __init__(self, start_date: date, end_date: date, initial_capital: float = 0):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.initial_capital = initial_capital
+        self.no_months = months_in_interval(start_date, end_date)
+        self._size = 1 << max(self.no_months - 1, 0).bit_length()
+        self._sum = np.zeros(2 * self._size)
+        # empty months past the end of the period never lower the running sum
+        self._min = np.full(2 * self._size, np.inf)
+        self._min[self._size : self._size + self.no_months] = 0
+        self._update_ancestors(0, self.no_months)
+
+    def _update_ancestors(self, first: int, stop: int) -> None:
+        low, high = (first + self._size) >> 1, (stop - 1 + self._size) >> 1
+        while low >= 1:
+            nodes = np.arange(low, high + 1)
+            left, right = 2 * nodes, 2 * nodes + 1
+            self._sum[nodes] = self._sum[left] + self._sum[right]
+            self._min[nodes] = np.minimum(
+                self._min[left], self._sum[left] + self._min[right]
+            )
+            low, high = low >> 1, high >> 1
+
+    def _set_leaves(self, first: int, flows: np.ndarray) -> None:
+        leaves = slice(self._size + first, self._size + first + len(flows))
+        self._sum[leaves] = flows
+        self._min[leaves] = flows
+        self._update_ancestors(first, first + len(flows))
+
+    def _clip(self, cash_flow: Timeseries) -> tuple[int, np.ndarray]:
+        """returns the index of the first month and the cash flows of the months of
+        a timeseries falling in the ledger period"""
+        if cash_flow.paths_shape:
+            raise ValueError(
+                f"the capital ledger holds a single path, the cash flow holds"
+                f" {cash_flow.paths_shape} paths"
+            )
+        first = months_in_interval(self.start_date, cash_flow.start_date) - 1
+        flows = cash_flow.array
+        if first < 0:
+            flows = flows[-first:]
+            first = 0
+        return first, flows[: max(self.no_months - first, 0)]
+
+    def add(self, cash_flow: Timeseries, sign: float = 1) -> None:
+        """adds (or removes, with a negative sign) a cash flow to the ledger.
+        Months outside of the ledger period are ignored."""
+        first, flows = self._clip(cash_flow)
+        if len(flows):
+            leaves = self._sum[self._size + first : self._size + first + len(flows)]
+            self._set_leaves(first, leaves + sign * flows)
+
+    def try_add(self, cash_flow: Timeseries, sign: float = 1) -> bool:
+        """adds a cash flow only if the capital stays positive in every month.
+        Returns whether the cash flow was added."""
+        first, flows = self._clip(cash_flow)
+        if not len(flows):
+            return self.lowest_capital >= 0
+        leaves = slice(self._size + first, self._size + first + len(flows))
+        previous = self._sum[leaves].copy()
+        self._set_leaves(first, previous + sign * flows)
+        if self.lowest_capital >= 0:
+            return True
+        self._set_leaves(first, previous)
+        return False
+
+    @property
+    def lowest_capital(self) -> float:
+        return self.initial_capital + min(self._min[1], 0)
+
+    @property
+    def capital(self) -> Timeseries:
+        flows = self._sum[self._size : self._size + self.no_months]
+        return Timeseries(
+            start_date=self.start_date,
+            end_date=self.end_date,
+            data=self.initial_capital + np.cumsum(flows),
+        )
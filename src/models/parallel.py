@@ -0,0 +1,215 @@
+"""Parallel evaluation of many portfolios against the same world
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from . import assets
+from .character import Character
+from .timeseries import Timeseries
+from .world import ENTITY_KINDS, Currency, World
+
+
+@dataclass(frozen=True)
+class PortfolioValuation:
+    """capital and wealth over time of a character"""
+
+    name: str
+    capital_g_Au: Timeseries
+    wealth: Timeseries
+
+
+def _encode_asset(asset: assets.Asset) -> tuple[str, dict]:
+    """describes an asset by its class name and its fields, the world entities
+    being replaced by their kind and name"""
+    values = {}
+    for field in fields(asset):
+        value = getattr(asset, field.name)
+        if type(value) in ENTITY_KINDS:
+            value = (ENTITY_KINDS[type(value)], value.name)
+        values[field.name] = value
+    return type(asset).__name__, values
+
+
+def _decode_asset(record: tuple[str, dict], entities: dict) -> assets.Asset:
+    class_name, values = record
+    values = {
+        name: entities[value] if isinstance(value, tuple) else value
+        for name, value in values.items()
+    }
+    return getattr(assets, class_name)(**values)
+
+
+def _encode_character(character: Character) -> tuple:
+    return (
+        character.name,
+        character.start_investment_date,
+        character.end_of_life,
+        character.initial_capital_g_Au,
+        [_encode_asset(asset) for asset in character.assets],
+    )
+
+
+class SharedWorld:
+    """A world whose dense indicator series are published once in a shared memory
+    block. Worker processes rebuild the world with timeseries viewing the block,
+    without copying the series. Symbolic timeseries are small and sent as they are.
+
+    Use as a context manager to release the shared memory block.
+    """
+
+    def __init__(self, world: World):
+        dense_series = {}
+        for kind in ENTITY_KINDS.values():
+            for entity in getattr(world, kind):
+                for field in fields(entity):
+                    value = getattr(entity, field.name)
+                    if type(value) is Timeseries:
+                        dense_series[id(value)] = value
+        offsets, size = {}, 0
+        for key, ts in dense_series.items():
+            offsets[key] = size
+            size += ts.array.nbytes
+        self.memory = SharedMemory(create=True, size=max(size, 1))
+        for key, ts in dense_series.items():
+            data = ts.array
+            block = np.ndarray(data.shape, np.float64, self.memory.buf, offsets[key])
+            block[...] = data
+            del block
+        self.description = self._describe(world, offsets)
+
+    @staticmethod
+    def _describe(world: World, offsets: dict) -> dict:
+        """describes the entities of the world, referencing other entities by kind
+        and name and the dense series by their place in the shared block"""
+        description = {"name": world.name}
+        for kind in ENTITY_KINDS.values():
+            description[kind] = []
+            for entity in getattr(world, kind):
+                attributes = {}
+                for field in fields(entity):
+                    value = getattr(entity, field.name)
+                    if type(value) in ENTITY_KINDS:
+                        value = (ENTITY_KINDS[type(value)], value.name)
+                    elif type(value) is Timeseries:
+                        value = (
+                            "shared",
+                            offsets[id(value)],
+                            value.array.shape,
+                            value.start_date,
+                            value.end_date,
+                        )
+                    attributes[field.name] = value
+                description[kind].append(attributes)
+        return description
+
+    def __enter__(self) -> "SharedWorld":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self.memory.close()
+        self.memory.unlink()
+
+
+def attach_world(memory: SharedMemory, description: dict) -> tuple[World, dict]:
+    """rebuilds a world published as a SharedWorld. The dense series are read-only
+    views of the shared block. Returns the world and its entities by kind and name.
+    """
+    entities = {}
+    world_entities = {}
+    for entity_class, kind in ENTITY_KINDS.items():
+        world_entities[kind] = []
+        for attributes in description[kind]:
+            values = {}
+            for name, value in attributes.items():
+                if isinstance(value, tuple) and value[0] == "shared":
+                    _, offset, shape, start_date, end_date = value
+                    data = np.ndarray(shape, np.float64, memory.buf, offset)
+                    data.flags.writeable = False
+                    value = Timeseries(
+                        start_date=start_date, end_date=end_date, data=data
+                    )
+                elif isinstance(value, tuple):
+                    value = entities[value]
+                values[name] = value
+            entity = entity_class(**values)
+            entities[(kind, entity.name)] = entity
+            world_entities[kind].append(entity)
+    return World(name=description["name"], **world_entities), entities
+
+
+_worker_memory: SharedMemory | None = None
+_worker_entities: dict = {}
+
+
+def _initialize_worker(memory_name: str, description: dict) -> None:
+    global _worker_memory, _worker_entities
+    # the block stays mapped as long as the worker lives
+    _worker_memory = SharedMemory(name=memory_name)
+    _, _worker_entities = attach_world(_worker_memory, description)
+
+
+def _evaluate_chunk(
+    chunk: list[tuple], currency: tuple[str, str]
+) -> list[PortfolioValuation]:
+    valuations = []
+    for name, start, end_of_life, initial_capital, records in chunk:
+        character = Character(
+            name=name,
+            start_investment_date=start,
+            end_of_life=end_of_life,
+            initial_capital_g_Au=initial_capital,
+            assets=[_decode_asset(record, _worker_entities) for record in records],
+        )
+        valuations.append(
+            PortfolioValuation(
+                name=name,
+                capital_g_Au=character.capital_g_Au,
+                wealth=character.wealth(_worker_entities[currency]),
+            )
+        )
+    return valuations
+
+
+def evaluate_portfolios(
+    world: World,
+    characters: list[Character],
+    currency: Currency,
+    max_workers: int | None = None,
+    chunksize: int = 64,
+) -> list[PortfolioValuation]:
+    """computes the capital and the wealth of many characters in a pool of worker
+    processes. The world is published once in shared memory; the characters are
+    sent in chunks, referencing the world entities by name.
+
+    Args:
+        world (World): the world holding every entity the assets refer to
+        characters (list[Character]): characters to evaluate
+        currency (Currency): currency of the wealth
+        max_workers (int): number of worker processes, all the cores by default
+        chunksize (int): number of characters evaluated per task
+
+    Returns:
+        list[PortfolioValuation]: valuations in the order of the characters
+    """
+    encoded = [_encode_character(character) for character in characters]
+    chunks = [encoded[i : i + chunksize] for i in range(0, len(encoded), chunksize)]
+    currency_key = (ENTITY_KINDS[Currency], currency.name)
+    valuations = []
+    with SharedWorld(world) as shared_world:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_initialize_worker,
+            initargs=(shared_world.memory.name, shared_world.description),
+        ) as executor:
+            for chunk_valuations in executor.map(
+                _evaluate_chunk, chunks, [currency_key] * len(chunks)
+            ):
+                valuations.extend(chunk_valuations)
+    return valuations
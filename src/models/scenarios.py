@@ -0,0 +1,141 @@
+"""Stochastic generation of world scenarios for Monte Carlo simulations
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+
+import numpy as np
+
+from .timeseries import Timeseries, months_in_interval
+from .world import World
+
+
+@dataclass(frozen=True, kw_only=True)
+class GeometricBrownianMotion:
+    """Log-normal evolution of a price.
+
+    Arguments:
+        drift (float): expected monthly return
+        volatility (float): standard deviation of the monthly log return
+    """
+
+    drift: float
+    volatility: float
+
+    def simulate(self, initial_value: float, shocks: np.ndarray) -> np.ndarray:
+        """returns the paths starting from the initial value, driven by standard
+        normal shocks of shape (paths, months - 1)"""
+        log_returns = (self.drift - self.volatility**2 / 2) + self.volatility * shocks
+        log_paths = np.cumsum(log_returns, axis=-1)
+        log_paths = np.concatenate(
+            (np.zeros(log_paths.shape[:-1] + (1,)), log_paths), axis=-1
+        )
+        return initial_value * np.exp(log_paths)
+
+
+@dataclass(frozen=True, kw_only=True)
+class MeanReversion:
+    """Evolution of a rate pulled back to a long term mean (Vasicek model).
+
+    r(t+1) = r(t) + speed * (mean - r(t)) + volatility * shock
+
+    Arguments:
+        mean (float): long term mean of the rate
+        speed (float): share of the distance to the mean recovered every month
+        volatility (float): standard deviation of the monthly change
+    """
+
+    mean: float
+    speed: float
+    volatility: float
+
+    def simulate(self, initial_value: float, shocks: np.ndarray) -> np.ndarray:
+        """returns the paths starting from the initial value, driven by standard
+        normal shocks of shape (paths, months - 1)"""
+        paths = np.empty(shocks.shape[:-1] + (shocks.shape[-1] + 1,))
+        paths[..., 0] = initial_value
+        for month in range(shocks.shape[-1]):
+            rate = paths[..., month]
+            paths[..., month + 1] = (
+                rate
+                + self.speed * (self.mean - rate)
+                + self.volatility * shocks[..., month]
+            )
+        return paths
+
+
+@dataclass(kw_only=True)
+class ScenarioGenerator:
+    """Generates worlds whose indicators hold many simulated paths.
+
+    The simulated indicators are stored as a block of paths x months and start from
+    the value of the base world indicator on the start date. The indicators without
+    a model keep the single path of the base world, which the timeseries operators
+    broadcast against the simulated ones, so valuing an asset on a generated world
+    computes every path at once.
+
+    The valuations of a generated world hold one row per path: the memory kept by
+    the valuation cache is bounded by cache.valuation_cache.max_bytes.
+
+    Arguments:
+        world (World): base world providing the entities and initial values
+        start_date (date): first month of the scenarios
+        end_date (date): last month of the scenarios
+        stock_price (dict): model of the stock price, by country name
+        interest_rate (dict): model of the interest rate, by currency name
+        stock_correlation (np.ndarray): correlation matrix of the stock price shocks
+            of the countries listed in stock_price, in the same order. The shocks
+            are independent when omitted.
+        seed (int): seed of the random generator
+    """
+
+    world: World
+    start_date: date
+    end_date: date
+    stock_price: dict[str, GeometricBrownianMotion] = field(default_factory=dict)
+    interest_rate: dict[str, MeanReversion] = field(default_factory=dict)
+    stock_correlation: np.ndarray | None = None
+    seed: int | None = None
+
+    def _paths(self, data: np.ndarray) -> Timeseries:
+        return Timeseries(start_date=self.start_date, end_date=self.end_date, data=data)
+
+    def _stock_shocks(self, rng: np.random.Generator, no_paths: int) -> np.ndarray:
+        """standard normal shocks of shape (countries, paths, months - 1)"""
+        no_steps = months_in_interval(self.start_date, self.end_date) - 1
+        shocks = rng.standard_normal((len(self.stock_price), no_paths, no_steps))
+        if self.stock_correlation is not None:
+            cholesky = np.linalg.cholesky(np.asarray(self.stock_correlation))
+            shocks = np.einsum("ij,jpt->ipt", cholesky, shocks)
+        return shocks
+
+    def generate(self, no_paths: int) -> World:
+        """returns a world whose modeled indicators hold no_paths paths"""
+        rng = np.random.default_rng(self.seed)
+        no_steps = months_in_interval(self.start_date, self.end_date) - 1
+
+        currencies = {}
+        for currency in self.world.currencies:
+            model = self.interest_rate.get(currency.name)
+            if model is None:
+                continue
+            shocks = rng.standard_normal((no_paths, no_steps))
+            initial_value = currency.interest_rate[self.start_date]
+            currencies[currency.name] = {
+                "interest_rate": self._paths(model.simulate(initial_value, shocks))
+            }
+
+        stock_shocks = dict(zip(self.stock_price, self._stock_shocks(rng, no_paths)))
+        countries = {}
+        for country in self.world.countries:
+            model = self.stock_price.get(country.name)
+            if model is not None:
+                initial_value = country.stock_price[self.start_date]
+                countries[country.name] = {
+                    "stock_price": self._paths(
+                        model.simulate(initial_value, stock_shocks[country.name])
+                    )
+                }
+
+        # the entities without a simulated indicator are shared with the base world
+        return self.world.fork(currencies=currencies, countries=countries)
@@ -0,0 +1,204 @@
+"""Sensitivity of a portfolio to the indicators of the world, by bump and revalue
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from .assets import Asset
+from .character import Character
+from .timeseries import Timeseries, constant_timeseries, months_in_interval
+from .world import ENTITY_KINDS, Currency, World
+
+RATE_FIELDS = ("interest_rate",)
+"""indicators bumped by an absolute amount, the others being bumped relatively"""
+
+
+@dataclass(frozen=True)
+class Indicator:
+    """a timeseries field of a world entity, e.g. ("cities", "Paris",
+    "sqm_housing_price")"""
+
+    kind: str
+    name: str
+    field: str
+
+    def series(self, world: World) -> Timeseries:
+        return getattr(world.entity(self.kind, self.name), self.field)
+
+
+@dataclass(frozen=True)
+class Sensitivity:
+    """Change of the portfolio when an indicator is bumped.
+
+    Attributes:
+        indicator (Indicator): the bumped indicator
+        bump (float): relative bump, or absolute bump of a rate
+        revalued_assets (int): number of assets depending on the indicator
+        capital_g_Au (Timeseries): change of the capital over time
+        final_wealth (float): change of the wealth on the last month, in the
+            currency of the report
+    """
+
+    indicator: Indicator
+    bump: float
+    revalued_assets: int
+    capital_g_Au: Timeseries
+    final_wealth: float | np.ndarray
+
+
+@dataclass(frozen=True)
+class SensitivityReport:
+    capital_g_Au: Timeseries
+    final_wealth: float | np.ndarray
+    sensitivities: list[Sensitivity]
+
+    def by_indicator(self) -> dict[Indicator, Sensitivity]:
+        return {
+            sensitivity.indicator: sensitivity for sensitivity in self.sensitivities
+        }
+
+
+def indicators(world: World) -> list[Indicator]:
+    """returns every timeseries field of the entities of a world"""
+    return [
+        Indicator(kind=kind, name=entity.name, field=entity_field.name)
+        for kind in ENTITY_KINDS.values()
+        for entity in getattr(world, kind)
+        for entity_field in fields(entity)
+        if isinstance(getattr(entity, entity_field.name), Timeseries)
+    ]
+
+
+def bump_indicator(ts: Timeseries, field: str, bump: float, rate_bump: float):
+    """returns the bumped timeseries: rates are shifted by rate_bump, the other
+    indicators scaled by 1 + bump"""
+    if field in RATE_FIELDS:
+        return ts + constant_timeseries(rate_bump, ts.start_date, ts.end_date)
+    return ts * constant_timeseries(1 + bump, ts.start_date, ts.end_date)
+
+
+def _in_period(character: Character, ts: Timeseries) -> np.ndarray:
+    """the data of a timeseries over the months of the life of a character, zero
+    outside of its period"""
+    no_months = months_in_interval(
+        character.start_investment_date, character.end_of_life
+    )
+    first = months_in_interval(character.start_investment_date, ts.start_date) - 1
+    data = ts.array
+    if first < 0:
+        data, first = data[..., -first:], 0
+    data = data[..., : max(no_months - first, 0)]
+    padded = np.zeros(data.shape[:-1] + (no_months,))
+    padded[..., first : first + data.shape[-1]] = data
+    return padded
+
+
+def _revalue(
+    character: Character,
+    world: World,
+    currency: Currency,
+    base_wealth_g_Au: np.ndarray,
+    indicator: Indicator,
+    bump: float,
+    rate_bump: float,
+) -> Sensitivity:
+    series = indicator.series(world)
+    bumped = bump_indicator(series, indicator.field, bump, rate_bump)
+    fork = world.fork(**{indicator.kind: {indicator.name: {indicator.field: bumped}}})
+    flows = np.zeros(base_wealth_g_Au.shape[-1:])
+    held = np.zeros(base_wealth_g_Au.shape[-1:])
+    revalued = 0
+    for asset in character.assets:
+        if not any(series is used for used in asset.valuation_inputs):
+            continue
+        revalued += 1
+        bumped_asset = fork.rebind(asset)
+        flows = flows + _in_period(character, bumped_asset.cash_flow_g_Au)
+        flows = flows - _in_period(character, asset.cash_flow_g_Au)
+        held = character.add_held_value(held, bumped_asset.value_g_Au)
+        held = character.add_held_value(held, asset.value_g_Au, sign=-1)
+    capital_change = np.cumsum(flows, axis=-1)
+    wealth_g_Au = base_wealth_g_Au + capital_change + held
+    units = fork.currency(currency.name).units_per_g_Au
+    final_wealth = (
+        wealth_g_Au[..., -1] * units[character.end_of_life]
+        - base_wealth_g_Au[..., -1] * currency.units_per_g_Au[character.end_of_life]
+    )
+    return Sensitivity(
+        indicator=indicator,
+        bump=rate_bump if indicator.field in RATE_FIELDS else bump,
+        revalued_assets=revalued,
+        capital_g_Au=Timeseries(
+            start_date=character.start_investment_date,
+            end_date=character.end_of_life,
+            data=capital_change,
+        ),
+        final_wealth=final_wealth,
+    )
+
+
+def sensitivities(
+    portfolio: Character | list[Asset],
+    world: World,
+    currency: Currency,
+    bump: float = 0.01,
+    rate_bump: float = 0.0001,
+    bumped: list[Indicator] | None = None,
+    max_workers: int | None = None,
+) -> SensitivityReport:
+    """bumps every indicator of the world in turn and reports the change of the
+    capital and of the final wealth of a portfolio.
+
+    Every bump values the portfolio in a fork of the world differing by the bumped
+    indicator only, and only the assets reading that indicator are revalued. The
+    bumps are independent and computed in a pool of threads.
+
+    Args:
+        portfolio (Character | list[Asset]): a character, or assets held from
+            their purchase with no initial capital
+        world (World): the world holding the entities referenced by the assets
+        currency (Currency): currency of the final wealth
+        bump (float): relative bump of the prices, indexes and gold quotes
+        rate_bump (float): absolute bump of the interest rates
+        bumped (list[Indicator]): indicators to bump, all of them by default
+        max_workers (int): number of threads
+
+    Returns:
+        SensitivityReport: the base capital and final wealth, and their change for
+            every bumped indicator
+    """
+    if isinstance(portfolio, Character):
+        character = portfolio
+    else:
+        character = Character(
+            name="portfolio",
+            start_investment_date=min(asset.purchase_date for asset in portfolio),
+            end_of_life=max(asset.sale_date for asset in portfolio),
+            assets=list(portfolio),
+        )
+    base_wealth_g_Au = character.wealth_g_Au.array
+    if bumped is None:
+        bumped = indicators(world)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(
+            executor.map(
+                lambda indicator: _revalue(
+                    character,
+                    world,
+                    currency,
+                    base_wealth_g_Au,
+                    indicator,
+                    bump,
+                    rate_bump,
+                ),
+                bumped,
+            )
+        )
+    return SensitivityReport(
+        capital_g_Au=character.capital_g_Au,
+        final_wealth=base_wealth_g_Au[..., -1]
+        * currency.units_per_g_Au[character.end_of_life],
+        sensitivities=results,
+    )
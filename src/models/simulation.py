@@ -0,0 +1,76 @@
+"""Month by month simulation of a character
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Iterator
+
+import numpy as np
+
+from .calendar import month_ordinal, ordinal_to_date
+from .character import Character
+from .world import Currency
+
+
+@dataclass(frozen=True)
+class MonthRecord:
+    """state of a character at the end of a month.
+
+    The values are floats, or arrays of paths when the world indicators hold
+    several paths.
+    """
+
+    month: date
+    capital_g_Au: float | np.ndarray
+    wealth: float | np.ndarray
+    cash_flows_g_Au: tuple[float | np.ndarray, ...]
+
+
+def simulate(
+    character: Character,
+    currency: Currency,
+    stop_when: Callable[[MonthRecord], bool] | None = None,
+) -> Iterator[MonthRecord]:
+    """advances a character month by month from its start of investments to its end
+    of life. Every month the assets are valued from the world indicators of that
+    month only, so the memory used does not depend on the length of the horizon.
+
+    The records match the capital_g_Au and the wealth of the character, which
+    compute the whole period at once.
+
+    Args:
+        character (Character): the character to simulate
+        currency (Currency): currency of the wealth
+        stop_when (Callable): stops the simulation after the first record for
+            which it returns True, e.g. ``lambda record: record.capital_g_Au < 0``
+
+    Yields:
+        MonthRecord: capital, wealth and cash flow of every asset (in the order of
+            character.assets) of each month
+    """
+    assets = list(character.assets)
+    # ownership of every asset: first month and sale month
+    ownerships = [
+        (month_ordinal(asset.purchase_date), month_ordinal(asset.sale_date))
+        for asset in assets
+    ]
+    capital_g_Au = character.initial_capital_g_Au
+    first_month = month_ordinal(character.start_investment_date)
+    for month in range(first_month, month_ordinal(character.end_of_life) + 1):
+        day = ordinal_to_date(month)
+        cash_flows_g_Au = tuple(asset.cash_flow_at(day) for asset in assets)
+        capital_g_Au = capital_g_Au + sum(cash_flows_g_Au)
+        wealth_g_Au = capital_g_Au
+        for asset, (purchase_month, sale_month) in zip(assets, ownerships):
+            # on the sale month the value is already part of the capital
+            if purchase_month <= month < sale_month:
+                wealth_g_Au = wealth_g_Au + asset.value_at(day)
+        record = MonthRecord(
+            month=day,
+            capital_g_Au=capital_g_Au,
+            wealth=wealth_g_Au * currency.units_per_g_Au[day],
+            cash_flows_g_Au=cash_flows_g_Au,
+        )
+        yield record
+        if stop_when is not None and np.any(stop_when(record)):
+            return
@@ -0,0 +1,223 @@
+"""Versioned binary snapshots of a world and of characters
+
+A snapshot file is made of::
+
+    header   magic, format version, length of the table, offset and length of
+             the series block
+    table    JSON description of the entities, the characters, their assets and
+             the timeseries
+    series   the data of the dense timeseries, contiguous float64 values aligned
+             on 64 bytes
+
+Reading a snapshot memory maps the series block: the dense timeseries of the world
+view the mapped file and are only read from disk when accessed.
+"""
+
+import json
+import struct
+from dataclasses import dataclass, fields
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from . import assets
+from .character import Character
+from .timeseries import Timeseries, describe_symbolic, read_symbolic
+from .world import ENTITY_KINDS, World
+
+MAGIC = b"FTSNAP\x00\x00"
+VERSION = 1
+"""version of the snapshot format, bumped on every incompatible change"""
+HEADER = struct.Struct("<8sIQQQ")
+ALIGNMENT = 64
+
+
+class SnapshotFormatError(Exception):
+    """A file is not a snapshot or was written with another version of the format"""
+
+    def __init__(self, path: str | Path, version: int | None, message: str):
+        self.path = path
+        self.version = version
+        self.message = message
+        super().__init__(message)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    world: World
+    characters: list[Character]
+
+
+class _SeriesTable:
+    """numbers the timeseries of a snapshot: a timeseries shared by several
+    entities is written once and shared again when read"""
+
+    def __init__(self):
+        self.descriptions: list[dict] = []
+        self.blocks: list[np.ndarray] = []
+        self.size = 0
+        self._indexes: dict[int, int] = {}
+
+    def add(self, ts: Timeseries) -> int:
+        index = self._indexes.get(id(ts))
+        if index is None:
+            description = describe_symbolic(ts)
+            if description is None:
+                data = np.ascontiguousarray(ts.array, dtype=np.float64)
+                description = {
+                    "start_date": ts.start_date.isoformat(),
+                    "end_date": ts.end_date.isoformat(),
+                    "type": "block",
+                    "offset": self.size,
+                    "shape": list(data.shape),
+                }
+                self.blocks.append(data)
+                self.size += data.size
+            index = self._indexes[id(ts)] = len(self.descriptions)
+            self.descriptions.append(description)
+        return index
+
+
+def _encode(instance, world: World, series: _SeriesTable) -> dict:
+    """describes the fields of an entity or an asset. The world entities are
+    referenced by kind and name, the timeseries by their index in the table."""
+    values = {}
+    for field in fields(instance):
+        if not field.init:
+            continue
+        value = getattr(instance, field.name)
+        if type(value) in ENTITY_KINDS:
+            kind = ENTITY_KINDS[type(value)]
+            # raises UnknownEntity for an entity missing from the world
+            world.entity(kind, value.name)
+            value = {"entity": kind, "name": value.name}
+        elif isinstance(value, Timeseries):
+            value = {"series": series.add(value)}
+        elif isinstance(value, date):
+            value = value.isoformat()
+        values[field.name] = value
+    return values
+
+
+def _decode(cls: type, values: dict, entities: dict, series: list) -> dict:
+    types = {field.name: field.type for field in fields(cls)}
+    decoded = {}
+    for name, value in values.items():
+        if isinstance(value, dict) and "entity" in value:
+            value = entities[(value["entity"], value["name"])]
+        elif isinstance(value, dict):
+            value = series[value["series"]]
+        elif types[name] is date:
+            value = date.fromisoformat(value)
+        decoded[name] = value
+    return decoded
+
+
+def _encode_character(character: Character, world: World, series) -> dict:
+    values = _encode(character, world, series)
+    values["assets"] = [
+        {"type": type(asset).__name__, "fields": _encode(asset, world, series)}
+        for asset in character.assets
+    ]
+    return values
+
+
+def write_snapshot(
+    path: str | Path, world: World, characters: list[Character] = ()
+) -> None:
+    """writes a world and characters whose assets refer to the entities of the
+    world"""
+    series = _SeriesTable()
+    table = {"name": world.name}
+    for kind in ENTITY_KINDS.values():
+        table[kind] = [
+            _encode(entity, world, series) for entity in getattr(world, kind)
+        ]
+    table["characters"] = [
+        _encode_character(character, world, series) for character in characters
+    ]
+    table["series"] = series.descriptions
+    encoded_table = json.dumps(table).encode()
+    series_offset = -(-(HEADER.size + len(encoded_table)) // ALIGNMENT) * ALIGNMENT
+    with open(path, "wb") as file:
+        file.write(
+            HEADER.pack(MAGIC, VERSION, len(encoded_table), series_offset, series.size)
+        )
+        file.write(encoded_table)
+        file.write(b"\x00" * (series_offset - HEADER.size - len(encoded_table)))
+        for block in series.blocks:
+            file.write(block.tobytes())
+
+
+def _read_series_block(path, offset: int, size: int, memory_map: bool) -> np.ndarray:
+    if size == 0:
+        return np.empty(0)
+    if memory_map:
+        return np.memmap(path, dtype=np.float64, mode="r", offset=offset, shape=size)
+    block = np.fromfile(path, dtype=np.float64, count=size, offset=offset)
+    block.flags.writeable = False
+    return block
+
+
+def read_snapshot(path: str | Path, memory_map: bool = True) -> Snapshot:
+    """reads a snapshot written by write_snapshot. The dense timeseries are
+    read-only views of the series block, which is memory mapped by default.
+
+    Raises:
+        SnapshotFormatError: the file is not a snapshot of the current version
+    """
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size or header[: len(MAGIC)] != MAGIC:
+            raise SnapshotFormatError(
+                path=path, version=None, message=f"""{path} is not a snapshot"""
+            )
+        _, version, table_length, series_offset, series_size = HEADER.unpack(header)
+        if version != VERSION:
+            raise SnapshotFormatError(
+                path=path,
+                version=version,
+                message=f"""{path} is a snapshot of version {version}, version {VERSION} is supported""",
+            )
+        table = json.loads(file.read(table_length))
+    block = _read_series_block(path, series_offset, series_size, memory_map)
+
+    series = []
+    for description in table["series"]:
+        if description["type"] != "block":
+            series.append(read_symbolic(description))
+            continue
+        offset = description["offset"]
+        shape = tuple(description["shape"])
+        data = block[offset : offset + int(np.prod(shape))].reshape(shape)
+        series.append(
+            Timeseries(
+                start_date=date.fromisoformat(description["start_date"]),
+                end_date=date.fromisoformat(description["end_date"]),
+                data=data,
+            )
+        )
+
+    entities = {}
+    world_entities = {}
+    for entity_class, kind in ENTITY_KINDS.items():
+        world_entities[kind] = []
+        for values in table[kind]:
+            entity = entity_class(**_decode(entity_class, values, entities, series))
+            entities[(kind, entity.name)] = entity
+            world_entities[kind].append(entity)
+    world = World(name=table["name"], **world_entities)
+
+    characters = []
+    for values in table["characters"]:
+        owned = []
+        for record in values.pop("assets"):
+            asset_class = getattr(assets, record["type"])
+            owned.append(
+                asset_class(**_decode(asset_class, record["fields"], entities, series))
+            )
+        characters.append(
+            Character(**_decode(Character, values, entities, series), assets=owned)
+        )
+    return Snapshot(world=world, characters=characters)
@@ -1,15 +1,76 @@
 """Module for handling timeseries of data
 """
 
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from datetime import date
+from functools import lru_cache
 
-import pandas as pd
+import numpy as np
+
+from .calendar import EPOCH_ORDINAL, month_ordinal, month_ordinals, ordinal_to_date
+
+BACKENDS = ("numpy", "list")
+_backend = "numpy"
+
+
+def set_backend(name: str) -> None:
+    """selects the storage used for the data of the timeseries created from now on.
+
+    Args:
+        name (str): "numpy" stores the data in a contiguous float64 array and is the
+            default. "list" stores a python list of floats, like the former
+            implementation, for code that relies on list semantics.
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(
+            f"unknown timeseries backend {name}, expected one of {BACKENDS}"
+        )
+    _backend = name
+
+
+def get_backend() -> str:
+    """returns the name of the storage used for new timeseries"""
+    return _backend
+
+
+_lazy_evaluation = ContextVar("lazy_evaluation", default=False)
+
+
+@contextmanager
+def lazy_evaluation():
+    """within this context the timeseries operators build a lazy expression (see
+    the expression module) instead of computing their result"""
+    token = _lazy_evaluation.set(True)
+    try:
+        yield
+    finally:
+        _lazy_evaluation.reset(token)
+
+
+def is_lazy() -> bool:
+    """tells whether the timeseries operators build lazy expressions"""
+    return _lazy_evaluation.get()
+
+
+def _lazy_operation(operator: str, left, right):
+    from .expression import lazy
+
+    return getattr(lazy(left), operator)(right)
+
+
+def _to_backend(data):
+    """converts the data of a timeseries to the storage of the active backend"""
+    if _backend == "list":
+        return np.asarray(data, dtype=np.float64).tolist()
+    return np.asarray(data, dtype=np.float64)
 
 
 def months_in_interval(start: date, end: date) -> int:
     """returns the number of months in a date interval"""
-    return (end.year - start.year) * 12 + end.month - start.month + 1
+    return month_ordinal(end) - month_ordinal(start) + 1
 
 
 class DateOrderException(Exception):
@@ -47,8 +108,31 @@ class DataToPeriodMismatch(Exception):
         super().__init__(message)
 
 
-def get_slice_indexes_from_date_intervals(base: slice, contained: slice) -> slice:
+def timeseries_from_months(
+    months: np.ndarray, data: np.ndarray, source: str = "data"
+) -> "Timeseries":
+    """builds a timeseries from month ordinals and data holding the months on its
+    last axis. The months have to follow each other without gaps."""
+    if len(months) == 0:
+        raise ValueError(f"the {source} holds no month")
+    start_date, end_date = ordinal_to_date(months[0]), ordinal_to_date(months[-1])
+    if np.any(np.diff(months) <= 0):
+        raise DateOrderException(
+            start_date=start_date,
+            end_date=end_date,
+            message=f"""the months of the {source} are not in increasing order""",
+        )
+    if months[-1] - months[0] + 1 != len(months):
+        raise DataToPeriodMismatch(
+            start_date=start_date,
+            end_date=end_date,
+            no_samples=len(months),
+            message=f"""the {source} holds {len(months)} months for the {months[-1] - months[0] + 1} months of the period {start_date} -> {end_date}""",
+        )
+    return Timeseries(start_date=start_date, end_date=end_date, data=data)
+
 
+def get_slice_indexes_from_date_intervals(base: slice, contained: slice) -> slice:
     if (
         not base.start <= contained.start < base.stop
         or not base.start < contained.stop <= base.stop
@@ -67,13 +151,31 @@ def get_slice_indexes_from_date_intervals(base: slice, contained: slice) -> slic
 
 @dataclass(kw_only=True)
 class Timeseries:
-    """A timeseries of Monthly data."""
+    """A timeseries of Monthly data.
+
+    The months are the last axis of the data. Leading axes hold several paths of
+    the same indicator, e.g. the scenarios of a Monte Carlo simulation, which the
+    arithmetic operators broadcast against timeseries with a single path.
+    """
 
     start_date: date
     end_date: date
-    data: list[float]
+    data: np.ndarray | list[float]
 
     def __post_init__(self):
+        self.data = _to_backend(self.data)
+        self._check_date_order()
+
+        no_samples = np.shape(self.data)[-1]
+        if months_in_interval(self.start_date, self.end_date) != no_samples:
+            raise DataToPeriodMismatch(
+                start_date=self.start_date,
+                end_date=self.end_date,
+                no_samples=no_samples,
+                message=f"""Timeseries init error: The length of the data {no_samples} does not match the number of samples from the period: {months_in_interval(self.start_date, self.end_date)}""",
+            )
+
+    def _check_date_order(self):
         if self.start_date > self.end_date:
             raise DateOrderException(
                 start_date=self.start_date,
@@ -82,123 +184,640 @@ class Timeseries:
                             end date {self.end_date} in the timeseries""",
             )
 
-        if months_in_interval(self.start_date, self.end_date) != len(self.data):
-            raise DataToPeriodMismatch(
-                start_date=self.start_date,
-                end_date=self.end_date,
-                no_samples=len(self.data),
-                message=f"""Timeseries init error: The length of the data {len(self.data)} does not match the number of samples from the period: {months_in_interval(self.start_date, self.end_date)}""",
-            )
+    def __len__(self) -> int:
+        return months_in_interval(self.start_date, self.end_date)
+
+    @property
+    def start_month(self) -> int:
+        """month ordinal of the start date"""
+        return month_ordinal(self.start_date)
+
+    @property
+    def end_month(self) -> int:
+        """month ordinal of the end date"""
+        return month_ordinal(self.end_date)
+
+    def _interval(self, first_month: int, stop_month: int) -> slice:
+        """indexes of the data from the month ordinal first_month (included) to
+        stop_month (excluded)"""
+        start_month = self.start_month
+        return slice(first_month - start_month, stop_month - start_month)
+
+    @property
+    def paths_shape(self) -> tuple[int, ...]:
+        """shape of the leading axes of the data, () for a single path"""
+        return np.shape(self.array)[:-1]
 
     def __add__(self, other):
         """addition operation will add data matching the same time indexes and
         fill the difference with zeros.
         """
-        # Implementation details for addition operation...
-        add_start_date = min(self.start_date, other.end_date)
+        if not isinstance(other, Timeseries):
+            return NotImplemented
+        if is_lazy():
+            return _lazy_operation("__add__", self, other)
+        add_start_date = min(self.start_date, other.start_date)
         add_end_date = max(self.end_date, other.end_date)
-        added_timeseries = Timeseries(
-            start_date=add_start_date,
-            end_date=add_end_date,
-            data=[0] * months_in_interval(add_start_date, add_end_date),
+        symbolic = _symbolic_add(self, other, add_start_date, add_end_date)
+        if symbolic is not None:
+            return symbolic
+
+        return self._union_operation(other, np.add, add_start_date, add_end_date)
+
+    def __sub__(self, other):
+        if not isinstance(other, Timeseries):
+            return NotImplemented
+        if is_lazy():
+            return _lazy_operation("__sub__", self, other)
+        if _is_dense(self) or _is_dense(other):
+            return self._union_operation(
+                other,
+                np.subtract,
+                min(self.start_date, other.start_date),
+                max(self.end_date, other.end_date),
+            )
+        # negating a symbolic timeseries only negates its coefficients
+        return self + (-other)
+
+    def _union_operation(self, other, operation, start: date, end: date):
+        """applies a ufunc to both timeseries aligned on the union of their
+        periods, the months outside of a period counting as zero. The result is
+        written straight into one buffer, without temporaries."""
+        first_month = month_ordinal(start)
+        self_interval = slice(
+            self.start_month - first_month, self.end_month - first_month + 1
         )
-        self_slice_interval = get_slice_indexes_from_date_intervals(
-            slice(add_start_date, add_end_date), slice(self.start_date, self.end_date)
+        other_interval = slice(
+            other.start_month - first_month, other.end_month - first_month + 1
         )
-        other_slice_interval = get_slice_indexes_from_date_intervals(
-            slice(add_start_date, add_end_date), slice(other.start_date, other.end_date)
+        if self_interval == other_interval:
+            data = operation(self.array, other.array)
+        else:
+            paths_shape = np.broadcast_shapes(self.paths_shape, other.paths_shape)
+            data = np.empty(paths_shape + (month_ordinal(end) - first_month + 1,))
+            data[..., : self_interval.start] = 0.0
+            data[..., self_interval.stop :] = 0.0
+            data[..., self_interval] = self.array
+            result = data[..., other_interval]
+            operation(result, other.array, out=result)
+        return Timeseries(start_date=start, end_date=end, data=data)
+
+    def _intersection_operation(self, other, operation, start: date, end: date):
+        """applies a ufunc to the views of both timeseries over a common period,
+        allocating the result only"""
+        first_month = month_ordinal(start)
+        stop_month = month_ordinal(end) + 1
+        return Timeseries(
+            start_date=start,
+            end_date=end,
+            data=operation(
+                self.array[..., self._interval(first_month, stop_month)],
+                other.array[..., other._interval(first_month, stop_month)],
+            ),
         )
-        add_self = [
-            x + y for x, y in zip(added_timeseries.data[self_slice_interval], self.data)
-        ]
-        added_timeseries.data[self_slice_interval] = add_self
-
-        add_other = [
-            x + y
-            for x, y in zip(added_timeseries.data[other_slice_interval], other.data)
-        ]
-        added_timeseries.data[other_slice_interval] = add_other
 
-        return added_timeseries
-
-    def __sub__(self, other):
-        negated_other = Timeseries(
-            start_date=other.start_date,
-            end_date=other.end_date,
-            data=[-x for x in other.data],
+    def __neg__(self):
+        return Timeseries(
+            start_date=self.start_date, end_date=self.end_date, data=-self.array
         )
-        return self + negated_other
 
     def __mul__(self, other):
+        """multiplication is computed on the period common to both timeseries"""
+        if not isinstance(other, Timeseries):
+            return NotImplemented
+        if is_lazy():
+            return _lazy_operation("__mul__", self, other)
         mul_start_date = max(self.start_date, other.start_date)
         mul_end_date = min(self.end_date, other.end_date)
-        mul_timeseries = Timeseries(
-            start_date=mul_start_date,
-            end_date=mul_end_date,
-            data=[1] * months_in_interval(mul_start_date, mul_end_date),
-        )
-        self_slice_interval = get_slice_indexes_from_date_intervals(
-            slice(self.start_date, self.end_date), slice(mul_start_date, mul_end_date)
-        )
-        other_slice_interval = get_slice_indexes_from_date_intervals(
-            slice(other.start_date, other.end_date), slice(mul_start_date, mul_end_date)
+        if mul_start_date > mul_end_date:
+            raise IncludePeriodMismatch(
+                message=f"""period {self.start_date}->{self.end_date} does not overlap period {other.start_date}->{other.end_date}""",
+            )
+        symbolic = _symbolic_mul(self, other, mul_start_date, mul_end_date)
+        if symbolic is not None:
+            return symbolic
+
+        return self._intersection_operation(
+            other, np.multiply, mul_start_date, mul_end_date
         )
-        mul_timeseries.data = [
-            x * y for x, y in zip(mul_timeseries.data, self.data[self_slice_interval])
-        ]
 
-        mul_timeseries.data = [
-            x * y for x, y in zip(mul_timeseries.data, other.data[other_slice_interval])
-        ]
+    def __truediv__(self, other):
+        if not isinstance(other, Timeseries):
+            return NotImplemented
+        if is_lazy():
+            return _lazy_operation("__truediv__", self, other)
+        div_start_date = max(self.start_date, other.start_date)
+        div_end_date = min(self.end_date, other.end_date)
+        if div_start_date > div_end_date:
+            raise IncludePeriodMismatch(
+                message=f"""period {self.start_date}->{self.end_date} does not overlap period {other.start_date}->{other.end_date}""",
+            )
+        symbolic = _symbolic_div(self, other, div_start_date, div_end_date)
+        if symbolic is not None:
+            return symbolic
+        if _is_dense(self) or _is_dense(other):
+            return self._intersection_operation(
+                other, np.divide, div_start_date, div_end_date
+            )
+        # the reciprocal of a symbolic timeseries may keep a compact form
+        return self * other.reciprocal()
 
-        return mul_timeseries
+    def reciprocal(self) -> "Timeseries":
+        """returns the timeseries of 1/x for every month"""
+        return Timeseries(
+            start_date=self.start_date, end_date=self.end_date, data=1 / self.array
+        )
 
-    def __truediv__(self, other):
-        inverse_other = Timeseries(
-            start_date=other.start_date,
-            end_date=other.end_date,
-            data=[1 / x for x in other.data],
+    def __eq__(self, other):
+        if not isinstance(other, Timeseries):
+            return NotImplemented
+        return (
+            self.start_date == other.start_date
+            and self.end_date == other.end_date
+            and np.array_equal(self.array, other.array)
         )
-        return self * inverse_other
 
-    def __getitem__(self, key: slice | date):
-        """Implement slicing and indexing"""
+    def __getitem__(self, key: slice | date | list | np.ndarray):
+        """Implement slicing and indexing. A slice of dates returns a view: the
+        timeseries of the slice shares the buffer of this one, at the offset of
+        its first month, without copying it (with the numpy backend). A list or an
+        array of dates (or month ordinals) gathers the values of all of them at
+        once."""
 
         if isinstance(key, date):
-            data_index = months_in_interval(self.start_date, key) - 1
-            return self.data[data_index]
+            return self._value_at(self._index(month_ordinal(key)))
+        if isinstance(key, (list, tuple, np.ndarray)):
+            return self.take(key)
 
         time_range = key
         slice_interval = get_slice_indexes_from_date_intervals(
             slice(self.start_date, self.end_date),
             slice(time_range.start, time_range.stop),
         )
-        # Slice the data list based on the calculated indices
-        sliced_data = self.data[slice_interval]
+        return self._window(slice_interval, time_range.start, time_range.stop)
+
+    def _index(self, ordinals: int | np.ndarray) -> int | np.ndarray:
+        """index of the data of month ordinals, checking they are in the period"""
+        indexes = np.subtract(ordinals, self.start_month)
+        if np.any(indexes < 0) or np.any(indexes >= len(self)):
+            raise IncludePeriodMismatch(
+                message=f"""months {ordinals} are not included in timeseries period {self.start_date} -> {self.end_date}""",
+            )
+        return indexes
 
-        # Create and return the sliced Timeseries
+    def take(self, days) -> np.ndarray:
+        """returns the values of many months at once.
+
+        Args:
+            days: dates, numpy datetime64 values or month ordinals
+
+        Returns:
+            np.ndarray: the values, with the months on the last axis
+        """
+        return self._value_at(self._index(month_ordinals(days)))
+
+    def window(self, first_month: int, last_month: int) -> "Timeseries":
+        """returns the part of the timeseries from the month ordinal first_month to
+        last_month (both included), starting on the first day of the month"""
+        self._index(np.array([first_month, last_month]))
+        return self._window(
+            self._interval(first_month, last_month + 1),
+            ordinal_to_date(first_month),
+            ordinal_to_date(last_month),
+        )
+
+    def _value_at(self, index: int | np.ndarray) -> float | np.ndarray:
+        if isinstance(self.data, list) and np.ndim(index) == 0:
+            return self.data[index]
+        value = self.array[..., index]
+        # a single path indexed by one month gives a 0-d array, read its scalar
+        return value[()] if value.ndim == 0 else value
+
+    def _window(self, interval: slice, start: date, end: date) -> "Timeseries":
         return Timeseries(
-            start_date=time_range.start, end_date=time_range.stop, data=sliced_data
+            start_date=start, end_date=end, data=self.array[..., interval]
         )
 
+    @property
+    def array(self) -> np.ndarray:
+        """data of the timeseries as a float64 array. No copy is made with the numpy
+        backend"""
+        return np.asarray(self.data, dtype=np.float64)
+
     @property
     def pd_timeseries(self):
-        range = pd.date_range(self.start_date, self.end_date, freq="ME")
-        return pd.Series(self.data, index=range)
+        return self.to_pandas()
+
+    def to_pandas(self):
+        """converts to a pandas Series indexed by the month ends, or a DataFrame
+        holding one column per path. The data is shared, not copied, and the index
+        is built once per period."""
+        # pandas is only imported when needed: importing the models stays fast
+        import pandas as pd
+
+        index = _monthly_index(self.start_month, len(self))
+        data = self.array
+        if data.ndim == 1:
+            return pd.Series(data, index=index, copy=False)
+        return pd.DataFrame(data.reshape(-1, len(self)).T, index=index, copy=False)
+
+    @classmethod
+    def from_pandas(cls, series) -> "Timeseries":
+        """builds a timeseries from a Series or a DataFrame (one column per path)
+        indexed by consecutive months, as a DatetimeIndex or a monthly PeriodIndex.
+        The data is shared when it is a float64 block."""
+        index = series.index
+        if hasattr(index, "to_timestamp"):
+            index = index.to_timestamp()
+        data = series.to_numpy(dtype=np.float64, copy=False)
+        return timeseries_from_months(
+            month_ordinals(index.to_numpy()), data.T, source="pandas index"
+        )
+
+    def to_arrow(self):
+        """converts to an Arrow table with a month column followed by a value
+        column, or a column per path. The columns view the data of the timeseries
+        and the month column is built once per period."""
+        import pyarrow as pa
+
+        columns = {"month": _monthly_arrow_index(self.start_month, len(self))}
+        paths = self.array.reshape(-1, len(self))
+        names = ["value"] if self.array.ndim == 1 else range(len(paths))
+        for name, data in zip(names, paths):
+            data = np.ascontiguousarray(data)
+            columns[str(name)] = pa.Array.from_buffers(
+                pa.float64(), len(data), [None, pa.py_buffer(data)]
+            )
+        return pa.table(columns)
+
+    @classmethod
+    def from_arrow(cls, table, month_column: str = "month") -> "Timeseries":
+        """builds a timeseries from a table written by to_arrow: a month column and
+        one value column per path, in any order. A single value column is not
+        copied when it has a single chunk without nulls."""
+        if month_column not in table.column_names:
+            raise ValueError(
+                f"the table has no {month_column} column, its columns are"
+                f" {table.column_names}"
+            )
+        names = [name for name in table.column_names if name != month_column]
+        if not names:
+            raise ValueError(f"the table has no value column next to {month_column}")
+        months = month_ordinals(table.column(month_column).to_numpy())
+        paths = [
+            (
+                column.chunk(0).to_numpy(zero_copy_only=False)
+                if column.num_chunks == 1
+                else column.to_numpy()
+            )
+            for name, column in zip(table.column_names, table.columns)
+            if name != month_column
+        ]
+        data = paths[0] if names == ["value"] else np.stack(paths)
+        return timeseries_from_months(
+            months, data, source=f"arrow {month_column} column"
+        )
 
 
-def constant_timeseries(value: float, start: date, end: date) -> Timeseries:
-    data = [value] * months_in_interval(start, end)
-    return Timeseries(
+@lru_cache(maxsize=1024)
+def _monthly_index(start_month: int, months: int):
+    """month end index of a period, shared by the conversions to pandas"""
+    import pandas as pd
+
+    return pd.date_range(
+        ordinal_to_date(start_month), periods=months, freq="ME", name="month"
+    )
+
+
+@lru_cache(maxsize=1024)
+def _monthly_arrow_index(start_month: int, months: int):
+    """first day of every month of a period, shared by the conversions to arrow"""
+    import pyarrow as pa
+
+    days = np.arange(start_month, start_month + months) - EPOCH_ORDINAL
+    return pa.array(days.astype("datetime64[M]").astype("datetime64[D]"))
+
+
+class ConstantTimeseries(Timeseries):
+    """A timeseries holding the same value in every month. Only the value is
+    stored, the data is a read-only broadcast of it. An array value holds one
+    constant per path."""
+
+    def __init__(self, *, start_date: date, end_date: date, value: float | np.ndarray):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.value = float(value) if np.ndim(value) == 0 else np.asarray(value, float)
+        self._check_date_order()
+
+    def __repr__(self):
+        return f"ConstantTimeseries(start_date={self.start_date!r}, end_date={self.end_date!r}, value={self.value!r})"
+
+    @property
+    def data(self):
+        return _to_backend(self.array)
+
+    @property
+    def array(self) -> np.ndarray:
+        value = np.asarray(self.value, dtype=np.float64)
+        return np.broadcast_to(value[..., np.newaxis], value.shape + (len(self),))
+
+    @property
+    def paths_shape(self) -> tuple[int, ...]:
+        return np.shape(self.value)
+
+    def __neg__(self):
+        return ConstantTimeseries(
+            start_date=self.start_date, end_date=self.end_date, value=-self.value
+        )
+
+    def reciprocal(self) -> Timeseries:
+        return ConstantTimeseries(
+            start_date=self.start_date, end_date=self.end_date, value=1 / self.value
+        )
+
+    def _value_at(self, index: int | np.ndarray) -> float | np.ndarray:
+        if np.ndim(index) == 0:
+            return self.value
+        value = np.asarray(self.value, dtype=np.float64)
+        return np.broadcast_to(value[..., np.newaxis], value.shape + np.shape(index))
+
+    def _window(self, interval: slice, start: date, end: date) -> Timeseries:
+        return ConstantTimeseries(start_date=start, end_date=end, value=self.value)
+
+
+class SegmentedTimeseries(Timeseries):
+    """A piecewise constant timeseries stored as run-length encoded segments.
+
+    Arguments:
+        lengths (np.ndarray): number of months of each segment
+        values (np.ndarray): value of each segment
+    """
+
+    def __init__(
+        self,
+        *,
+        start_date: date,
+        end_date: date,
+        lengths: np.ndarray,
+        values: np.ndarray,
+    ):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self._check_date_order()
+        if self.lengths.sum() != len(self):
+            raise DataToPeriodMismatch(
+                start_date=start_date,
+                end_date=end_date,
+                no_samples=int(self.lengths.sum()),
+                message=f"""Timeseries init error: The segments cover {self.lengths.sum()} months instead of the {len(self)} months of the period""",
+            )
+
+    def __repr__(self):
+        return f"SegmentedTimeseries(start_date={self.start_date!r}, end_date={self.end_date!r}, lengths={self.lengths!r}, values={self.values!r})"
+
+    @property
+    def data(self):
+        return _to_backend(self.array)
+
+    @property
+    def array(self) -> np.ndarray:
+        return np.repeat(self.values, self.lengths)
+
+    @property
+    def paths_shape(self) -> tuple[int, ...]:
+        return ()
+
+    def __neg__(self):
+        return SegmentedTimeseries(
+            start_date=self.start_date,
+            end_date=self.end_date,
+            lengths=self.lengths,
+            values=-self.values,
+        )
+
+    def reciprocal(self) -> Timeseries:
+        return SegmentedTimeseries(
+            start_date=self.start_date,
+            end_date=self.end_date,
+            lengths=self.lengths,
+            values=1 / self.values,
+        )
+
+    def _value_at(self, index: int | np.ndarray) -> float | np.ndarray:
+        segment = np.searchsorted(np.cumsum(self.lengths), index, side="right")
+        return self.values[segment]
+
+    def _window(self, interval: slice, start: date, end: date) -> Timeseries:
+        ends, values = _segments_in(self, start, end, fill=0.0)
+        return _constant_like(start, end, ends, values)
+
+
+class LinearTimeseries(Timeseries):
+    """A linear timeseries f(t) = a*(1+b*(t+offset)) stored by its coefficients.
+    The offset counts the months already elapsed when the timeseries is a window
+    of a longer one."""
+
+    def __init__(
+        self, *, start_date: date, end_date: date, a: float, b: float, offset: int = 0
+    ):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.a = float(a)
+        self.b = float(b)
+        self.offset = offset
+        self._check_date_order()
+
+    def __repr__(self):
+        return f"LinearTimeseries(start_date={self.start_date!r}, end_date={self.end_date!r}, a={self.a!r}, b={self.b!r}, offset={self.offset!r})"
+
+    @property
+    def data(self):
+        return _to_backend(self.array)
+
+    @property
+    def array(self) -> np.ndarray:
+        t = np.arange(self.offset, self.offset + len(self), dtype=np.float64)
+        return self.a * (1 + self.b * t)
+
+    @property
+    def paths_shape(self) -> tuple[int, ...]:
+        return ()
+
+    def __neg__(self):
+        return self._scaled(-1)
+
+    def _scaled(self, factor: float) -> "LinearTimeseries":
+        return LinearTimeseries(
+            start_date=self.start_date,
+            end_date=self.end_date,
+            a=self.a * factor,
+            b=self.b,
+            offset=self.offset,
+        )
+
+    def _divided(self, divisor: float) -> "LinearTimeseries":
+        return LinearTimeseries(
+            start_date=self.start_date,
+            end_date=self.end_date,
+            a=self.a / divisor,
+            b=self.b,
+            offset=self.offset,
+        )
+
+    def _value_at(self, index: int | np.ndarray) -> float | np.ndarray:
+        return self.a * (1 + self.b * (self.offset + index))
+
+    def _window(self, interval: slice, start: date, end: date) -> Timeseries:
+        return LinearTimeseries(
+            start_date=start,
+            end_date=end,
+            a=self.a,
+            b=self.b,
+            offset=self.offset + interval.start,
+        )
+
+
+def _segments_in(
+    ts: Timeseries, start: date, end: date, fill: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """returns the segment ends (exclusive, in months from start) and values of a
+    constant or segmented timeseries placed on the period start -> end. Months not
+    covered by the timeseries take the fill value."""
+    if isinstance(ts, ConstantTimeseries):
+        lengths = np.array([len(ts)])
+        values = np.array([ts.value])
+    else:
+        lengths, values = ts.lengths, ts.values
+    no_months = months_in_interval(start, end)
+    lead = months_in_interval(start, ts.start_date) - 1
+    ends = np.clip(lead + np.cumsum(lengths), 0, no_months)
+    if lead > 0:
+        ends = np.concatenate(([lead], ends))
+        values = np.concatenate(([fill], values))
+    if ends[-1] < no_months:
+        ends = np.concatenate((ends, [no_months]))
+        values = np.concatenate((values, [fill]))
+    not_empty = np.diff(ends, prepend=0) > 0
+    return ends[not_empty], values[not_empty]
+
+
+def _constant_like(
+    start: date, end: date, ends: np.ndarray, values: np.ndarray
+) -> Timeseries:
+    """builds the most compact timeseries from segment ends and values, merging
+    neighbouring segments with equal values"""
+    keep = np.append(values[1:] != values[:-1], True)
+    ends, values = ends[keep], values[keep]
+    if len(values) == 1:
+        return ConstantTimeseries(start_date=start, end_date=end, value=values[0])
+    return SegmentedTimeseries(
         start_date=start,
         end_date=end,
-        data=data,
+        lengths=np.diff(ends, prepend=0),
+        values=values,
     )
 
 
-def linear_timeseries(
-    a: float, b: float, start: date, end: date
+def _combine_segments(
+    self: Timeseries, other: Timeseries, start: date, end: date, operation
 ) -> Timeseries:
+    self_ends, self_values = _segments_in(self, start, end, fill=0.0)
+    other_ends, other_values = _segments_in(other, start, end, fill=0.0)
+    ends = np.union1d(self_ends, other_ends)
+    values = operation(
+        self_values[np.searchsorted(self_ends, ends)],
+        other_values[np.searchsorted(other_ends, ends)],
+    )
+    return _constant_like(start, end, ends, values)
+
+
+def _affine(ts: Timeseries) -> tuple[float, float] | None:
+    """returns the value at the first month and the monthly slope of a constant or
+    linear timeseries"""
+    if _is_scalar_constant(ts):
+        return ts.value, 0.0
+    if isinstance(ts, LinearTimeseries):
+        return ts._value_at(0), ts.a * ts.b
+    return None
+
+
+def _is_dense(ts: Timeseries) -> bool:
+    return type(ts) is Timeseries
+
+
+def _is_scalar_constant(ts: Timeseries) -> bool:
+    return isinstance(ts, ConstantTimeseries) and np.ndim(ts.value) == 0
+
+
+def _is_piecewise_constant(ts: Timeseries) -> bool:
+    return _is_scalar_constant(ts) or isinstance(ts, SegmentedTimeseries)
+
+
+def _symbolic_add(
+    self: Timeseries, other: Timeseries, start: date, end: date
+) -> Timeseries | None:
+    """adds two symbolic timeseries without expanding them. Returns None when the
+    result has no compact representation."""
+    if _is_piecewise_constant(self) and _is_piecewise_constant(other):
+        return _combine_segments(self, other, start, end, np.add)
+
+    self_affine, other_affine = _affine(self), _affine(other)
+    if self_affine is None or other_affine is None:
+        return None
+    if len(self) != len(other) or len(self) != months_in_interval(start, end):
+        return None
+    if other_affine == (0.0, 0.0):
+        return self._window(slice(0, len(self)), start, end)
+    if self_affine == (0.0, 0.0):
+        return other._window(slice(0, len(other)), start, end)
+    first_value = self_affine[0] + other_affine[0]
+    slope = self_affine[1] + other_affine[1]
+    if first_value == 0:
+        return None
+    return LinearTimeseries(
+        start_date=start, end_date=end, a=first_value, b=slope / first_value
+    )
+
+
+def _symbolic_mul(
+    self: Timeseries, other: Timeseries, start: date, end: date
+) -> Timeseries | None:
+    """multiplies two symbolic timeseries without expanding them. Returns None when
+    the result has no compact representation."""
+    if _is_piecewise_constant(self) and _is_piecewise_constant(other):
+        return _combine_segments(self, other, start, end, np.multiply)
+    first_month, stop_month = month_ordinal(start), month_ordinal(end) + 1
+    if isinstance(self, LinearTimeseries) and _is_scalar_constant(other):
+        interval = self._interval(first_month, stop_month)
+        return self._window(interval, start, end)._scaled(other.value)
+    if _is_scalar_constant(self) and isinstance(other, LinearTimeseries):
+        interval = other._interval(first_month, stop_month)
+        return other._window(interval, start, end)._scaled(self.value)
+    return None
+
+
+def _symbolic_div(
+    self: Timeseries, other: Timeseries, start: date, end: date
+) -> Timeseries | None:
+    """divides two symbolic timeseries without expanding them. Returns None when
+    the result has no compact representation."""
+    if _is_piecewise_constant(self) and _is_piecewise_constant(other):
+        return _combine_segments(self, other, start, end, np.divide)
+    if isinstance(self, LinearTimeseries) and _is_scalar_constant(other):
+        interval = self._interval(month_ordinal(start), month_ordinal(end) + 1)
+        return self._window(interval, start, end)._divided(other.value)
+    return None
+
+
+def constant_timeseries(value: float, start: date, end: date) -> Timeseries:
+    """returns a timeseries with the same value in every month. The value is stored
+    once, whatever the length of the period"""
+    return ConstantTimeseries(start_date=start, end_date=end, value=value)
+
+
+def linear_timeseries(a: float, b: float, start: date, end: date) -> Timeseries:
     """computes a linear timeseries
 
     f(t) = a*(1+*b*t)
@@ -210,14 +829,53 @@ def linear_timeseries(
         end (date):
 
     Returns:
-        Timeseries: resulting timeseries
+        Timeseries: resulting timeseries, stored by its coefficients
     """
-    data = []
-    for t in range(0, months_in_interval(start, end)):
-        data.append(a*(1+b*t))
-
-    return Timeseries(
-        start_date=start,
-        end_date=end,
-        data=data,
-    )
+    return LinearTimeseries(start_date=start, end_date=end, a=a, b=b)
+
+
+def describe_symbolic(ts: Timeseries) -> dict | None:
+    """describes a symbolic timeseries by its period and its coefficients. Returns
+    None for a dense timeseries."""
+    description = {
+        "start_date": ts.start_date.isoformat(),
+        "end_date": ts.end_date.isoformat(),
+    }
+    if isinstance(ts, ConstantTimeseries) and np.ndim(ts.value) == 0:
+        description.update(type="constant", value=ts.value)
+    elif isinstance(ts, LinearTimeseries):
+        description.update(type="linear", a=ts.a, b=ts.b, offset=ts.offset)
+    elif isinstance(ts, SegmentedTimeseries):
+        description.update(
+            type="segmented", lengths=ts.lengths.tolist(), values=ts.values.tolist()
+        )
+    else:
+        return None
+    return description
+
+
+def read_symbolic(description: dict) -> Timeseries:
+    """builds the symbolic timeseries described by describe_symbolic"""
+    start_date = date.fromisoformat(description["start_date"])
+    end_date = date.fromisoformat(description["end_date"])
+    series_type = description["type"]
+    if series_type == "constant":
+        return ConstantTimeseries(
+            start_date=start_date, end_date=end_date, value=description["value"]
+        )
+    if series_type == "linear":
+        return LinearTimeseries(
+            start_date=start_date,
+            end_date=end_date,
+            a=description["a"],
+            b=description["b"],
+            offset=description["offset"],
+        )
+    if series_type == "segmented":
+        return SegmentedTimeseries(
+            start_date=start_date,
+            end_date=end_date,
+            lengths=description["lengths"],
+            values=description["values"],
+        )
+    raise ValueError(f"unknown symbolic timeseries type {series_type}")
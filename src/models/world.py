@@ -1,20 +1,76 @@
 """Definitions of world elements relevant for financial simulations
 """
 
-from dataclasses import dataclass, field
+import weakref
+from dataclasses import dataclass, field, fields, replace
+from functools import cached_property
 from datetime import date
-from typing import Callable, Union
-import pandas as pd
-from enum import Enum
-from .timeseries import Timeseries
+import numpy as np
+
+from .calendar import month_ordinal
+from .timeseries import (
+    IncludePeriodMismatch,
+    Timeseries,
+    constant_timeseries,
+    is_lazy,
+)
+
+_derived_entities = weakref.WeakValueDictionary()
+"""the entities holding computed derived series, by id"""
+
+
+def _shared(ts: Timeseries) -> Timeseries:
+    """marks the data of a derived series read-only: it is shared by every asset
+    referencing the entity"""
+    if isinstance(ts.data, np.ndarray):
+        ts.data.flags.writeable = False
+    return ts
+
+
+class _derived:
+    """a derived series of an entity, computed once on first read and shared.
+    Within lazy_evaluation() an expression is returned and not kept, so the cached
+    series is always a computed one."""
+
+    def __init__(self, method):
+        self.method = method
+        self.__doc__ = method.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        derived = self.method(instance)
+        if not is_lazy():
+            # read from the instance dictionary from now on
+            instance.__dict__[self.name] = _shared(derived)
+            _derived_entities[id(instance)] = instance
+        return derived
 
 
 @dataclass(frozen=True, kw_only=True)
 class Currency:
+    """Currency object. The derived series are computed once and shared by every
+    asset using the currency.
+
+    Arguments:
+        name (str): name of the currency
+        interest_rate (Timeseries): monthly interest rate
+        units_per_g_Au (Timeseries): units of the currency paid for 1 gram of gold
+    """
+
     name: str
     interest_rate: Timeseries
     units_per_g_Au: Timeseries
 
+    @_derived
+    def monthly_interest_factor(self) -> Timeseries:
+        """growth of an amount over one month: 1 + interest rate"""
+        rate = self.interest_rate
+        return constant_timeseries(1, rate.start_date, rate.end_date) + rate
+
 
 @dataclass(frozen=True, kw_only=True)
 class Country:
@@ -33,14 +89,42 @@ class Country:
     real_estate_acquisition_cost_percentage: int
     stock_price: Timeseries
 
+    @_derived
+    def stock_price_g_Au(self) -> Timeseries:
+        """unit value of the stock index measured in gold"""
+        return self.stock_price / self.currency.units_per_g_Au
+
 
 @dataclass(frozen=True, kw_only=True)
 class City:
+    """City object. The derived series are computed once and shared by every
+    property in the city.
+
+    Arguments:
+        name (str): name of the city
+        country (Country): the country of the city
+        sqm_housing_price (Timeseries): price of a square meter of housing
+        yearly_price_to_rent_index (Timeseries): price of a property divided by
+            its yearly rent
+    """
+
     name: str
     country: Country
     sqm_housing_price: Timeseries
     yearly_price_to_rent_index: Timeseries
 
+    @_derived
+    def sqm_housing_price_g_Au(self) -> Timeseries:
+        """price of a square meter of housing measured in gold"""
+        return self.sqm_housing_price / self.country.currency.units_per_g_Au
+
+    @_derived
+    def monthly_rent_yield(self) -> Timeseries:
+        """monthly rent divided by the price of a property: 1 / (12 * index)"""
+        index = self.yearly_price_to_rent_index
+        twelve = constant_timeseries(12, index.start_date, index.end_date)
+        return (twelve * index).reciprocal()
+
 
 @dataclass(frozen=True, kw_only=True)
 class Commodity:
@@ -50,10 +134,253 @@ class Commodity:
     units_per_g_Au: Timeseries
 
 
+class UnknownEntity(Exception):
+    """No entity of a kind has the requested name in the world"""
+
+    def __init__(self, kind: str, name: str, message: str):
+        self.kind = kind
+        self.name = name
+        self.message = message
+        super().__init__(message)
+
+
 @dataclass(frozen=True, kw_only=True)
 class World:
+    """The entities of a simulation.
+
+    The entities are indexed by name, and the exchange rates between the currencies
+    are computed once, on first use. The lists of entities should not be modified
+    after a lookup.
+    """
+
     name: str
     currencies: list[Currency]
     countries: list[Country]
     cities: list[City]
     comodities: list[Commodity]
+
+    @cached_property
+    def _ids(self) -> dict[str, dict[str, int]]:
+        return {
+            kind: {
+                entity.name: index for index, entity in enumerate(getattr(self, kind))
+            }
+            for kind in ENTITY_KINDS.values()
+        }
+
+    def ids(self, kind: str) -> dict[str, int]:
+        """returns the position of the entities of a kind ("currencies",
+        "countries", "cities" or "comodities") by name"""
+        return self._ids[kind]
+
+    def entity(self, kind: str, name: str):
+        """returns the entity of a kind with the given name"""
+        index = self._ids[kind].get(name)
+        if index is None:
+            raise UnknownEntity(
+                kind=kind,
+                name=name,
+                message=f"""no entity named {name} among the {kind} of world {self.name}""",
+            )
+        return getattr(self, kind)[index]
+
+    def currency(self, name: str) -> Currency:
+        return self.entity("currencies", name)
+
+    def country(self, name: str) -> Country:
+        return self.entity("countries", name)
+
+    def city(self, name: str) -> City:
+        return self.entity("cities", name)
+
+    def commodity(self, name: str) -> Commodity:
+        return self.entity("comodities", name)
+
+    @cached_property
+    def fx_matrix(self) -> Timeseries:
+        """exchange rates between every pair of currencies over the period common
+        to their gold quotes: fx_matrix.array[i, j] are the units of the currency j
+        paid for one unit of the currency i, the currencies being indexed by
+        ids("currencies")"""
+        quotes = [currency.units_per_g_Au for currency in self.currencies]
+        start_date = max(quote.start_date for quote in quotes)
+        end_date = min(quote.end_date for quote in quotes)
+        if start_date > end_date:
+            raise IncludePeriodMismatch(
+                message=f"""the gold quotes of the currencies of world {self.name} have no common period""",
+            )
+        first, stop = month_ordinal(start_date), month_ordinal(end_date) + 1
+        paths_shape = np.broadcast_shapes(*(quote.paths_shape for quote in quotes))
+        stacked = np.stack(
+            [
+                np.broadcast_to(
+                    quote.array[..., quote._interval(first, stop)],
+                    paths_shape + (stop - first,),
+                )
+                for quote in quotes
+            ]
+        )
+        # units of j per unit of i = (units of j per g_Au) / (units of i per g_Au)
+        rates = stacked[np.newaxis, :] / stacked[:, np.newaxis]
+        rates.flags.writeable = False
+        return Timeseries(start_date=start_date, end_date=end_date, data=rates)
+
+    @cached_property
+    def _fx_rates(self) -> dict[tuple[int, int], Timeseries]:
+        # the same timeseries is returned for a pair, so valuations reading it
+        # can be cached
+        return {}
+
+    def fx_rate(self, base: Currency | str, quote: Currency | str) -> Timeseries:
+        """returns the units of the quote currency paid for one unit of the base
+        currency over time, read from the cached fx_matrix.
+
+        Raises:
+            UnknownEntity: a currency is not in the world
+        """
+        ids = self._ids["currencies"]
+        base_name = base if isinstance(base, str) else base.name
+        quote_name = quote if isinstance(quote, str) else quote.name
+        # self.currency raises UnknownEntity for a currency missing from the world
+        base_id = ids[self.currency(base_name).name]
+        quote_id = ids[self.currency(quote_name).name]
+        fx_rate = self._fx_rates.get((base_id, quote_id))
+        if fx_rate is None:
+            fx_matrix = self.fx_matrix
+            fx_rate = Timeseries(
+                start_date=fx_matrix.start_date,
+                end_date=fx_matrix.end_date,
+                data=fx_matrix.array[base_id, quote_id],
+            )
+            self._fx_rates[(base_id, quote_id)] = fx_rate
+        return fx_rate
+
+    def convert(
+        self, ts: Timeseries, base: Currency | str, quote: Currency | str
+    ) -> Timeseries:
+        """converts a timeseries of amounts in the base currency to the quote
+        currency"""
+        return ts * self.fx_rate(base, quote)
+
+    def fork(self, name: str | None = None, **overrides: dict[str, dict]) -> "World":
+        """returns a variant of the world in which some fields of some entities are
+        replaced, e.g. ``world.fork(cities={"Paris": {"sqm_housing_price": ts}})``.
+
+        Only the overridden entities and the entities referencing them are
+        rebuilt; every other entity and timeseries is shared with this world. The
+        derived series whose inputs are unchanged, the name index and, when the
+        currencies are unchanged, the exchange rates are shared too, so the
+        valuations cached on unchanged indicators stay valid in the fork.
+
+        Args:
+            name (str): name of the fork, the name of this world by default
+            overrides: by kind of entity ("currencies", "countries", "cities" or
+                "comodities"), the fields to replace by entity name
+
+        Returns:
+            World: the fork
+        """
+        unknown_kinds = set(overrides) - set(ENTITY_KINDS.values())
+        if unknown_kinds:
+            raise ValueError(
+                f"unknown entity kinds {sorted(unknown_kinds)}, expected"
+                f" {list(ENTITY_KINDS.values())}"
+            )
+        for kind, entity_overrides in overrides.items():
+            for entity_name in entity_overrides:
+                self.entity(kind, entity_name)
+
+        rebuilt = {}
+        entities = {}
+        # the kinds are listed after the kinds they reference
+        for kind in ENTITY_KINDS.values():
+            entities[kind] = []
+            for entity in getattr(self, kind):
+                changes = dict(overrides.get(kind, {}).get(entity.name, {}))
+                for entity_field in fields(entity):
+                    referenced = getattr(entity, entity_field.name)
+                    if id(referenced) in rebuilt:
+                        changes.setdefault(entity_field.name, rebuilt[id(referenced)])
+                if changes:
+                    forked = replace(entity, **changes)
+                    _share_derived(entity, forked)
+                    rebuilt[id(entity)] = forked
+                    entity = forked
+                entities[kind].append(entity)
+
+        fork = World(name=self.name if name is None else name, **entities)
+        fork.__dict__["_ids"] = self._ids
+        if all(
+            forked is currency
+            for forked, currency in zip(fork.currencies, self.currencies)
+        ):
+            for cached in ("fx_matrix", "_fx_rates"):
+                if cached in self.__dict__:
+                    fork.__dict__[cached] = self.__dict__[cached]
+        return fork
+
+    def rebind(self, instance):
+        """returns a copy of an asset (or of any dataclass referencing world
+        entities) referencing the entities of this world with the same kind and
+        name, e.g. to value it in a fork. The instance itself is returned when it
+        already references them."""
+        changes = {}
+        for instance_field in fields(instance):
+            value = getattr(instance, instance_field.name)
+            kind = ENTITY_KINDS.get(type(value))
+            if kind is not None:
+                entity = self.entity(kind, value.name)
+                if entity is not value:
+                    changes[instance_field.name] = entity
+        return replace(instance, **changes) if changes else instance
+
+
+ENTITY_KINDS = {
+    Currency: "currencies",
+    Country: "countries",
+    City: "cities",
+    Commodity: "comodities",
+}
+"""attribute of the World listing each kind of entity"""
+
+DERIVED_INPUTS = {
+    Currency: {"monthly_interest_factor": lambda currency: (currency.interest_rate,)},
+    Country: {
+        "stock_price_g_Au": lambda country: (
+            country.stock_price,
+            country.currency.units_per_g_Au,
+        )
+    },
+    City: {
+        "sqm_housing_price_g_Au": lambda city: (
+            city.sqm_housing_price,
+            city.country.currency.units_per_g_Au,
+        ),
+        "monthly_rent_yield": lambda city: (city.yearly_price_to_rent_index,),
+    },
+    Commodity: {},
+}
+"""indicators read by the derived series of every kind of entity"""
+
+
+def _share_derived(entity, forked) -> None:
+    """hands the derived series already computed by an entity over to its fork
+    when the fork reads the same indicators"""
+    for name, inputs in DERIVED_INPUTS[type(entity)].items():
+        if name in entity.__dict__ and all(
+            used is forked_used
+            for used, forked_used in zip(inputs(entity), inputs(forked))
+        ):
+            forked.__dict__[name] = entity.__dict__[name]
+
+
+def invalidate_derived(series: Timeseries | None = None) -> None:
+    """drops the derived series of the entities computed from the given indicator,
+    or every derived series when no indicator is given. They are computed again on
+    their next read."""
+    for entity in list(_derived_entities.values()):
+        for name, inputs in DERIVED_INPUTS[type(entity)].items():
+            if name in entity.__dict__ and (
+                series is None or any(series is used for used in inputs(entity))
+            ):
+                del entity.__dict__[name]
@@ -0,0 +1,62 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.models.amortization import ANNUITY, LINEAR, amortize
+from src.models.timeseries import DateOrderException, Timeseries, constant_timeseries
+
+
+@pytest.fixture
+def rate():
+    return constant_timeseries(0.01, date(2024, 1, 1), date(2030, 12, 31))
+
+
+def test_annuity_schedule(rate):
+    schedule = amortize(1000, rate, date(2024, 1, 1), date(2025, 1, 1), ANNUITY)
+    annuity = 1000 * 0.01 / (1 - 1.01**-12)
+    assert schedule.payment[date(2024, 1, 1)] == 0
+    assert np.allclose(schedule.payment.array[1:], annuity)
+    assert schedule.balance[date(2024, 1, 1)] == 1000
+    assert schedule.balance[date(2024, 2, 1)] == pytest.approx(1010 - annuity)
+    assert schedule.balance[date(2025, 1, 1)] == pytest.approx(0)
+    assert np.allclose(
+        schedule.principal.array + schedule.interest.array, schedule.payment.array
+    )
+    assert schedule.principal.array.sum() == pytest.approx(1000)
+
+
+def test_linear_schedules_of_many_loans(rate):
+    schedule = amortize(
+        [1200, -600],
+        rate,
+        date(2024, 1, 1),
+        [date(2025, 1, 1), date(2024, 7, 1)],
+        LINEAR,
+    )
+    assert schedule.payment.array.shape == (2, 13)
+    assert np.allclose(schedule.principal.array[0, 1:], 100)
+    assert np.allclose(schedule.principal.array[1, 1:7], -100)
+    assert np.allclose(schedule.payment.array[1, 7:], 0)
+    assert schedule.interest.array[0, 1] == pytest.approx(12)
+    assert schedule.interest.array[0, 12] == pytest.approx(1)
+
+
+def test_variable_rate_paths():
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    rates = Timeseries(
+        start_date=start,
+        end_date=end,
+        data=[np.linspace(0.005, 0.02, 12), np.full(12, 0.01)],
+    )
+    schedule = amortize([1000, 2000], rates, start, end, ANNUITY)
+    assert schedule.balance.array.shape == (2, 2, 12)
+    assert np.allclose(schedule.balance.array[..., -1], 0)
+    assert np.allclose(schedule.payment.array[1], 2 * schedule.payment.array[0])
+    # the payments are constant whatever the path of the rate
+    assert np.allclose(np.diff(schedule.payment.array[..., 1:]), 0)
+
+
+def test_loan_repaid_before_it_is_granted(rate):
+    with pytest.raises(DateOrderException):
+        amortize(1000, rate, date(2024, 1, 1), date(2024, 1, 1))
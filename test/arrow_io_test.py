@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from datetime import date
+from src.models.arrow_io import (
+    read_world,
+    world_from_arrow,
+    world_to_arrow,
+    write_world,
+)
+from src.models.timeseries import Timeseries, constant_timeseries, linear_timeseries
+from src.models.world import City, Commodity, Country, Currency, World
+
+
+@pytest.fixture
+def world():
+    euro = Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.01, date(2020, 1, 1), date(2025, 12, 31)),
+        units_per_g_Au=Timeseries(
+            start_date=date(2020, 1, 1),
+            end_date=date(2025, 12, 31),
+            data=np.linspace(40, 60, 72),
+        ),
+    )
+    germany = Country(
+        name="DE",
+        currency=euro,
+        real_estate_acquisition_cost_percentage=9,
+        stock_price=Timeseries(
+            start_date=date(2022, 3, 1),
+            end_date=date(2023, 2, 28),
+            data=np.arange(12.0),
+        ),
+    )
+    berlin = City(
+        name="Berlin",
+        country=germany,
+        sqm_housing_price=linear_timeseries(
+            4000, 0.01, date(2020, 1, 1), date(2025, 12, 31)
+        ),
+        yearly_price_to_rent_index=constant_timeseries(
+            25, date(2020, 1, 1), date(2025, 12, 31)
+        )
+        + constant_timeseries(1, date(2022, 1, 1), date(2025, 12, 31)),
+    )
+    silver = Commodity(
+        name="Silver",
+        units_per_g_Au=Timeseries(
+            start_date=date(2019, 6, 1), end_date=date(2020, 5, 1), data=range(12)
+        ),
+    )
+    return World(
+        name="Earth",
+        currencies=[euro],
+        countries=[germany],
+        cities=[berlin],
+        comodities=[silver],
+    )
+
+
+def assert_same_world(read, world):
+    assert read.name == world.name
+    euro, germany, berlin, silver = (
+        read.currencies[0],
+        read.countries[0],
+        read.cities[0],
+        read.comodities[0],
+    )
+    assert euro == world.currencies[0]
+    assert germany == world.countries[0]
+    assert germany.currency is euro
+    assert berlin.country is germany
+    assert berlin == world.cities[0]
+    assert type(berlin.sqm_housing_price) is type(world.cities[0].sqm_housing_price)
+    assert silver == world.comodities[0]
+
+
+def test_arrow_table_round_trip(world):
+    table = world_to_arrow(world)
+    assert table.column_names == [
+        "month",
+        "currencies/EUR/units_per_g_Au",
+        "countries/DE/stock_price",
+        "comodities/Silver/units_per_g_Au",
+    ]
+    assert table.num_rows == 79
+    read = world_from_arrow(table)
+    assert_same_world(read, world)
+    units = read.currencies[0].units_per_g_Au.data
+    assert np.shares_memory(units, table.column(1).chunk(0).to_numpy())
+
+
+@pytest.mark.parametrize("format", ["parquet", "ipc"])
+def test_world_file_round_trip(world, tmp_path, format):
+    path = tmp_path / f"world.{format}"
+    write_world(world, path, format=format)
+    assert_same_world(read_world(path), world)
+    assert_same_world(read_world(path, memory_map=False), world)
+
+
+def test_write_unknown_format(world, tmp_path):
+    with pytest.raises(ValueError):
+        write_world(world, tmp_path / "world.csv", format="csv")
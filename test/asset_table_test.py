@@ -0,0 +1,76 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.models.asset_table import AssetTable
+from src.models.assets import Job, Loan, Saving, Stock
+from src.models.calendar import month_ordinal
+
+
+def test_round_trip_with_assets(portfolio):
+    character, _ = portfolio
+    table = AssetTable.from_assets(character.assets)
+    assert len(table) == 6
+    assets = table.to_assets()
+    assert [type(asset) for asset in assets] == [
+        type(asset) for asset in character.assets
+    ]
+    for asset, original in zip(assets, character.assets):
+        assert np.allclose(asset.value_g_Au.array, original.value_g_Au.array)
+        assert np.allclose(asset.stream_g_Au.array, original.stream_g_Au.array)
+
+
+def test_vectorized_valuation_matches_the_assets(portfolio):
+    character, _ = portfolio
+    table = AssetTable.from_assets(character.assets)
+    first, _ = table.period
+    values, streams = table.value_g_Au(), table.stream_g_Au()
+    for row, asset in enumerate(character.assets):
+        held = slice(
+            month_ordinal(asset.purchase_date) - first,
+            month_ordinal(asset.sale_date) - first + 1,
+        )
+        assert np.allclose(values.array[row, held], asset.value_g_Au.array)
+        assert np.allclose(streams.array[row, held], asset.stream_g_Au.array)
+        assert np.isnan(values.array[row, : held.start]).all()
+
+    total_value, total_cash_flow = table.totals_g_Au()
+    assert np.allclose(total_value.array, np.nansum(values.array, axis=0))
+    expected = np.zeros(len(total_cash_flow))
+    for asset in character.assets:
+        cash_flow = asset.cash_flow_g_Au
+        offset = cash_flow.start_month - first
+        expected[offset : offset + len(cash_flow)] += cash_flow.array
+    assert np.allclose(total_cash_flow.array, expected)
+
+
+def test_bulk_insert_and_filter(portfolio):
+    character, euro = portfolio
+    france = character.assets[1].country
+    table = AssetTable()
+    months = month_ordinal(date(2024, 1, 1)) + np.arange(24)
+    table.extend(
+        Stock,
+        purchase_dates=months,
+        sale_dates=months[-1],
+        initial_values=100,
+        currency=euro,
+        country=france,
+    )
+    table.extend(
+        Job,
+        purchase_dates=[date(2024, 1, 1)],
+        sale_dates=[date(2025, 12, 1)],
+        initial_values=0,
+        currency=euro,
+        monthly_saving=1000,
+    )
+    assert len(table) == 25
+    stocks = table.of_kind(Stock)
+    assert len(stocks) == 24
+    lots = Stock.batch_value_g_Au(france, months, [months[-1]] * 24, [100] * 24)
+    assert np.allclose(stocks.value_g_Au().array, lots.array, equal_nan=True)
+    late = table.filter(table.purchase_month >= months[12])
+    assert len(late) == 12
+    assert late.to_assets()[0].purchase_date == date(2025, 1, 1)
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from datetime import date
 from src.models.assets import (
@@ -11,6 +12,7 @@ from src.models.assets import (
     Loan,
 )
 from src.models.timeseries import (
+    DateOrderException,
     Timeseries,
     linear_timeseries,
     constant_timeseries,
@@ -152,7 +154,7 @@ def test_job(sample_data):
 
     expected_stream = constant_timeseries(300, date(2022, 1, 1), date(2022, 12, 31))
     stream = job.stream_g_Au
-    assert stream.data == expected_stream.data
+    assert stream == expected_stream
     assert job.initial_value == -1000
     assert job.purchase_date == date(2022, 1, 1)
     assert job.sale_date == date(2022, 12, 31)
@@ -195,3 +197,109 @@ def test_stock_value():
     assert stock_value[date(start.year, start.month + 1, start.day)] == 100 * (
         1 + 0.012
     ) * (1 / 10)
+
+
+def test_assets_share_the_derived_series_of_their_city():
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    euro = Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.03, start, end),
+        units_per_g_Au=constant_timeseries(10, start, end),
+    )
+    france = Country(
+        name="FR",
+        currency=euro,
+        real_estate_acquisition_cost_percentage=9,
+        stock_price=constant_timeseries(50, start, end),
+    )
+    paris = City(
+        name="Paris",
+        country=france,
+        sqm_housing_price=constant_timeseries(12000, start, end),
+        yearly_price_to_rent_index=constant_timeseries(25, start, end),
+    )
+    flats = [
+        RealEstateProperty(
+            initial_value=0,
+            purchase_date=start,
+            sale_date=end,
+            currency=euro,
+            city=paris,
+            surface_sqm=surface,
+        )
+        for surface in (30, 60)
+    ]
+    shared = paris.sqm_housing_price_g_Au
+    assert all(flat.sqm_housing_price_g_Au is shared for flat in flats)
+    assert flats[1].value_g_Au[start] == 60 * 1200
+    # the yearly rent is the value divided by the price to rent index
+    assert flats[1].stream_g_Au[start] == pytest.approx(60 * 1200 / 25 / 12)
+
+
+def test_batch_stock_valuation():
+    start, end = date(2024, 1, 1), date(2025, 12, 31)
+    euro = Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.03, start, end),
+        units_per_g_Au=constant_timeseries(10, start, end),
+    )
+    germany = Country(
+        name="DE",
+        currency=euro,
+        real_estate_acquisition_cost_percentage=9,
+        stock_price=Timeseries(start_date=start, end_date=end, data=range(100, 124)),
+    )
+    purchase_dates = [date(2024, month, 1) for month in range(1, 13)]
+    sale_dates = [date(2025, 6, 1)] * 12
+    lots = Stock.batch_value_g_Au(germany, purchase_dates, sale_dates, [100] * 12)
+    assert lots.start_date == date(2024, 1, 1)
+    assert lots.end_date == date(2025, 6, 1)
+    assert lots.array.shape == (12, 18)
+    for lot, purchase_date in enumerate(purchase_dates):
+        stock = Stock(
+            initial_value=100,
+            purchase_date=purchase_date,
+            sale_date=date(2025, 6, 1),
+            currency=euro,
+            country=germany,
+        )
+        held = lots.array[lot, lot:]
+        assert np.allclose(held, stock.value_g_Au.array)
+        assert np.isnan(lots.array[lot, :lot]).all()
+    with pytest.raises(DateOrderException):
+        Stock.batch_value_g_Au(germany, sale_dates, purchase_dates, [100] * 12)
+
+
+def test_loan_amortization():
+    start, end = date(2024, 1, 1), date(2026, 12, 31)
+    euro = Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.01, start, end),
+        units_per_g_Au=constant_timeseries(10, start, end),
+    )
+    loan = Loan(
+        initial_value=-1200,
+        purchase_date=start,
+        sale_date=date(2024, 7, 1),
+        currency=euro,
+        end_date=date(2025, 1, 1),
+    )
+    assert loan.value_g_Au[start] == -120
+    # 100 repaid every month with the interest on the remaining balance
+    assert loan.stream_g_Au[date(2024, 2, 1)] == pytest.approx(-(100 + 12) / 10)
+    assert loan.value_g_Au[date(2024, 7, 1)] == pytest.approx(-60)
+    cash_flow = loan.cash_flow_g_Au
+    assert cash_flow[start] == 120
+    # selling the loan repays the remaining balance
+    interest = loan.schedule.interest.array[:7].sum()
+    assert cash_flow.array.sum() == pytest.approx(interest / 10)
+    annuity = Loan(
+        initial_value=-1200,
+        purchase_date=start,
+        sale_date=date(2025, 6, 1),
+        currency=euro,
+        end_date=date(2025, 1, 1),
+        amortization="annuity",
+    )
+    assert np.allclose(annuity.stream_g_Au.array[1:13], annuity.stream_g_Au.array[1])
+    assert np.allclose(annuity.value_g_Au.array[12:], 0)
@@ -0,0 +1,103 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.models.amortization import ANNUITY, LINEAR
+from src.models.assets import Loan, RealEstateProperty, Stock
+from src.models.backtest import backtest_property, backtest_stock
+from src.models.calendar import month_ordinal, ordinal_to_date
+from src.models.timeseries import IncludePeriodMismatch, Timeseries
+
+
+@pytest.fixture
+def world(portfolio_world):
+    rate = portfolio_world.currency("EUR").interest_rate
+    varying = Timeseries(
+        start_date=rate.start_date,
+        end_date=rate.end_date,
+        data=0.005 + 0.0002 * np.arange(len(rate)),
+    )
+    return portfolio_world.fork(currencies={"EUR": {"interest_rate": varying}})
+
+
+def shifted(day: date, months: int) -> date:
+    return ordinal_to_date(month_ordinal(day) + months)
+
+
+def test_stock_matches_assets(world):
+    france = world.country("France")
+    table = backtest_stock(france, holding_months=12, amount=1000)
+    assert len(table) == 36 - 12
+    assert table.purchase_dates[0] == date(2024, 1, 1)
+    for purchase, invested, net in zip(
+        table.purchase_dates, table.invested_g_Au, table.net_g_Au
+    ):
+        stock = Stock(
+            initial_value=1000,
+            purchase_date=purchase,
+            sale_date=shifted(purchase, 12),
+            currency=france.currency,
+            country=france,
+        )
+        assert invested == pytest.approx(stock.value_g_Au.array[0])
+        assert net == pytest.approx(stock.cash_flow_g_Au.array.sum())
+
+
+@pytest.mark.parametrize("amortization", [LINEAR, ANNUITY])
+@pytest.mark.parametrize("loan_months", [6, 12, 18])
+def test_property_with_loan_matches_assets(world, amortization, loan_months):
+    paris = world.city("Paris")
+    euro = world.currency("EUR")
+    table = backtest_property(
+        paris,
+        holding_months=12,
+        surface_sqm=2,
+        loan_share=0.6,
+        loan_months=loan_months,
+        amortization=amortization,
+    )
+    assert len(table) == 36 - max(12, loan_months)
+    for purchase, invested, net in zip(
+        table.purchase_dates, table.invested_g_Au, table.net_g_Au
+    ):
+        sale = shifted(purchase, 12)
+        home = RealEstateProperty(
+            initial_value=0,
+            purchase_date=purchase,
+            sale_date=sale,
+            currency=euro,
+            city=paris,
+            surface_sqm=2,
+        )
+        loan = Loan(
+            initial_value=-0.6 * 2 * paris.sqm_housing_price[purchase],
+            purchase_date=purchase,
+            sale_date=sale,
+            currency=euro,
+            end_date=shifted(purchase, loan_months),
+            amortization=amortization,
+        )
+        assert invested == pytest.approx(
+            home.value_g_Au.array[0] + loan.value_g_Au.array[0]
+        )
+        cash_flows = home.cash_flow_g_Au.array.sum() + loan.cash_flow_g_Au.array.sum()
+        assert net == pytest.approx(cash_flows, abs=1e-9)
+
+
+def test_distribution(world):
+    table = backtest_property(world.city("Paris"), holding_months=24)
+    assert len(table) == 12
+    quantiles = table.quantiles((0.0, 0.5, 1.0))
+    assert quantiles[0.0] <= quantiles[0.5] <= quantiles[1.0]
+    np.testing.assert_allclose(table.annualized_returns, (1 + table.returns) ** 0.5 - 1)
+    frame = table.to_pandas()
+    assert list(frame.columns) == [
+        "invested_g_Au",
+        "net_g_Au",
+        "return",
+        "annualized_return",
+    ]
+    assert frame.index[0] == date(2024, 1, 1)
+    with pytest.raises(IncludePeriodMismatch):
+        backtest_stock(world.country("France"), holding_months=36)
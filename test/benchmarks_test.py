@@ -0,0 +1,16 @@
+from benchmarks import runner
+
+
+def test_run_and_compare():
+    report = runner.run(pattern="timeseries.add[[]months=12]", repeat=1)
+    assert list(report["results"]) == ["timeseries.add[months=12]"]
+    slower = {
+        "results": {
+            name: {"seconds": result["seconds"] * 2}
+            for name, result in report["results"].items()
+        }
+    }
+    comparisons = runner.compare(report, slower)
+    assert [comparison.ratio for comparison in comparisons] == [2]
+    assert runner.regressions(comparisons, threshold=0.2) == comparisons
+    assert runner.regressions(runner.compare(slower, report), threshold=0.2) == []
@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+from datetime import date
+from src.models.assets import RealEstateProperty, Saving, Stock
+from src.models.cache import ValuationCache, valuation_cache
+from src.models.timeseries import Timeseries, constant_timeseries
+from src.models.world import City, Country, Currency
+
+
+@pytest.fixture
+def sample_data():
+    start = date(2024, 1, 1)
+    end = date(2024, 12, 31)
+    euro = Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.03, start, end),
+        units_per_g_Au=Timeseries(start_date=start, end_date=end, data=[10] * 12),
+    )
+    germany = Country(
+        name="DE",
+        currency=euro,
+        real_estate_acquisition_cost_percentage=9,
+        stock_price=Timeseries(start_date=start, end_date=end, data=range(1, 13)),
+    )
+    return start, end, euro, germany
+
+
+def test_cache_counters_and_eviction():
+    cache = ValuationCache(maxsize=2)
+    series = constant_timeseries(1, date(2024, 1, 1), date(2024, 12, 31))
+    first = cache.get_or_compute("a", (series,), lambda: series * series)
+    assert cache.get_or_compute("a", (series,), lambda: None) is first
+    cache.get_or_compute("b", (series,), lambda: series)
+    cache.get_or_compute("c", (series,), lambda: series)
+    assert len(cache) == 2
+    recomputed = cache.get_or_compute("a", (series,), lambda: series * series)
+    assert recomputed is not first
+    info = cache.info()
+    assert (info.hits, info.misses, info.size) == (1, 4, 2)
+    assert info.hit_rate == 0.2
+
+
+def test_cache_memory_bound():
+    def paths(no_paths: int) -> Timeseries:
+        return Timeseries(
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            data=np.ones((no_paths, 12)),
+        )
+
+    # 12 months of 100 paths: 9600 bytes per entry
+    cache = ValuationCache(max_bytes=20000)
+    series = paths(100)
+    cache.get_or_compute("a", (series,), lambda: paths(100))
+    cache.get_or_compute("b", (series,), lambda: paths(100))
+    assert cache.nbytes == 19200
+    cache.get_or_compute("c", (series,), lambda: paths(100))
+    assert len(cache) == 2 and cache.nbytes == 19200
+    # symbolic timeseries hold no array
+    cache.get_or_compute(
+        "d", (series,), lambda: constant_timeseries(1, date(2024, 1, 1), date(2024, 12, 31))
+    )
+    assert len(cache) == 3
+    cache.invalidate(series)
+    assert cache.info().nbytes == 0
+    # a result larger than the bound is not kept
+    cache.get_or_compute("e", (series,), lambda: paths(300))
+    assert len(cache) == 0
+
+
+def test_cache_invalidation():
+    cache = ValuationCache()
+    kept = constant_timeseries(1, date(2024, 1, 1), date(2024, 12, 31))
+    dropped = constant_timeseries(2, date(2024, 1, 1), date(2024, 12, 31))
+    cache.get_or_compute("a", (kept,), lambda: kept)
+    cache.get_or_compute("b", (kept, dropped), lambda: dropped)
+    cache.invalidate(dropped)
+    assert len(cache) == 1
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_asset_valuations_are_memoized(sample_data):
+    start, end, euro, germany = sample_data
+    valuation_cache.invalidate()
+    stock = Stock(
+        initial_value=100,
+        purchase_date=start,
+        sale_date=end,
+        country=germany,
+        currency=euro,
+    )
+    same_stock = Stock(
+        initial_value=100,
+        purchase_date=start,
+        sale_date=end,
+        country=germany,
+        currency=euro,
+    )
+    value = stock.value_g_Au
+    assert same_stock.value_g_Au is value
+    assert not value.data.flags.writeable
+    other_stock = Stock(
+        initial_value=200,
+        purchase_date=start,
+        sale_date=end,
+        country=germany,
+        currency=euro,
+    )
+    assert other_stock.value_g_Au is not value
+
+    saving = Saving(
+        initial_value=100, purchase_date=start, sale_date=end, currency=euro
+    )
+    saving_value = saving.value_g_Au
+    valuation_cache.invalidate(euro.units_per_g_Au)
+    assert saving.value_g_Au is not saving_value
+    assert saving.value_g_Au == saving_value
+
+
+def test_invalidation_refreshes_derived_series(sample_data):
+    start, end, euro, germany = sample_data
+    berlin = City(
+        name="Berlin",
+        country=germany,
+        sqm_housing_price=constant_timeseries(4000, start, end),
+        yearly_price_to_rent_index=constant_timeseries(25, start, end),
+    )
+    stock = Stock(
+        initial_value=100,
+        purchase_date=start,
+        sale_date=end,
+        country=germany,
+        currency=euro,
+    )
+    flat = RealEstateProperty(
+        initial_value=0,
+        purchase_date=start,
+        sale_date=end,
+        currency=euro,
+        city=berlin,
+        surface_sqm=1,
+    )
+    # 100 units of the stock bought at 1 are worth 1200 euros on the last month
+    assert stock.value_at(end) == 120.0
+    assert flat.value_g_Au[end] == 400.0
+    units = euro.units_per_g_Au
+    units.data[:] = 20
+    valuation_cache.invalidate(units)
+    assert stock.value_at(end) == 60.0
+    assert stock.value_g_Au[end] == 60.0
+    assert flat.value_at(end) == 200.0
+    assert flat.value_g_Au[end] == 200.0
@@ -0,0 +1,18 @@
+from datetime import date
+
+import numpy as np
+
+from src.models.calendar import month_ordinal, month_ordinals, ordinal_to_date
+
+
+def test_month_ordinal_round_trip():
+    assert month_ordinal(date(2024, 3, 17)) - month_ordinal(date(2023, 12, 1)) == 3
+    assert ordinal_to_date(month_ordinal(date(2024, 3, 17))) == date(2024, 3, 1)
+
+
+def test_month_ordinals_of_many_dates():
+    days = [date(1969, 12, 31), date(1970, 1, 1), date(2024, 3, 17)]
+    expected = [month_ordinal(day) for day in days]
+    assert list(month_ordinals(days)) == expected
+    assert list(month_ordinals(np.array(days, dtype="datetime64[D]"))) == expected
+    assert list(month_ordinals(expected)) == expected
@@ -1,10 +1,11 @@
 import datetime
 import sre_compile
+import numpy as np
 import pytest
 from datetime import date, timedelta
-from src.models.character import Character
-from src.models.assets import RealEstateProperty, Loan
-from src.models.timeseries import DateOrderException, Timeseries
+from src.models.character import Character, LackOfFunds, SaleAfterEndOfLife
+from src.models.assets import Job, RealEstateProperty, Loan, Saving
+from src.models.timeseries import DateOrderException, Timeseries, constant_timeseries
 from src.models.world import City, Country, Currency
 
 
@@ -84,3 +85,144 @@ def test_invalid_Character(sample_data):
             start_investment_date=start_investment_date,
             end_of_life=too_early_end_of_life,
         )
+
+
+@pytest.fixture
+def euro():
+    start = date(2024, 1, 1)
+    end = date(2025, 12, 31)
+    return Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.01, start, end),
+        units_per_g_Au=constant_timeseries(10, start, end),
+    )
+
+
+def test_capital_and_ownership(euro):
+    character = Character(
+        name="John Doe",
+        start_investment_date=date(2024, 1, 1),
+        end_of_life=date(2025, 12, 31),
+        initial_capital_g_Au=5,
+    )
+    job = Job(
+        initial_value=0,
+        purchase_date=date(2024, 1, 1),
+        sale_date=date(2025, 12, 31),
+        currency=euro,
+        monthly_saving=10,
+    )
+    saving = Saving(
+        initial_value=600,
+        purchase_date=date(2024, 6, 1),
+        sale_date=date(2024, 12, 1),
+        currency=euro,
+    )
+    assert list(character.capital_g_Au.data) == [5] * 24
+    with pytest.raises(LackOfFunds):
+        character.add_ownership(saving)
+    assert character.assets == []
+
+    character.add_ownership(job)
+    assert character.capital_g_Au[date(2024, 5, 1)] == 55
+    # 60 g_Au are paid on the 6th month and returned on the 12th
+    character.add_ownership(saving)
+    assert character.capital_g_Au[date(2024, 6, 1)] == 5
+    assert character.capital_g_Au[date(2024, 12, 1)] == 125
+    assert character.ledger.lowest_capital == 5
+    assert list(character.wealth(euro).data) == [
+        10 * (5 + 10 * month) for month in range(1, 25)
+    ]
+
+    with pytest.raises(LackOfFunds):
+        character.remove_ownership(job)
+    character.remove_ownership(saving)
+    assert character.assets == [job]
+    assert character.capital_g_Au[date(2024, 12, 1)] == 125
+
+
+def test_ownership_after_end_of_life(euro):
+    character = Character(
+        name="John Doe",
+        start_investment_date=date(2024, 1, 1),
+        end_of_life=date(2024, 12, 31),
+    )
+    job = Job(
+        initial_value=0,
+        purchase_date=date(2024, 1, 1),
+        sale_date=date(2025, 12, 31),
+        currency=euro,
+        monthly_saving=10,
+    )
+    with pytest.raises(SaleAfterEndOfLife):
+        character.add_ownership(job)
+
+
+def test_ledger_follows_changes(euro):
+    character = Character(
+        name="John Doe",
+        start_investment_date=date(2024, 1, 1),
+        end_of_life=date(2025, 12, 31),
+        initial_capital_g_Au=5,
+    )
+    job = Job(
+        initial_value=0,
+        purchase_date=date(2024, 1, 1),
+        sale_date=date(2025, 12, 31),
+        currency=euro,
+        monthly_saving=10,
+    )
+    assert character.capital_g_Au[date(2024, 5, 1)] == 5
+    character.initial_capital_g_Au = 7
+    assert character.capital_g_Au[date(2024, 5, 1)] == 7
+    character.assets.append(job)
+    assert character.capital_g_Au[date(2024, 5, 1)] == 57
+    character.assets = []
+    assert character.capital_g_Au[date(2024, 5, 1)] == 7
+
+
+def test_purchase_before_start_investment_date(euro):
+    character = Character(
+        name="John Doe",
+        start_investment_date=date(2024, 1, 1),
+        end_of_life=date(2025, 12, 31),
+    )
+    saving = Saving(
+        initial_value=1000,
+        purchase_date=date(2022, 1, 1),
+        sale_date=date(2024, 6, 1),
+        currency=euro,
+    )
+    with pytest.raises(DateOrderException):
+        character.add_ownership(saving)
+    assert character.assets == []
+    assert list(character.capital_g_Au.data) == [0] * 24
+
+
+def test_ledger_is_single_path(euro):
+    start, end = date(2024, 1, 1), date(2025, 12, 31)
+    paths = Currency(
+        name="EUR",
+        interest_rate=euro.interest_rate,
+        units_per_g_Au=Timeseries(
+            start_date=start, end_date=end, data=np.full((3, 24), 10.0)
+        ),
+    )
+    saving = Saving(
+        initial_value=100,
+        purchase_date=date(2024, 6, 1),
+        sale_date=date(2024, 12, 1),
+        currency=paths,
+    )
+    character = Character(
+        name="John Doe",
+        start_investment_date=start,
+        end_of_life=end,
+        initial_capital_g_Au=100,
+    )
+    with pytest.raises(ValueError, match="single path"):
+        character.add_ownership(saving)
+    assert character.assets == []
+    character.assets.append(saving)
+    with pytest.raises(ValueError, match="single path"):
+        character.capital_g_Au
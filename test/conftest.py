@@ -0,0 +1,116 @@
+"""fixtures shared by the test modules"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.models.assets import (
+    CommodityBundle,
+    Job,
+    Loan,
+    RealEstateProperty,
+    Saving,
+    Stock,
+)
+from src.models.character import Character
+from src.models.timeseries import Timeseries, constant_timeseries
+from src.models.world import City, Commodity, Country, Currency, World
+
+
+@pytest.fixture
+def portfolio():
+    start, end = date(2024, 1, 1), date(2026, 12, 31)
+    months = np.arange(36)
+    euro = Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.01, start, end),
+        units_per_g_Au=Timeseries(start_date=start, end_date=end, data=50 + months),
+    )
+    france = Country(
+        name="France",
+        currency=euro,
+        real_estate_acquisition_cost_percentage=5,
+        stock_price=Timeseries(start_date=start, end_date=end, data=100 + 2 * months),
+    )
+    paris = City(
+        name="Paris",
+        country=france,
+        sqm_housing_price=Timeseries(
+            start_date=start, end_date=end, data=10000 + 10 * months
+        ),
+        yearly_price_to_rent_index=constant_timeseries(25, start, end),
+    )
+    gold = Commodity(name="gold", units_per_g_Au=constant_timeseries(1, start, end))
+    assets = [
+        Job(
+            initial_value=0,
+            purchase_date=date(2024, 1, 1),
+            sale_date=date(2026, 12, 1),
+            currency=euro,
+            monthly_saving=2000,
+        ),
+        Stock(
+            initial_value=5000,
+            purchase_date=date(2024, 3, 1),
+            sale_date=date(2025, 8, 1),
+            currency=euro,
+            country=france,
+        ),
+        RealEstateProperty(
+            initial_value=0,
+            purchase_date=date(2025, 2, 1),
+            sale_date=date(2026, 6, 1),
+            currency=euro,
+            city=paris,
+            surface_sqm=1,
+        ),
+        CommodityBundle(
+            initial_value=20,
+            purchase_date=date(2024, 5, 1),
+            sale_date=date(2024, 9, 1),
+            currency=euro,
+            commodity=gold,
+        ),
+        Saving(
+            initial_value=1000,
+            purchase_date=date(2024, 2, 1),
+            sale_date=date(2026, 2, 1),
+            currency=euro,
+        ),
+        Loan(
+            initial_value=-3000,
+            purchase_date=date(2024, 6, 1),
+            sale_date=date(2025, 6, 1),
+            currency=euro,
+            end_date=date(2025, 12, 1),
+        ),
+    ]
+    character = Character(
+        name="John Doe",
+        start_investment_date=date(2024, 2, 1),
+        end_of_life=date(2026, 12, 31),
+        initial_capital_g_Au=100,
+        assets=assets,
+    )
+    return character, euro
+
+
+@pytest.fixture
+def portfolio_world(portfolio):
+    """the world holding the entities of the portfolio"""
+    character, euro = portfolio
+    france = next(asset.country for asset in character.assets if type(asset) is Stock)
+    paris = next(
+        asset.city for asset in character.assets if type(asset) is RealEstateProperty
+    )
+    gold = next(
+        asset.commodity for asset in character.assets if type(asset) is CommodityBundle
+    )
+    return World(
+        name="Earth",
+        currencies=[euro],
+        countries=[france],
+        cities=[paris],
+        comodities=[gold],
+    )
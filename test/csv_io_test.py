@@ -0,0 +1,149 @@
+import asyncio
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.models.csv_io import (
+    load_world_csv,
+    read_series_csv,
+    read_world_csv,
+    write_world_csv,
+)
+from src.models.timeseries import (
+    DataToPeriodMismatch,
+    DateOrderException,
+    Timeseries,
+)
+
+
+def assert_same_series(read: Timeseries, written: Timeseries):
+    assert read.start_month == written.start_month
+    assert read.end_month == written.end_month
+    np.testing.assert_array_equal(read.array, written.array)
+
+
+def test_csv_round_trip(portfolio_world, tmp_path):
+    write_world_csv(portfolio_world, tmp_path)
+    assert (tmp_path / "countries" / "France" / "stock_price.csv").exists()
+    load = asyncio.run(load_world_csv(tmp_path, max_workers=4))
+    assert load.failures == []
+    read = load.world
+    assert read.name == "Earth"
+    paris = read.cities[0]
+    assert paris.country is read.countries[0]
+    assert paris.country.currency is read.currencies[0]
+    assert read.countries[0].real_estate_acquisition_cost_percentage == 5
+    assert_same_series(
+        paris.sqm_housing_price, portfolio_world.cities[0].sqm_housing_price
+    )
+    assert_same_series(
+        read.currencies[0].interest_rate, portfolio_world.currencies[0].interest_rate
+    )
+    assert_same_series(
+        read.comodities[0].units_per_g_Au, portfolio_world.comodities[0].units_per_g_Au
+    )
+
+
+def test_paths_and_dates(tmp_path):
+    path = tmp_path / "rate.csv"
+    path.write_text(
+        "month,low,high\n2024-01-01,0.01,0.02\n2024-02-01,0.01,0.03\n2024-03-01,0.02,0.03\n"
+    )
+    ts = read_series_csv(path)
+    assert ts.start_date == date(2024, 1, 1)
+    assert ts.end_date == date(2024, 3, 1)
+    np.testing.assert_array_equal(ts.data, [[0.01, 0.01, 0.02], [0.02, 0.03, 0.03]])
+
+
+def test_month_continuity(tmp_path):
+    path = tmp_path / "rate.csv"
+    path.write_text("month,value\n2024-01,1\n2024-03,2\n")
+    with pytest.raises(DataToPeriodMismatch):
+        read_series_csv(path)
+    path.write_text("month,value\n2024-02,1\n2024-01,2\n")
+    with pytest.raises(DateOrderException):
+        read_series_csv(path)
+
+
+def test_partial_failures(portfolio_world, tmp_path):
+    write_world_csv(portfolio_world, tmp_path)
+    (tmp_path / "cities" / "Paris" / "sqm_housing_price.csv").unlink()
+    (tmp_path / "comodities" / "gold" / "units_per_g_Au.csv").write_text(
+        "month,value\n2024-01,1\n2024-01,2\n"
+    )
+    load = read_world_csv(tmp_path)
+    read = load.world
+    assert [currency.name for currency in read.currencies] == ["EUR"]
+    assert [country.name for country in read.countries] == ["France"]
+    assert read.cities == [] and read.comodities == []
+    failed = {
+        failure.path.relative_to(tmp_path).as_posix() for failure in load.failures
+    }
+    assert failed == {
+        "cities/Paris/sqm_housing_price.csv",
+        "cities/Paris",
+        "comodities/gold/units_per_g_Au.csv",
+        "comodities/gold",
+    }
+    errors = {type(failure.error) for failure in load.failures}
+    assert FileNotFoundError in errors and DateOrderException in errors
+
+
+def test_failed_dependency(portfolio_world, tmp_path):
+    write_world_csv(portfolio_world, tmp_path)
+    (tmp_path / "currencies" / "EUR" / "interest_rate.csv").write_text("month,value\n")
+    read = read_world_csv(tmp_path).world
+    assert read.currencies == read.countries == read.cities == []
+    assert [commodity.name for commodity in read.comodities] == ["gold"]
+
+
+def test_missing_world_file(portfolio_world, tmp_path):
+    write_world_csv(portfolio_world, tmp_path)
+    (tmp_path / "world.json").unlink()
+    load = read_world_csv(tmp_path)
+    read = load.world
+    assert read.name == tmp_path.name
+    # the currencies and commodities are made of indicators only
+    assert [currency.name for currency in read.currencies] == ["EUR"]
+    assert [commodity.name for commodity in read.comodities] == ["gold"]
+    assert read.countries == read.cities == []
+    failed = {
+        failure.path.relative_to(tmp_path).as_posix() for failure in load.failures
+    }
+    assert failed == {"world.json", "countries/France", "cities/Paris"}
+    assert_same_series(
+        read.comodities[0].units_per_g_Au, portfolio_world.comodities[0].units_per_g_Au
+    )
+
+
+def test_entities_discovered_from_the_layout(portfolio_world, tmp_path):
+    write_world_csv(portfolio_world, tmp_path)
+    dollar = tmp_path / "currencies" / "USD"
+    dollar.mkdir()
+    for path in (tmp_path / "currencies" / "EUR").iterdir():
+        (dollar / path.name).write_bytes(path.read_bytes())
+    load = read_world_csv(tmp_path)
+    assert load.failures == []
+    assert [currency.name for currency in load.world.currencies] == ["EUR", "USD"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "[]",
+        '{"currencies": []}',
+        '{"name": "Earth", "currencies": {}}',
+        '{"name": "Earth", "currencies": ["EUR"]}',
+        '{"name": "Earth", "currencies": [{"units_per_g_Au": 1}]}',
+    ],
+)
+def test_invalid_world_file(portfolio_world, tmp_path, text):
+    write_world_csv(portfolio_world, tmp_path)
+    (tmp_path / "world.json").write_text(text)
+    load = read_world_csv(tmp_path)
+    assert load.world.name == tmp_path.name
+    assert [currency.name for currency in load.world.currencies] == ["EUR"]
+    failure = load.failures[0]
+    assert failure.path == tmp_path / "world.json"
+    assert isinstance(failure.error, ValueError)
@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+from datetime import date
+from src.models.assets import Loan, RealEstateProperty, Stock
+from src.models.expression import Expression, lazy
+from src.models.timeseries import (
+    IncludePeriodMismatch,
+    Timeseries,
+    constant_timeseries,
+    lazy_evaluation,
+    linear_timeseries,
+)
+from src.models.world import City, Country, Currency
+
+
+@pytest.fixture
+def series():
+    long = Timeseries(
+        start_date=date(2000, 1, 1),
+        end_date=date(2049, 12, 31),
+        data=np.linspace(1, 2, 600),
+    )
+    short = constant_timeseries(3, date(2024, 1, 1), date(2024, 12, 31))
+    line = linear_timeseries(2, 0.1, date(2020, 1, 1), date(2029, 12, 31))
+    return long, short, line
+
+
+def test_expression_matches_eager(series):
+    long, short, line = series
+    expression = (lazy(long) * short + line) / long - -lazy(short)
+    eager = (long * short + line) / long - (-short)
+    result = expression.evaluate()
+    assert result.start_date == eager.start_date
+    assert result.end_date == eager.end_date
+    assert np.allclose(result.data, eager.data)
+
+
+def test_common_subexpressions_are_merged(series):
+    long, short, line = series
+    first = lazy(long) * short
+    second = lazy(long) * short
+    assert first is second
+    expression = first / line + second / line
+    assert len(expression.nodes()) == 6
+    assert expression.explain().splitlines()[-1] == (
+        "%5 = add(%4, %4) [2024-01-01 -> 2024-12-31]"
+    )
+
+
+def test_non_overlapping_expression(series):
+    long, short, _ = series
+    with pytest.raises(IncludePeriodMismatch):
+        lazy(short) * long[date(2030, 1, 1) : date(2030, 12, 31)]
+
+
+def test_lazy_asset_valuation():
+    start, end = date(2024, 1, 1), date(2033, 12, 31)
+    euro = Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.002, start, end),
+        units_per_g_Au=Timeseries(
+            start_date=start, end_date=end, data=np.linspace(50, 70, 120)
+        ),
+    )
+    germany = Country(
+        name="DE",
+        currency=euro,
+        real_estate_acquisition_cost_percentage=9,
+        stock_price=constant_timeseries(100, start, end),
+    )
+    berlin = City(
+        name="Berlin",
+        country=germany,
+        sqm_housing_price=linear_timeseries(4000, 0.002, start, end),
+        yearly_price_to_rent_index=constant_timeseries(25, start, end),
+    )
+    flat = RealEstateProperty(
+        initial_value=200000,
+        purchase_date=date(2025, 1, 1),
+        sale_date=date(2030, 12, 1),
+        currency=euro,
+        city=berlin,
+        surface_sqm=50,
+    )
+    loan = Loan(
+        initial_value=-100000,
+        purchase_date=date(2025, 1, 1),
+        sale_date=date(2030, 12, 1),
+        end_date=date(2030, 12, 1),
+        currency=euro,
+    )
+    with lazy_evaluation():
+        value = flat.value_g_Au
+        loan_stream = loan.stream_g_Au
+    assert isinstance(value, Expression)
+    assert "div" in value.explain()
+    assert np.allclose(value.evaluate().data, flat.value_g_Au.data)
+    assert np.allclose(loan_stream.data, loan.stream_g_Au.data)
+
+
+def test_eager_valuation_after_lazy_valuation():
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    euro = Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.002, start, end),
+        units_per_g_Au=Timeseries(
+            start_date=start, end_date=end, data=np.linspace(50, 70, 12)
+        ),
+    )
+    germany = Country(
+        name="DE",
+        currency=euro,
+        real_estate_acquisition_cost_percentage=9,
+        stock_price=linear_timeseries(100, 0.01, start, end),
+    )
+    berlin = City(
+        name="Berlin",
+        country=germany,
+        sqm_housing_price=linear_timeseries(4000, 0.002, start, end),
+        yearly_price_to_rent_index=constant_timeseries(25, start, end),
+    )
+    flat = RealEstateProperty(
+        initial_value=0,
+        purchase_date=start,
+        sale_date=date(2024, 12, 1),
+        currency=euro,
+        city=berlin,
+        surface_sqm=50,
+    )
+    stock = Stock(
+        initial_value=1000,
+        purchase_date=start,
+        sale_date=date(2024, 12, 1),
+        currency=euro,
+        country=germany,
+    )
+    with lazy_evaluation():
+        assert isinstance(flat.value_g_Au, Expression)
+        assert isinstance(stock.value_g_Au, Expression)
+    # the derived series of the entities did not keep the expressions
+    assert isinstance(berlin.sqm_housing_price_g_Au, Timeseries)
+    assert isinstance(flat.value_g_Au, Timeseries)
+    assert isinstance(stock.value_g_Au, Timeseries)
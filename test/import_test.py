@@ -0,0 +1,70 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+MODULES = [
+    "amortization",
+    "asset_table",
+    "assets",
+    "backtest",
+    "cache",
+    "calendar",
+    "character",
+    "csv_io",
+    "expression",
+    "instrumentation",
+    "ledger",
+    "parallel",
+    "scenarios",
+    "sensitivity",
+    "simulation",
+    "snapshot",
+    "timeseries",
+    "world",
+]
+"""modules importable without the optional dependencies. arrow_io needs pyarrow"""
+HEAVY_MODULES = ["pandas", "matplotlib", "pyarrow"]
+IMPORT_BUDGET_SECONDS = 1.0
+"""time allowed to import all the models in a fresh interpreter, numpy included"""
+
+
+def run_fresh(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def test_models_import_no_heavy_dependency():
+    imports = "; ".join(f"import src.models.{module}" for module in MODULES)
+    loaded = run_fresh(
+        f"import sys; {imports}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    assert loaded.strip() == ""
+
+
+def test_import_budget():
+    imports = "; ".join(f"import src.models.{module}" for module in MODULES)
+    elapsed = run_fresh(
+        "from time import perf_counter; start = perf_counter(); "
+        f"{imports}; print(perf_counter() - start)"
+    )
+    assert float(elapsed) < IMPORT_BUDGET_SECONDS
+
+
+def test_pandas_loaded_on_use():
+    pytest.importorskip("pandas")
+    loaded = run_fresh(
+        "import sys; from datetime import date; "
+        "from src.models.timeseries import constant_timeseries; "
+        "constant_timeseries(1, date(2024, 1, 1), date(2024, 12, 31)).pd_timeseries; "
+        "print('pandas' in sys.modules)"
+    )
+    assert loaded.strip() == "True"
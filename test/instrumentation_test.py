@@ -0,0 +1,70 @@
+from datetime import date
+
+import numpy as np
+
+from src.models.assets import Saving
+from src.models.cache import valuation_cache
+from src.models.instrumentation import instrument, is_instrumented
+from src.models.timeseries import Timeseries, linear_timeseries
+from src.models.world import Currency
+
+
+def test_instrumentation_is_opt_in():
+    original = Timeseries.__add__
+    with instrument() as profile:
+        assert is_instrumented()
+        assert Timeseries.__add__ is not original
+    assert not is_instrumented()
+    assert Timeseries.__add__ is original
+    assert profile.timings == {}
+
+
+def test_counts_allocations_and_times_operators():
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    dense = Timeseries(start_date=start, end_date=end, data=list(range(12)))
+    linear = linear_timeseries(1, 0.1, start, end)
+    with instrument() as profile:
+        result = dense + linear
+        result = result * dense
+    assert profile.counters["allocations.Timeseries"] == 2
+    assert profile.counters["materialized_elements"] == 12
+    assert {entry.name: entry.calls for entry in profile.flat()} == {
+        "Timeseries.__add__": 1,
+        "Timeseries.__mul__": 1,
+    }
+    assert np.array_equal(result.array, (np.arange(12) + linear.array) * dense.array)
+
+
+def test_nested_asset_timings_and_cache():
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    euro = Currency(
+        name="EUR",
+        interest_rate=Timeseries(start_date=start, end_date=end, data=[0.01] * 12),
+        units_per_g_Au=Timeseries(start_date=start, end_date=end, data=[10] * 12),
+    )
+    saving = Saving(
+        initial_value=100, purchase_date=start, sale_date=end, currency=euro
+    )
+    valuation_cache.invalidate()
+    with instrument() as profile:
+        saving.cash_flow_g_Au
+        saving.value_g_Au
+    stacks = profile.collapsed().splitlines()
+    assert any(
+        line.startswith("Asset.cash_flow_g_Au;Saving.value_g_Au;") for line in stacks
+    )
+    assert profile.cache_hits == 1
+    assert profile.cache_misses == 3
+    assert profile.cache_hit_rate == 0.25
+    assert "Saving.value_g_Au" in profile.report()
+
+
+def test_aligned_operators_allocate_once():
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    left = Timeseries(start_date=start, end_date=end, data=np.arange(1.0, 13.0))
+    right = left[date(2024, 3, 1) : date(2024, 8, 1)]
+    with instrument() as profile:
+        left - right
+        left / right
+    assert profile.counters["allocations.Timeseries"] == 2
+    assert profile.counters["copied_elements"] == 0
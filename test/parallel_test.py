@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from datetime import date
+from src.models.assets import Job, Saving, Stock
+from src.models.character import Character
+from src.models.parallel import SharedWorld, attach_world, evaluate_portfolios
+from src.models.timeseries import Timeseries, constant_timeseries
+from src.models.world import Country, Currency, World
+
+
+@pytest.fixture
+def world():
+    start = date(2024, 1, 1)
+    end = date(2025, 12, 31)
+    euro = Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.01, start, end),
+        units_per_g_Au=Timeseries(
+            start_date=start, end_date=end, data=np.linspace(50, 60, 24)
+        ),
+    )
+    germany = Country(
+        name="DE",
+        currency=euro,
+        real_estate_acquisition_cost_percentage=9,
+        stock_price=Timeseries(
+            start_date=start, end_date=end, data=np.linspace(100, 130, 24)
+        ),
+    )
+    return World(
+        name="Earth", currencies=[euro], countries=[germany], cities=[], comodities=[]
+    )
+
+
+def make_character(world, index):
+    euro, germany = world.currencies[0], world.countries[0]
+    return Character(
+        name=f"character {index}",
+        start_investment_date=date(2024, 1, 1),
+        end_of_life=date(2025, 12, 31),
+        initial_capital_g_Au=100,
+        assets=[
+            Job(
+                initial_value=0,
+                purchase_date=date(2024, 1, 1),
+                sale_date=date(2025, 12, 31),
+                currency=euro,
+                monthly_saving=index,
+            ),
+            Stock(
+                initial_value=1000,
+                purchase_date=date(2024, 3, 1),
+                sale_date=date(2025, 6, 1),
+                currency=euro,
+                country=germany,
+            ),
+            Saving(
+                initial_value=500,
+                purchase_date=date(2024, 2, 1),
+                sale_date=date(2024, 8, 1),
+                currency=euro,
+            ),
+        ],
+    )
+
+
+def test_attach_shared_world(world):
+    with SharedWorld(world) as shared_world:
+        attached, entities = attach_world(shared_world.memory, shared_world.description)
+        euro = attached.currencies[0]
+        assert euro.units_per_g_Au == world.currencies[0].units_per_g_Au
+        assert not euro.units_per_g_Au.data.flags.owndata
+        assert attached.countries[0].currency is euro
+        assert entities[("countries", "DE")] is attached.countries[0]
+        del attached, entities, euro
+
+
+def test_evaluate_portfolios(world):
+    characters = [make_character(world, index) for index in range(10)]
+    euro = world.currencies[0]
+    valuations = evaluate_portfolios(
+        world, characters, euro, max_workers=2, chunksize=3
+    )
+    assert [valuation.name for valuation in valuations] == [
+        character.name for character in characters
+    ]
+    for character, valuation in zip(characters, valuations):
+        assert np.allclose(valuation.capital_g_Au.data, character.capital_g_Au.data)
+        assert np.allclose(valuation.wealth.data, character.wealth(euro).data)
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from datetime import date
+from src.models.assets import Stock
+from src.models.scenarios import (
+    GeometricBrownianMotion,
+    MeanReversion,
+    ScenarioGenerator,
+)
+from src.models.timeseries import constant_timeseries
+from src.models.world import City, Country, Currency, World
+
+
+@pytest.fixture
+def world():
+    start = date(2024, 1, 1)
+    end = date(2033, 12, 31)
+    euro = Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.003, start, end),
+        units_per_g_Au=constant_timeseries(60, start, end),
+    )
+    countries = [
+        Country(
+            name=name,
+            currency=euro,
+            real_estate_acquisition_cost_percentage=9,
+            stock_price=constant_timeseries(100, start, end),
+        )
+        for name in ("DE", "FR")
+    ]
+    city = City(
+        name="Berlin",
+        country=countries[0],
+        sqm_housing_price=constant_timeseries(5000, start, end),
+        yearly_price_to_rent_index=constant_timeseries(25, start, end),
+    )
+    return World(
+        name="Earth",
+        currencies=[euro],
+        countries=countries,
+        cities=[city],
+        comodities=[],
+    )
+
+
+def test_generated_paths(world):
+    generator = ScenarioGenerator(
+        world=world,
+        start_date=date(2024, 1, 1),
+        end_date=date(2033, 12, 31),
+        stock_price={
+            "DE": GeometricBrownianMotion(drift=0.005, volatility=0.04),
+            "FR": GeometricBrownianMotion(drift=0.005, volatility=0.04),
+        },
+        interest_rate={"EUR": MeanReversion(mean=0.002, speed=0.1, volatility=0.0)},
+        stock_correlation=np.array([[1, 0.9], [0.9, 1]]),
+        seed=1,
+    )
+    scenarios = generator.generate(2000)
+    germany, france = scenarios.countries
+    assert germany.stock_price.array.shape == (2000, 120)
+    assert np.all(germany.stock_price.array[:, 0] == 100)
+    mean_growth = germany.stock_price.array[:, -1].mean() / 100
+    assert mean_growth == pytest.approx(1.005**119, rel=0.05)
+    log_returns = [np.diff(np.log(c.stock_price.array)) for c in (germany, france)]
+    correlation = np.corrcoef(log_returns[0].ravel(), log_returns[1].ravel())[0, 1]
+    assert correlation == pytest.approx(0.9, abs=0.02)
+
+    rate = germany.currency.interest_rate.array
+    assert rate[0, 0] == pytest.approx(0.003)
+    assert rate[0, -1] == pytest.approx(0.002, abs=1e-6)
+    assert scenarios.cities[0].country is germany
+    assert scenarios.currencies[0] is germany.currency
+    same_scenarios = generator.generate(2000)
+    assert same_scenarios.countries[0].stock_price == germany.stock_price
+
+
+def test_vectorized_asset_valuation(world):
+    scenarios = ScenarioGenerator(
+        world=world,
+        start_date=date(2024, 1, 1),
+        end_date=date(2033, 12, 31),
+        stock_price={"DE": GeometricBrownianMotion(drift=0.005, volatility=0.04)},
+        seed=2,
+    ).generate(50)
+    germany = scenarios.countries[0]
+    stock = Stock(
+        initial_value=1000,
+        purchase_date=date(2025, 1, 1),
+        sale_date=date(2030, 12, 1),
+        country=germany,
+        currency=germany.currency,
+    )
+    value = stock.value_g_Au
+    assert value.paths_shape == (50,)
+    assert len(value) == 72
+    prices = germany.stock_price.array[:, 12:84]
+    expected = 1000 / prices[:, :1] * prices / 60
+    assert np.allclose(value.array, expected)
+    assert stock.cash_flow_g_Au.paths_shape == (50,)
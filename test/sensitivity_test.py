@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from src.models.assets import Job, Stock
+from src.models.sensitivity import (
+    Indicator,
+    bump_indicator,
+    indicators,
+    sensitivities,
+)
+
+
+def test_indicators(portfolio_world):
+    found = indicators(portfolio_world)
+    assert Indicator("currencies", "EUR", "interest_rate") in found
+    assert Indicator("cities", "Paris", "yearly_price_to_rent_index") in found
+    assert len(found) == 6
+
+
+def test_matches_full_revaluation(portfolio, portfolio_world):
+    character, euro = portfolio
+    report = sensitivities(character, portfolio_world, euro, max_workers=4)
+    assert len(report.sensitivities) == 6
+    np.testing.assert_allclose(
+        report.final_wealth, character.wealth(euro).array[-1], rtol=1e-12
+    )
+    for sensitivity in report.sensitivities:
+        indicator = sensitivity.indicator
+        series = indicator.series(portfolio_world)
+        fork = portfolio_world.fork(
+            **{
+                indicator.kind: {
+                    indicator.name: {
+                        indicator.field: bump_indicator(
+                            series, indicator.field, 0.01, 0.0001
+                        )
+                    }
+                }
+            }
+        )
+        bumped = character.rebind(fork)
+        np.testing.assert_allclose(
+            sensitivity.capital_g_Au.array,
+            bumped.capital_g_Au.array - character.capital_g_Au.array,
+            atol=1e-9,
+        )
+        final_wealth = (
+            bumped.wealth(fork.currency("EUR")).array[-1]
+            - character.wealth(euro).array[-1]
+        )
+        assert sensitivity.final_wealth == pytest.approx(final_wealth, abs=1e-6)
+
+    by_indicator = report.by_indicator()
+    stock_price = by_indicator[Indicator("countries", "France", "stock_price")]
+    assert stock_price.revalued_assets == 1
+    rate = by_indicator[Indicator("currencies", "EUR", "interest_rate")]
+    assert rate.revalued_assets == 1
+    assert rate.capital_g_Au.array[-1] < 0
+    rent = by_indicator[Indicator("cities", "Paris", "yearly_price_to_rent_index")]
+    assert rent.revalued_assets == 1
+    assert rent.capital_g_Au.array[-1] < 0
+    gold = by_indicator[Indicator("comodities", "gold", "units_per_g_Au")]
+    assert gold.revalued_assets == 1
+
+
+def test_asset_list(portfolio, portfolio_world):
+    character, euro = portfolio
+    assets = [asset for asset in character.assets if isinstance(asset, (Stock, Job))]
+    report = sensitivities(
+        assets,
+        portfolio_world,
+        euro,
+        bumped=[Indicator("countries", "France", "stock_price")],
+    )
+    [sensitivity] = report.sensitivities
+    assert sensitivity.revalued_assets == 1
+    # the lot is bought for a fixed amount: scaling the index scales the price
+    # paid and the price received alike
+    np.testing.assert_allclose(sensitivity.capital_g_Au.array, 0, atol=1e-9)
+    assert report.capital_g_Au.start_date == min(
+        asset.purchase_date for asset in assets
+    )
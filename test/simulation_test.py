@@ -0,0 +1,70 @@
+from datetime import date
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from src.models.assets import Loan
+from src.models.calendar import month_ordinal, ordinal_to_date
+from src.models.simulation import simulate
+
+
+def test_cash_flow_at_matches_the_series(portfolio):
+    character, _ = portfolio
+    for asset in character.assets:
+        cash_flow = asset.cash_flow_g_Au
+        for month in range(cash_flow.start_month, cash_flow.end_month + 1):
+            day = ordinal_to_date(month)
+            assert asset.cash_flow_at(day) == pytest.approx(cash_flow[day])
+
+
+def test_simulation_matches_the_whole_period(portfolio):
+    character, euro = portfolio
+    records = list(simulate(character, euro))
+    assert [record.month for record in records] == [
+        ordinal_to_date(month)
+        for month in range(
+            character.capital_g_Au.start_month, character.capital_g_Au.end_month + 1
+        )
+    ]
+    assert np.allclose(
+        [record.capital_g_Au for record in records], character.capital_g_Au.array
+    )
+    assert np.allclose(
+        [record.wealth for record in records], character.wealth(euro).array
+    )
+    assert all(len(record.cash_flows_g_Au) == 6 for record in records)
+
+
+def test_simulation_stops_early(portfolio):
+    character, euro = portfolio
+    records = list(
+        simulate(character, euro, stop_when=lambda record: record.capital_g_Au > 300)
+    )
+    assert records[-1].capital_g_Au > 300
+    assert all(record.capital_g_Au <= 300 for record in records[:-1])
+
+
+@pytest.mark.parametrize("sale_date", [date(2025, 6, 1), date(2026, 6, 1)])
+def test_loan_is_streamed_from_its_schedule(portfolio, sale_date):
+    character, euro = portfolio
+    loan = Loan(
+        initial_value=-3000,
+        purchase_date=date(2024, 6, 1),
+        sale_date=sale_date,
+        currency=euro,
+        end_date=date(2025, 12, 1),
+    )
+    # the point valuations never build the series of the loan
+    with mock.patch.object(
+        Loan, "stream_g_Au", property(lambda self: pytest.fail("stream_g_Au built"))
+    ), mock.patch.object(
+        Loan, "value_g_Au", property(lambda self: pytest.fail("value_g_Au built"))
+    ):
+        cash_flows = [
+            loan.cash_flow_at(ordinal_to_date(month))
+            for month in range(
+                month_ordinal(loan.purchase_date), month_ordinal(sale_date) + 1
+            )
+        ]
+    assert np.allclose(cash_flows, loan.cash_flow_g_Au.array)
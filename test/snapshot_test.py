@@ -0,0 +1,81 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.models.assets import Loan, Stock
+from src.models.character import Character
+from src.models.snapshot import (
+    SnapshotFormatError,
+    VERSION,
+    read_snapshot,
+    write_snapshot,
+)
+from src.models.world import Currency, UnknownEntity
+
+
+def test_snapshot_round_trip(portfolio, portfolio_world, tmp_path):
+    character, euro = portfolio
+    path = tmp_path / "state.snapshot"
+    write_snapshot(path, portfolio_world, [character])
+    snapshot = read_snapshot(path)
+
+    world = snapshot.world
+    assert world.name == "Earth"
+    read_euro = world.currencies[0]
+    assert world.countries[0].currency is read_euro
+    assert world.cities[0].country is world.countries[0]
+    units = read_euro.units_per_g_Au
+    assert units == euro.units_per_g_Au
+    assert isinstance(units.data.base, np.memmap)
+    assert not units.data.flags.writeable
+    assert type(read_euro.interest_rate) is type(euro.interest_rate)
+
+    [read_character] = snapshot.characters
+    assert read_character.name == character.name
+    assert read_character.start_investment_date == character.start_investment_date
+    assert [type(asset) for asset in read_character.assets] == [
+        type(asset) for asset in character.assets
+    ]
+    stock = next(asset for asset in read_character.assets if type(asset) is Stock)
+    assert stock.country is world.countries[0]
+    loan = next(asset for asset in read_character.assets if type(asset) is Loan)
+    assert loan.end_date == date(2025, 12, 1)
+    np.testing.assert_allclose(
+        read_character.capital_g_Au.array, character.capital_g_Au.array
+    )
+
+
+def test_shared_series_written_once(portfolio_world, tmp_path):
+    path = tmp_path / "state.snapshot"
+    euro = portfolio_world.currencies[0]
+    twin = Currency(
+        name="EUR bis",
+        interest_rate=euro.interest_rate,
+        units_per_g_Au=euro.units_per_g_Au,
+    )
+    portfolio_world.currencies.append(twin)
+    write_snapshot(path, portfolio_world)
+    read_euro, read_twin = read_snapshot(path, memory_map=False).world.currencies
+    assert read_twin.units_per_g_Au is read_euro.units_per_g_Au
+
+
+def test_unknown_entity(portfolio, portfolio_world, tmp_path):
+    character, _ = portfolio
+    portfolio_world.countries.clear()
+    with pytest.raises(UnknownEntity):
+        write_snapshot(tmp_path / "state.snapshot", portfolio_world, [character])
+
+
+def test_format_errors(portfolio_world, tmp_path):
+    path = tmp_path / "state.snapshot"
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(SnapshotFormatError):
+        read_snapshot(path)
+    write_snapshot(path, portfolio_world)
+    data = bytearray(path.read_bytes())
+    data[8:12] = (VERSION + 1).to_bytes(4, "little")
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotFormatError) as error:
+        read_snapshot(path)
+    assert error.value.version == VERSION + 1
@@ -2,12 +2,19 @@ from datetime import date
 from tarfile import data_filter
 import pandas as pd
 import pytest
+import numpy as np
 from src.models.timeseries import (
+    ConstantTimeseries,
     DateOrderException,
+    LinearTimeseries,
+    SegmentedTimeseries,
+    get_backend,
+    set_backend,
     linear_timeseries,
     months_in_interval,
     Timeseries,
     DataToPeriodMismatch,
+    IncludePeriodMismatch,
     constant_timeseries,
 )
 
@@ -106,15 +113,198 @@ def test_timeseries_div(valid_monthly_timeseries):
 def test_timeseries_index(valid_monthly_timeseries):
     sample = valid_monthly_timeseries[date(2024, 3, 1)]
     assert sample == valid_monthly_timeseries.data[2]
+    assert not isinstance(sample, np.ndarray)
+    assert isinstance(sample, float)
+
+
+def test_timeseries_index_of_paths():
+    ts = Timeseries(
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 3, 31),
+        data=np.arange(6.0).reshape(2, 3),
+    )
+    assert list(ts[date(2024, 2, 1)]) == [1, 4]
 
 
 def test_linear_timeseries():
     start_date = date(2024, 1, 1)
     end_date = date(2024, 12, 31)
     result = linear_timeseries(a=2, b=0, start=start_date, end=end_date)
-    assert result.data == [2]*12
+    assert list(result.data) == [2]*12
     result = linear_timeseries(a=2, b=1, start=start_date, end=end_date)
     assert result.data[0] == 2
     assert result.data[5] == 12
     assert result.data[11] == 24
 
+
+def test_numpy_backend_storage(valid_monthly_timeseries):
+    assert isinstance(valid_monthly_timeseries.data, np.ndarray)
+    assert valid_monthly_timeseries.data.dtype == np.float64
+
+
+def test_timeseries_add_other_starts_earlier(valid_monthly_timeseries):
+    earlier_ts = constant_timeseries(1, date(2023, 11, 1), date(2024, 2, 1))
+    added_ts = valid_monthly_timeseries + earlier_ts
+    assert added_ts.start_date == date(2023, 11, 1)
+    assert added_ts.end_date == date(2024, 12, 31)
+    assert list(added_ts.data[:4]) == [1, 1, 1, 2]
+
+
+def test_list_backend(valid_monthly_timeseries):
+    set_backend("list")
+    try:
+        assert get_backend() == "list"
+        ts = constant_timeseries(2, date(2024, 1, 1), date(2024, 12, 31))
+        mul_ts = ts * valid_monthly_timeseries
+        assert isinstance(mul_ts.data, list)
+        assert mul_ts.data == [2 * x for x in range(12)]
+    finally:
+        set_backend("numpy")
+    with pytest.raises(ValueError):
+        set_backend("tuple")
+
+
+def test_constant_timeseries_is_symbolic():
+    ts = constant_timeseries(0, date(1990, 1, 1), date(2039, 12, 31))
+    assert isinstance(ts, ConstantTimeseries)
+    assert ts.array.strides == (0,)
+    assert ts[date(2000, 5, 1)] == 0
+
+
+def test_constant_combinations_stay_compact():
+    first = constant_timeseries(2, date(2024, 1, 1), date(2024, 6, 1))
+    second = constant_timeseries(3, date(2024, 4, 1), date(2024, 12, 1))
+    added_ts = first + second
+    assert isinstance(added_ts, SegmentedTimeseries)
+    assert list(added_ts.data) == [2, 2, 2, 5, 5, 5, 3, 3, 3, 3, 3, 3]
+    assert list(added_ts.lengths) == [3, 3, 6]
+    mul_ts = first * second
+    assert isinstance(mul_ts, ConstantTimeseries)
+    assert mul_ts.value == 6
+    assert len(mul_ts) == 3
+    assert (added_ts - added_ts) == constant_timeseries(
+        0, date(2024, 1, 1), date(2024, 12, 1)
+    )
+
+
+def test_linear_combinations_stay_compact(valid_monthly_timeseries):
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    linear = linear_timeseries(a=2, b=0.5, start=start, end=end)
+    scaled = constant_timeseries(3, start, end) * linear
+    assert isinstance(scaled, LinearTimeseries)
+    assert list(scaled.data) == [3 * 2 * (1 + 0.5 * t) for t in range(12)]
+    shifted = linear + constant_timeseries(1, start, end)
+    assert isinstance(shifted, LinearTimeseries)
+    assert np.allclose(shifted.data, [1 + 2 * (1 + 0.5 * t) for t in range(12)])
+    window = linear[date(2024, 3, 1) : date(2024, 5, 1)]
+    assert isinstance(window, LinearTimeseries)
+    assert list(window.data) == [2 * (1 + 0.5 * t) for t in (2, 3, 4)]
+    mixed = linear * valid_monthly_timeseries
+    assert not isinstance(mixed, LinearTimeseries)
+    assert list(mixed.data) == [2 * (1 + 0.5 * t) * t for t in range(12)]
+
+
+def test_batch_date_lookup(valid_monthly_timeseries):
+    days = [date(2024, 3, 15), date(2024, 1, 1), date(2024, 12, 31)]
+    assert list(valid_monthly_timeseries[days]) == [2, 0, 11]
+    as_datetime64 = np.array(days, dtype="datetime64[D]")
+    assert list(valid_monthly_timeseries.take(as_datetime64)) == [2, 0, 11]
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    linear = linear_timeseries(a=2, b=0.5, start=start, end=end)
+    assert list(linear[days]) == [2 * (1 + 0.5 * t) for t in (2, 0, 11)]
+    constant = constant_timeseries(3, start, end)
+    assert list(constant[days]) == [3, 3, 3]
+    with pytest.raises(IncludePeriodMismatch):
+        valid_monthly_timeseries[[date(2025, 1, 1)]]
+    with pytest.raises(IncludePeriodMismatch):
+        valid_monthly_timeseries[date(2023, 12, 1)]
+
+
+def test_window_by_month_ordinal(valid_monthly_timeseries):
+    first = valid_monthly_timeseries.start_month
+    window = valid_monthly_timeseries.window(first + 2, first + 4)
+    assert window.start_date == date(2024, 3, 1)
+    assert list(window.data) == [2, 3, 4]
+    with pytest.raises(IncludePeriodMismatch):
+        valid_monthly_timeseries.window(first - 1, first + 4)
+
+
+def test_pandas_round_trip(valid_monthly_timeseries):
+    series = valid_monthly_timeseries.to_pandas()
+    assert len(series) == 12
+    assert series.index[0] == pd.Timestamp(2024, 1, 31)
+    assert np.shares_memory(series.to_numpy(), valid_monthly_timeseries.data)
+    # the period ends on the first day of its last month
+    short = Timeseries(
+        start_date=date(2024, 1, 1), end_date=date(2024, 3, 1), data=[1, 2, 3]
+    )
+    assert list(short.to_pandas()) == [1, 2, 3]
+    assert short.to_pandas().index is short.to_pandas().index
+    read = Timeseries.from_pandas(series)
+    assert read.start_date == date(2024, 1, 1) and read.end_date == date(2024, 12, 1)
+    assert np.shares_memory(read.data, valid_monthly_timeseries.data)
+
+    paths = Timeseries(
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 3, 1),
+        data=np.arange(6.0).reshape(2, 3),
+    )
+    frame = paths.to_pandas()
+    assert frame.shape == (3, 2)
+    assert np.array_equal(Timeseries.from_pandas(frame).data, paths.data)
+    periods = pd.Series(
+        [1.0, 2.0], index=pd.period_range("2024-11", periods=2, freq="M")
+    )
+    assert Timeseries.from_pandas(periods).end_date == date(2024, 12, 1)
+    gap = pd.Series([1.0, 2.0], index=pd.to_datetime(["2024-01-31", "2024-03-31"]))
+    with pytest.raises(DataToPeriodMismatch):
+        Timeseries.from_pandas(gap)
+
+
+def test_arrow_round_trip(valid_monthly_timeseries):
+    table = valid_monthly_timeseries.to_arrow()
+    assert table.column_names == ["month", "value"]
+    read = Timeseries.from_arrow(table)
+    assert read.start_date == date(2024, 1, 1) and read.end_date == date(2024, 12, 1)
+    assert np.shares_memory(read.data, valid_monthly_timeseries.data)
+    paths = Timeseries(
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 3, 1),
+        data=np.arange(6.0).reshape(2, 3),
+    )
+    assert np.array_equal(Timeseries.from_arrow(paths.to_arrow()).data, paths.data)
+
+
+def test_arrow_month_column(valid_monthly_timeseries):
+    import pyarrow as pa
+
+    table = valid_monthly_timeseries.to_arrow()
+    reordered = table.select(["value", "month"])
+    read = Timeseries.from_arrow(reordered)
+    assert read.start_date == date(2024, 1, 1)
+    assert list(read.data) == list(valid_monthly_timeseries.data)
+    renamed = table.rename_columns(["date", "value"])
+    with pytest.raises(ValueError, match="no month column"):
+        Timeseries.from_arrow(renamed)
+    assert list(Timeseries.from_arrow(renamed, month_column="date").data) == list(
+        valid_monthly_timeseries.data
+    )
+    with pytest.raises(ValueError, match="no value column"):
+        Timeseries.from_arrow(pa.table({"month": table.column("month")}))
+
+
+def test_slice_is_view(valid_monthly_timeseries):
+    sliced_ts = valid_monthly_timeseries[date(2024, 2, 1) : date(2024, 4, 1)]
+    assert np.shares_memory(sliced_ts.data, valid_monthly_timeseries.data)
+    assert list(sliced_ts.data) == [1, 2, 3]
+
+
+def test_sub_disjoint_periods(valid_monthly_timeseries):
+    later = Timeseries(
+        start_date=date(2025, 3, 1), end_date=date(2025, 4, 1), data=[1, 2]
+    )
+    result = valid_monthly_timeseries - later
+    assert result.start_date == date(2024, 1, 1)
+    assert result.end_date == date(2025, 4, 1)
+    assert list(result.data) == list(range(12)) + [0, 0, -1, -2]
+    assert list((later - valid_monthly_timeseries).data[:3]) == [0, -1, -2]
@@ -1,7 +1,10 @@
 import pytest
 from datetime import date
-from src.models.world import Currency, Country, City, Commodity, World
-from src.models.timeseries import Timeseries
+import numpy as np
+from src.models.world import Currency, Country, City, Commodity, UnknownEntity, World
+from src.models.timeseries import Timeseries, constant_timeseries
+from src.models.assets import RealEstateProperty, Stock
+from src.models.cache import valuation_cache
 
 
 @pytest.fixture
@@ -77,3 +80,133 @@ def test_World(sample_data):
     assert len(world.countries) == 1
     assert len(world.cities) == 1
     assert len(world.comodities) == 1
+
+
+def test_world_indexes(sample_data):
+    currency, country, city, commodity, world = sample_data
+    assert world.currency("USD") is currency
+    assert world.country("USA") is country
+    assert world.city("New York") is city
+    assert world.commodity("Gold") is commodity
+    assert world.ids("currencies") == {"USD": 0}
+    with pytest.raises(UnknownEntity):
+        world.currency("EUR")
+
+
+def test_fx_rates():
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    usd = Currency(
+        name="USD",
+        interest_rate=constant_timeseries(0.01, start, end),
+        units_per_g_Au=Timeseries(start_date=start, end_date=end, data=[60] * 12),
+    )
+    eur = Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.01, start, end),
+        units_per_g_Au=Timeseries(
+            start_date=date(2024, 7, 1), end_date=end, data=[50, 55, 60, 65, 70, 75]
+        ),
+    )
+    world = World(
+        name="Earth", currencies=[usd, eur], countries=[], cities=[], comodities=[]
+    )
+    assert world.fx_matrix.array.shape == (2, 2, 6)
+    fx_rate = world.fx_rate(usd, "EUR")
+    assert fx_rate.start_date == date(2024, 7, 1)
+    assert np.allclose(fx_rate.data, np.array([50, 55, 60, 65, 70, 75]) / 60)
+    assert world.fx_rate("USD", eur) is fx_rate
+    assert list(world.fx_rate(eur, eur).data) == [1] * 6
+    with pytest.raises(UnknownEntity):
+        world.fx_rate("GBP", eur)
+    with pytest.raises(UnknownEntity):
+        world.fx_rate(usd, "GBP")
+    dollars = constant_timeseries(120, start, end)
+    assert np.allclose(world.convert(dollars, usd, eur).data, fx_rate.array * 120)
+
+
+def test_derived_series_are_computed_once():
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    euro = Currency(
+        name="EUR",
+        interest_rate=constant_timeseries(0.01, start, end),
+        units_per_g_Au=Timeseries(start_date=start, end_date=end, data=[50] * 12),
+    )
+    france = Country(
+        name="France",
+        currency=euro,
+        real_estate_acquisition_cost_percentage=5,
+        stock_price=Timeseries(start_date=start, end_date=end, data=range(100, 112)),
+    )
+    paris = City(
+        name="Paris",
+        country=france,
+        sqm_housing_price=constant_timeseries(10000, start, end),
+        yearly_price_to_rent_index=constant_timeseries(25, start, end),
+    )
+    assert euro.monthly_interest_factor == constant_timeseries(1.01, start, end)
+    assert france.stock_price_g_Au is france.stock_price_g_Au
+    assert np.allclose(france.stock_price_g_Au.data, np.arange(100, 112) / 50)
+    assert not france.stock_price_g_Au.data.flags.writeable
+    assert paris.sqm_housing_price_g_Au == constant_timeseries(200, start, end)
+    assert paris.monthly_rent_yield == constant_timeseries(1 / 300, start, end)
+
+
+def test_fork_shares_unchanged_entities(portfolio, portfolio_world):
+    character, euro = portfolio
+    world = portfolio_world
+    world.fx_matrix
+    paris = world.cities[0]
+    paris.monthly_rent_yield
+    shocked = paris.sqm_housing_price * constant_timeseries(
+        0.8, paris.sqm_housing_price.start_date, paris.sqm_housing_price.end_date
+    )
+    fork = world.fork(cities={"Paris": {"sqm_housing_price": shocked}})
+    assert fork.currencies[0] is euro
+    assert fork.countries[0] is world.countries[0]
+    assert fork.comodities[0] is world.comodities[0]
+    forked_paris = fork.city("Paris")
+    assert forked_paris is not paris
+    assert forked_paris.sqm_housing_price is shocked
+    assert forked_paris.yearly_price_to_rent_index is paris.yearly_price_to_rent_index
+    assert forked_paris.monthly_rent_yield is paris.monthly_rent_yield
+    assert fork.fx_matrix is world.fx_matrix
+    assert world.city("Paris") is paris
+
+    forked = character.rebind(fork)
+    for asset, forked_asset in zip(character.assets, forked.assets):
+        if isinstance(asset, RealEstateProperty):
+            assert forked_asset.city is forked_paris
+            np.testing.assert_allclose(
+                forked_asset.value_g_Au.array, 0.8 * asset.value_g_Au.array
+            )
+        else:
+            assert forked_asset is asset
+
+
+def test_fork_rebuilds_referencing_entities(portfolio, portfolio_world):
+    character, euro = portfolio
+    world = portfolio_world
+    stock = next(asset for asset in character.assets if isinstance(asset, Stock))
+    stock.value_g_Au
+    france = world.countries[0]
+    france.stock_price_g_Au
+    rate = constant_timeseries(
+        0.02, euro.interest_rate.start_date, euro.interest_rate.end_date
+    )
+    fork = world.fork("high rates", currencies={"EUR": {"interest_rate": rate}})
+    assert fork.name == "high rates"
+    assert fork.currency("EUR").interest_rate is rate
+    assert fork.currency("EUR").units_per_g_Au is euro.units_per_g_Au
+    forked_france = fork.country("France")
+    assert forked_france.currency is fork.currency("EUR")
+    assert fork.city("Paris").country is forked_france
+    # the derived series only read the unchanged gold quote
+    assert forked_france.stock_price_g_Au is france.stock_price_g_Au
+    hits = valuation_cache.hits
+    assert fork.rebind(stock).value_g_Au is stock.value_g_Au
+    assert valuation_cache.hits > hits
+
+    with pytest.raises(UnknownEntity):
+        world.fork(cities={"Lyon": {"sqm_housing_price": rate}})
+    with pytest.raises(ValueError):
+        world.fork(planets={})